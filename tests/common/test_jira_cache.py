@@ -0,0 +1,83 @@
+import tempfile
+import unittest
+
+import requests
+
+from yarndevtools.common.jira_cache import JiraDocumentCache
+
+URL = "https://issues.apache.org/jira/browse/YARN-1"
+
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers if headers else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP error: {self.status_code}")
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.timeouts = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, headers))
+        self.timeouts.append(timeout)
+        return self.responses.pop(0)
+
+
+class TestJiraDocumentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _create_cache(self, session, ttl_seconds=60):
+        return JiraDocumentCache(self.tmp_dir.name, ttl_seconds=ttl_seconds, session=session)
+
+    def test_document_is_not_requested_within_ttl(self):
+        session = FakeSession(FakeResponse(200, "html1"))
+        self.assertEqual("html1", self._create_cache(session).get(URL))
+        self.assertEqual("html1", self._create_cache(session).get(URL))
+        self.assertEqual([(URL, {})], session.requests)
+        self.assertEqual([20], session.timeouts)
+
+    def test_unmodified_document_is_revalidated_after_ttl(self):
+        headers = {"ETag": '"v1"', "Last-Modified": "Mon, 15 Feb 2021 14:48:42 GMT"}
+        session = FakeSession(FakeResponse(200, "html1", headers), FakeResponse(304), FakeResponse(200, "html2"))
+        cache = self._create_cache(session, ttl_seconds=0)
+        self.assertEqual("html1", cache.get(URL))
+        self.assertEqual("html1", cache.get(URL))
+        self.assertEqual(
+            {"If-None-Match": '"v1"', "If-Modified-Since": headers["Last-Modified"]}, session.requests[1][1]
+        )
+        self.assertEqual("html2", cache.get(URL))
+
+    def test_document_without_validators_is_downloaded_again_after_ttl(self):
+        session = FakeSession(FakeResponse(200, "html1"), FakeResponse(200, "html2"))
+        cache = self._create_cache(session, ttl_seconds=0)
+        self.assertEqual("html1", cache.get(URL))
+        self.assertEqual("html2", cache.get(URL))
+        self.assertEqual([(URL, {}), (URL, {})], session.requests)
+
+    def test_failed_download_raises_error(self):
+        cache = self._create_cache(FakeSession(FakeResponse(404)))
+        self.assertRaises(requests.HTTPError, cache.get, URL)
+
+    def test_download_jira_html_saves_file_and_issue_json_is_parsed(self):
+        session = FakeSession(FakeResponse(200, "<html/>"), FakeResponse(200, '{"key": "YARN-1"}'))
+        cache = self._create_cache(session)
+        html_file = f"{self.tmp_dir.name}/jira.html"
+        self.assertEqual(
+            "<html/>", cache.download_jira_html("https://issues.apache.org/jira/browse/", "YARN-1", html_file)
+        )
+        with open(html_file) as f:
+            self.assertEqual("<html/>", f.read())
+        self.assertEqual({"key": "YARN-1"}, cache.get_issue_json("https://issues.apache.org/jira/", "YARN-1"))
+        self.assertEqual("https://issues.apache.org/jira/rest/api/2/issue/YARN-1", session.requests[1][0])
@@ -1,8 +1,25 @@
+import inspect
+import subprocess
 import tempfile
 import unittest
+from unittest.mock import call, patch
 
-from tests.test_utilities import Object
-from yarndevtools.common.shared_command_utils import FullEmailConfig
+from pythoncommons.constants import ExecutionMode
+from pythoncommons.git_constants import ORIGIN
+from pythoncommons.logging_setup import SimpleLoggingSetup
+from pythoncommons.project_utils import ProjectRootDeterminationStrategy, ProjectUtils
+
+from tests.test_utilities import Object, TemporaryGitRepo
+from yarndevtools.common import shared_command_utils
+from yarndevtools.common.shared_command_utils import (
+    BranchContainmentIndex,
+    CommandType,
+    FullEmailConfig,
+    JiraIdMatcher,
+    MultiBranchGitLog,
+    SharedCommandUtils,
+)
+from yarndevtools.constants import YARNDEVTOOLS_MODULE_NAME
 
 
 class TestFullEmailConfig(unittest.TestCase):
@@ -108,3 +125,155 @@ class TestFullEmailConfig(unittest.TestCase):
             self.assertEqual("sender", config.sender)
             self.assertEqual(["recipient1", "recipient2"], config.recipients)
             self.assertEqual("subject", config.subject)
+
+
+class TestJiraIdMatcher(unittest.TestCase):
+    LINES = [
+        "a1 YARN-10157. Some fix 2021-02-15T14:48:42+01:00",
+        "a2 YARN-1015. Another fix 2021-02-15T14:48:42+01:00",
+        "a3 YARN-101 2021-02-15T14:48:42+01:00",
+        "a4 CDPD-1: HADOOP-YARN-20 backport 2021-02-15T14:48:42+01:00",
+        "a5 Ends with YARN-101",
+        "a6 HDFS-101. Not a YARN jira 2021-02-15T14:48:42+01:00",
+    ]
+    JIRA_IDS = ["YARN-101", "YARN-1015", "YARN-20"]
+
+    def test_partial_matches_are_not_allowed(self):
+        matcher = JiraIdMatcher(self.JIRA_IDS)
+        self.assertEqual(["YARN-1015"], matcher.find_jira_ids(self.LINES[1]))
+        self.assertEqual(["YARN-101"], matcher.find_jira_ids(self.LINES[2]))
+        self.assertEqual(["YARN-20"], matcher.find_jira_ids(self.LINES[3]))
+        self.assertEqual([], matcher.find_jira_ids(self.LINES[0]))
+        self.assertEqual([], matcher.find_jira_ids(self.LINES[4]))
+        self.assertEqual([], matcher.find_jira_ids(self.LINES[5]))
+
+    def test_same_lines_as_egrep(self):
+        pattern = "|".join(jira_id + "[^0-9]" for jira_id in self.JIRA_IDS)
+        egrep_output = subprocess.run(
+            ["grep", "-E", pattern], input="\n".join(self.LINES) + "\n", capture_output=True, text=True
+        ).stdout
+        self.assertEqual(egrep_output.splitlines(), JiraIdMatcher(self.JIRA_IDS).filter_lines(self.LINES))
+
+
+class GitRepoWithBranchesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_repo = TemporaryGitRepo()
+        commit = self.tmp_repo.commit
+        base = commit("YARN-1. Common commit")
+        branch1_commit = commit("YARN-2. Branch1 commit", parents=[base])
+        branch2_commit = commit("YARN-3. Branch2 commit", parents=[base])
+        merge = commit("YARN-4. Merge commit", parents=[branch2_commit, branch1_commit])
+        for branch, tip in (("branch1", branch1_commit), ("branch2", merge), ("branch3", base)):
+            self.tmp_repo.create_branch(branch, tip, remote=ORIGIN)
+        self.repo = self.tmp_repo.repo
+
+    def tearDown(self):
+        self.tmp_repo.cleanup()
+
+
+class TestMultiBranchGitLog(GitRepoWithBranchesTestCase):
+    def test_commits_are_attributed_to_branches(self):
+        branches = ["branch1", "branch2", "branch3"]
+        git_log = MultiBranchGitLog(self.repo, branches)
+        result = {line.split(" ")[1]: [branches[idx] for idx in git_log.branch_indices(mask)] for line, mask in git_log}
+        self.assertEqual(
+            {
+                "YARN-1.": ["branch1", "branch2", "branch3"],
+                "YARN-2.": ["branch1", "branch2"],
+                "YARN-3.": ["branch2"],
+                "YARN-4.": ["branch2"],
+            },
+            result,
+        )
+
+    def test_same_lines_as_git_log_per_branch(self):
+        branches = ["branch1", "branch2", "branch3"]
+        lines_by_branch = {branch: [] for branch in branches}
+        git_log = MultiBranchGitLog(self.repo, branches)
+        for line, mask in git_log:
+            for idx in git_log.branch_indices(mask):
+                lines_by_branch[branches[idx]].append(line)
+        for branch in branches:
+            self.assertCountEqual(self.repo.log(branch, oneline_with_date=True), lines_by_branch[branch])
+
+    def test_find_commits_on_branches(self):
+        with tempfile.NamedTemporaryFile() as intermediate_results_file:
+            backported_jiras = SharedCommandUtils.find_commits_on_branches(
+                ["branch1", "branch3"], intermediate_results_file.name, self.repo, ["YARN-1", "YARN-3", "YARN-2"]
+            )
+        self.assertEqual(["branch1", "branch3"], backported_jiras["YARN-1"].commits[0].branches)
+        self.assertEqual(["branch1"], backported_jiras["YARN-2"].commits[0].branches)
+        self.assertEqual([], backported_jiras["YARN-3"].commits)
+
+
+class TestBranchContainmentIndex(GitRepoWithBranchesTestCase):
+    @classmethod
+    def setUpClass(cls):
+        ProjectUtils.set_root_determine_strategy(ProjectRootDeterminationStrategy.COMMON_FILE)
+        ProjectUtils.get_test_output_basedir(YARNDEVTOOLS_MODULE_NAME)
+        SimpleLoggingSetup.init_logger(
+            project_name=CommandType.JIRA_UMBRELLA_DATA_FETCHER.real_name,
+            logger_name_prefix=YARNDEVTOOLS_MODULE_NAME,
+            execution_mode=ExecutionMode.TEST,
+            console_debug=True,
+        )
+
+    def test_same_branches_as_git_branch_contains(self):
+        hashes = self.repo.log("origin/branch2", format="%H")
+        index = BranchContainmentIndex(self.repo)
+        index.add_commits(hashes)
+        for commit_hash in hashes:
+            self.assertCountEqual(
+                self.repo.branch(None, recursive=True, contains=commit_hash), index.get_branches(commit_hash)
+            )
+
+    def test_git_process_is_stopped_after_early_exit(self):
+        processes, readers = [], []
+        read_lines = shared_command_utils.read_git_process_lines
+
+        def read_git_process_lines(proc):
+            processes.append(proc)
+            readers.append(read_lines(proc))
+            return readers[-1]
+
+        tip = self.repo.log("origin/branch2", format="%H")[0]
+        with patch.object(shared_command_utils, "read_git_process_lines", side_effect=read_git_process_lines):
+            self.assertEqual(["origin/branch2"], BranchContainmentIndex(self.repo).get_branches(tip))
+        self.assertEqual(inspect.GEN_CLOSED, inspect.getgeneratorstate(readers[0]))
+        self.assertIsNotNone(processes[0].poll())
+
+    def test_cache_is_used_while_branches_are_not_changed(self):
+        hashes = self.repo.log("origin/branch2", format="%H")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            BranchContainmentIndex(self.repo, cache_dir=cache_dir).add_commits(hashes)
+            with patch.object(MultiBranchGitLog, "__iter__", side_effect=AssertionError("History should not be read")):
+                self.assertEqual(
+                    ["origin/branch2"], BranchContainmentIndex(self.repo, cache_dir).get_branches(hashes[0])
+                )
+
+            self.repo.repo.git.update_ref("refs/remotes/origin/branch1", hashes[0])
+            self.assertCountEqual(
+                ["origin/branch1", "origin/branch2"],
+                BranchContainmentIndex(self.repo, cache_dir).get_branches(hashes[0]),
+            )
+
+    def test_only_changed_branches_are_read_after_branch_moved(self):
+        hashes = self.repo.log("origin/branch2", format="%H")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            BranchContainmentIndex(self.repo, cache_dir=cache_dir).add_commits(hashes)
+            self.repo.repo.git.update_ref("refs/remotes/origin/branch3", hashes[0])
+
+            with patch.object(shared_command_utils, "MultiBranchGitLog", wraps=MultiBranchGitLog) as git_log:
+                index = BranchContainmentIndex(self.repo, cache_dir)
+                index.add_commits(hashes)
+                for commit_hash in hashes:
+                    self.assertCountEqual(
+                        self.repo.branch(None, recursive=True, contains=commit_hash), index.get_branches(commit_hash)
+                    )
+            self.assertEqual([call(self.repo, ["origin/branch3"])], git_log.call_args_list)
+
+            with patch.object(MultiBranchGitLog, "__iter__", side_effect=AssertionError("History should not be read")):
+                self.assertEqual(
+                    ["origin/branch2", "origin/branch3"],
+                    BranchContainmentIndex(self.repo, cache_dir).get_branches(hashes[0]),
+                )
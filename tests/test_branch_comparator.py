@@ -1,15 +1,40 @@
+import io
 import logging
+import os
+import subprocess
+import tempfile
 import unittest
-from unittest.mock import Mock
+from typing import List
+from unittest.mock import Mock, patch
 
 from git import Commit
+from pythoncommons.constants import ExecutionMode
+from pythoncommons.file_utils import FileUtils
 from pythoncommons.git_wrapper import GitWrapper
-from pythoncommons.project_utils import ProjectUtils
+from pythoncommons.logging_setup import SimpleLoggingSetup
+from pythoncommons.project_utils import ProjectRootDeterminationStrategy, ProjectUtils
 
-from tests.test_utilities import Object, TestUtilities, SANDBOX_REPO_DOWNSTREAM_HOTFIX
-from yarndevtools.commands.branchcomparator.branch_comparator import Branches, CommitMatchingAlgorithm, BranchComparator
-from yarndevtools.commands.branchcomparator.common import BranchType
-from yarndevtools.commands.branchcomparator.group_matching import GroupedMatchingResult
+from tests.test_utilities import Object, TestUtilities, SANDBOX_REPO_DOWNSTREAM_HOTFIX, TemporaryGitRepo
+from yarndevtools.commands.branchcomparator.branch_comparator import (
+    Branches,
+    BranchComparator,
+    BranchComparatorConfig,
+    CommitMatchingAlgorithm,
+)
+from yarndevtools.commands.branchcomparator.common import BranchData, BranchType
+from yarndevtools.commands.branchcomparator.legacy_script import NativeGitCompare
+from yarndevtools.commands.branchcomparator.group_matching import (
+    CommitGrouper,
+    GroupedMatchingResult,
+    JiraIdToCommitMappings,
+)
+from yarndevtools.commands.branchcomparator.simple_matching import (
+    SimpleMatchingResult,
+    SimpleOutputManager,
+    SparsePresenceMatrix,
+    PresenceMatrixWriter,
+)
+from yarndevtools.commands_common import CommitData, JiraIdChoosePreference
 from yarndevtools.common.shared_command_utils import RepoType, CommandType
 from yarndevtools.constants import YARNDEVTOOLS_MODULE_NAME, TRUNK
 
@@ -122,6 +147,8 @@ class TestBranchComparator(unittest.TestCase):
         def git_log_return(revision, **kwargs):
             if revision == merge_base_hash:
                 return [merge_base_commit_line]
+            if revision.startswith(f"{merge_base_hash}.."):
+                return log_lines[:-1]
             return log_lines
 
         # Fields: <hash> <commit message> <date> <author> <committer>
@@ -138,6 +165,9 @@ class TestBranchComparator(unittest.TestCase):
         downstream_repo: GitWrapper = Mock(spec=GitWrapper)
         downstream_repo.is_branch_exist.return_value = True
         downstream_repo.log.side_effect = git_log_return
+        downstream_repo.repo = Mock()
+        downstream_repo.repo.git.log.side_effect = lambda revision, **kwargs: FakeGitProcess(git_log_return(revision))
+        downstream_repo.repo.git.rev_list.return_value = str(len(log_lines))
 
         self._create_mock_merge_base(downstream_repo, merge_base_hash)
         upstream_repo = Mock(spec=GitWrapper)
@@ -176,3 +206,402 @@ class TestBranchComparator(unittest.TestCase):
             self.generate_args_e2e(), self.downstream_repo_wrapper, self.upstream_repo_wrapper, self.output_dir
         )
         comparator.run()
+
+
+class FakeGitProcess:
+    def __init__(self, lines):
+        self.stdout = io.BytesIO("".join(f"{line}\n" for line in lines).encode())
+        self.stderr = io.BytesIO()
+
+    def kill(self):
+        pass
+
+    def wait(self, stderr=b""):
+        return 0
+
+
+class FakeGitRepo:
+    def __init__(self, repo_path, merge_base_hash, log_lines_by_branch):
+        self.repo_path = repo_path
+        # Mimics GitWrapper.repo.git, which is used to stream git log output
+        self.repo = self
+        self.git = self
+        self.merge_base_hash = merge_base_hash
+        self.log_lines_by_branch = log_lines_by_branch
+        self.queried_revision_ranges = []
+        # Commits that are not listed in the log lines, e.g. the history before the merge-base
+        self.number_of_hidden_commits = 0
+
+    def log(self, revision_range, format=None, n=None, as_process=False, **kwargs):
+        if as_process:
+            return FakeGitProcess(self._log(revision_range))
+        if revision_range == self.merge_base_hash:
+            return [self.log_lines_by_branch[MASTER_BRANCH][-1]]
+        if format == "%H":
+            return [self.log_lines_by_branch[revision_range][0].split(" ")[0]]
+        return self._log(revision_range)
+
+    def _log(self, revision_range):
+        self.queried_revision_ranges.append(revision_range)
+        if ".." in revision_range:
+            since, branch = revision_range.split("..")
+            hashes = [line.split(" ")[0] for line in self.log_lines_by_branch[branch]]
+            return self.log_lines_by_branch[branch][: hashes.index(since)]
+        return self.log_lines_by_branch[revision_range]
+
+    def rev_list(self, revision, count=False):
+        return str(len(self.log_lines_by_branch[revision]) + self.number_of_hidden_commits)
+
+    def merge_base(self, ref1, ref2):
+        merge_base = Mock(spec=Commit)
+        merge_base.hexsha = ref1 if ref1 not in (FEATURE_BRANCH, MASTER_BRANCH) else self.merge_base_hash
+        return [merge_base]
+
+
+class TestBranchesGitLog(unittest.TestCase):
+    MERGE_BASE_LINE = "99999999999 CDPD-999. merge base 2021-09-01T04:35:52-08:00 a@cloudera.com a@cloudera.com"
+
+    @classmethod
+    def setUpClass(cls):
+        ProjectUtils.set_root_determine_strategy(ProjectRootDeterminationStrategy.COMMON_FILE)
+        ProjectUtils.get_test_output_basedir(YARNDEVTOOLS_MODULE_NAME)
+        SimpleLoggingSetup.init_logger(
+            project_name=CommandType.BRANCH_COMPARATOR.real_name,
+            logger_name_prefix=YARNDEVTOOLS_MODULE_NAME,
+            execution_mode=ExecutionMode.TEST,
+            console_debug=True,
+        )
+
+    def setUp(self):
+        self.output_dir = ProjectUtils.get_test_output_child_dir(CommandType.BRANCH_COMPARATOR.output_dir_name)
+        FileUtils.remove_dir(FileUtils.join_path(self.output_dir, "commit_cache"), force=True)
+        self.repo = FakeGitRepo(
+            "/tmp/some_repo",
+            "99999999999",
+            {
+                FEATURE_BRANCH: [
+                    "f1 YARN-1. feature commit 2021-09-03T04:35:52-08:00 a@cloudera.com a@cloudera.com",
+                    self.MERGE_BASE_LINE,
+                ],
+                MASTER_BRANCH: [
+                    "m1 YARN-1. feature commit 2021-09-02T04:35:52-08:00 a@cloudera.com a@cloudera.com",
+                    self.MERGE_BASE_LINE,
+                ],
+            },
+        )
+
+    def _execute_git_log(self, algorithm=CommitMatchingAlgorithm.SIMPLE):
+        args = TestBranchComparator.generate_args(algorithm=algorithm)
+        args.commit_cache = True
+        branch_names = {BranchType.FEATURE: FEATURE_BRANCH, BranchType.MASTER: MASTER_BRANCH}
+        branches = Branches(BranchComparatorConfig(self.output_dir, args, branch_names), self.repo, branch_names)
+        branches.execute_git_log()
+        return branches
+
+    def test_only_new_commits_are_parsed(self):
+        self._execute_git_log()
+        self.assertCountEqual([FEATURE_BRANCH, MASTER_BRANCH], self.repo.queried_revision_ranges)
+
+        self.repo.queried_revision_ranges = []
+        branches = self._execute_git_log()
+        self.assertEqual([], self.repo.queried_revision_ranges)
+        self.assertEqual(["99999999999", "m1"], [c.hash for c in branches.get_branch(BranchType.MASTER).commit_objs])
+
+        self.repo.log_lines_by_branch[MASTER_BRANCH].insert(
+            0, 'm2 Revert "YARN-2. new commit" 2021-09-04T04:35:52-08:00 b@cloudera.com b@cloudera.com'
+        )
+        branches = self._execute_git_log()
+        self.assertEqual([f"m1..{MASTER_BRANCH}"], self.repo.queried_revision_ranges)
+        master_br = branches.get_branch(BranchType.MASTER)
+        self.assertEqual(["99999999999", "m1", "m2"], [c.hash for c in master_br.commit_objs])
+        self.assertEqual(["YARN-2"], list(master_br.jira_id_to_commits.keys() - {"CDPD-999", "YARN-1"}))
+        self.assertTrue(master_br.commit_objs[-1].reverted)
+        self.assertEqual("a@cloudera.com", master_br.commit_objs[1].author)
+
+    def test_commit_cache_is_not_used_with_different_parse_config(self):
+        self._execute_git_log()
+        parse_config = Branches._create_git_log_parse_config()
+        parse_config.jira_id_parse_strategy.choose_preference = JiraIdChoosePreference.LAST
+
+        self.repo.queried_revision_ranges = []
+        with patch.object(Branches, "_create_git_log_parse_config", return_value=parse_config):
+            self._execute_git_log()
+        self.assertCountEqual([FEATURE_BRANCH, MASTER_BRANCH], self.repo.queried_revision_ranges)
+
+        self.repo.queried_revision_ranges = []
+        with patch.object(Branches, "_create_git_log_parse_config", return_value=parse_config):
+            self._execute_git_log()
+        self.assertEqual([], self.repo.queried_revision_ranges)
+
+    def test_large_git_logs_are_parsed_with_process_pool(self):
+        with patch("yarndevtools.commands.branchcomparator.branch_comparator.PARALLEL_PARSE_CHUNK_SIZE", 2):
+            branches = self._execute_git_log()
+        self.assertEqual(["99999999999", "m1"], [c.hash for c in branches.get_branch(BranchType.MASTER).commit_objs])
+        self.assertEqual(["99999999999", "f1"], [c.hash for c in branches.get_branch(BranchType.FEATURE).commit_objs])
+        self.assertEqual("YARN-1", branches.get_branch(BranchType.FEATURE).commit_objs[1].jira_id)
+
+    def test_only_commits_after_merge_base_are_queried(self):
+        self.repo.number_of_hidden_commits = 5
+        branches = self._execute_git_log(algorithm=CommitMatchingAlgorithm.GROUPED)
+        self.assertCountEqual(
+            [f"99999999999..{FEATURE_BRANCH}", f"99999999999..{MASTER_BRANCH}"], self.repo.queried_revision_ranges
+        )
+        for br_type, commit_hash in [(BranchType.FEATURE, "f1"), (BranchType.MASTER, "m1")]:
+            branch = branches.get_branch(br_type)
+            self.assertEqual(["99999999999", commit_hash], [c.hash for c in branch.commit_objs])
+            self.assertEqual([], branch.commits_before_merge_base)
+            self.assertEqual(["99999999999", commit_hash], [c.hash for c in branch.commits_after_merge_base])
+            self.assertEqual("CDPD-999", branch.commit_objs[0].jira_id)
+            self.assertEqual(7, branch.number_of_commits)
+        self.assertIsNot(
+            branches.get_branch(BranchType.FEATURE).commit_objs[0],
+            branches.get_branch(BranchType.MASTER).commit_objs[0],
+        )
+
+
+class TestCommitGrouper(unittest.TestCase):
+    @staticmethod
+    def _create_branch_data(br_type: BranchType, log_lines: List[str]) -> BranchData:
+        branch = BranchData(br_type, br_type.name)
+        commits = CommitData.from_git_log_output(log_lines, Branches._create_git_log_parse_config())
+        branch.commits_after_merge_base = commits
+        branch.commits_after_merge_base_filtered = commits
+        return branch
+
+    def _create_grouper(self, log_lines: List[str]) -> CommitGrouper:
+        branch_data = {br_type: self._create_branch_data(br_type, log_lines) for br_type in BranchType}
+        return CommitGrouper(branch_data, JiraIdToCommitMappings(branch_data))
+
+    def test_commits_are_grouped_transitively_by_jira_ids(self):
+        grouper = self._create_grouper(
+            [
+                "h1 COMPX-1: YARN-1. First 2021-09-01T00:00:00+00:00 a@apache.org a@apache.org",
+                "h2 YARN-2. Second 2021-09-02T00:00:00+00:00 a@apache.org a@apache.org",
+                "h3 COMPX-2: YARN-1. Third 2021-09-03T00:00:00+00:00 a@apache.org a@apache.org",
+                "h4 COMPX-2: YARN-3. Fourth 2021-09-04T00:00:00+00:00 a@apache.org a@apache.org",
+            ]
+        )
+        groups = grouper.groups_by_jira_id_dict()[BranchType.MASTER]
+        self.assertEqual(
+            [frozenset({"COMPX-1", "COMPX-2", "YARN-1", "YARN-3"}), frozenset({"YARN-2"})], list(groups.keys())
+        )
+        self.assertEqual(["h1", "h3", "h4"], list(groups.values())[0].commit_hashes)
+
+    def test_long_chain_of_jira_ids(self):
+        # Each commit links two consecutive Jira IDs, so all commits end up in one group
+        log_lines = [
+            f"h{i} YARN-{i} YARN-{i + 1}. Commit 2021-09-01T00:00:00+00:00 a@apache.org a@apache.org"
+            for i in range(3000)
+        ]
+        grouper = self._create_grouper(log_lines)
+        groups = grouper.groups_by_jira_id_dict()[BranchType.FEATURE]
+        self.assertEqual(1, len(groups))
+        self.assertEqual(3000, list(groups.values())[0].size)
+        self.assertIs(grouper.groups_by_jira_id_dict(), grouper.groups_by_jira_id_dict())
+
+
+class TestBranchData(unittest.TestCase):
+    LOG_LINES = [
+        "h1 YARN-1. First 2021-09-01T00:00:00+00:00 a@apache.org a@apache.org",
+        "h2 Same message 2021-09-02T00:00:00+00:00 a@apache.org a@apache.org",
+        "h3 Same message 2021-09-03T00:00:00+00:00 a@apache.org a@apache.org",
+    ]
+
+    def setUp(self):
+        self.commits = CommitData.from_git_log_output(self.LOG_LINES, Branches._create_git_log_parse_config())
+        self.branch = BranchData(BranchType.MASTER, "master")
+
+    def test_commits_by_hashes_are_invalidated_on_change(self):
+        self.branch.commits_after_merge_base_filtered = self.commits
+        self.assertCountEqual(["h1", "h3"], list(self.branch.get_commits_by_hashes({"h1", "h3", "h4"}).keys()))
+        self.assertIs(self.branch.filtered_commits_by_hash, self.branch.filtered_commits_by_hash)
+
+        self.branch.commits_after_merge_base_filtered = self.commits[:1]
+        self.assertEqual({"h1"}, self.branch.get_commit_hashes())
+
+    def test_commits_by_message_are_invalidated_on_change(self):
+        self.branch.commits_with_missing_jira_id_filtered = {c.hash: c for c in self.commits[1:]}
+        by_message = self.branch.filtered_commits_by_message
+        self.assertEqual(["h2", "h3"], [c.hash for c in by_message["Same message"]])
+        self.assertIs(by_message, self.branch.filtered_commits_by_message)
+
+        self.branch.commits_with_missing_jira_id_filtered = {}
+        self.assertEqual({}, self.branch.filtered_commits_by_message)
+
+
+class TestSimpleCommitMatcher(unittest.TestCase):
+    MERGE_BASE_LINE = TestBranchesGitLog.MERGE_BASE_LINE
+
+    @classmethod
+    def setUpClass(cls):
+        TestBranchesGitLog.setUpClass()
+
+    def setUp(self):
+        self.output_dir = ProjectUtils.get_test_output_child_dir(CommandType.BRANCH_COMPARATOR.output_dir_name)
+
+    def _compare(self, log_lines_by_branch) -> SimpleMatchingResult:
+        repo = FakeGitRepo("/tmp/some_repo", "99999999999", log_lines_by_branch)
+        args = TestBranchComparator.generate_args(algorithm=CommitMatchingAlgorithm.SIMPLE)
+        branch_names = {BranchType.FEATURE: FEATURE_BRANCH, BranchType.MASTER: MASTER_BRANCH}
+        branches = Branches(BranchComparatorConfig(self.output_dir, args, branch_names), repo, branch_names)
+        branches.execute_git_log()
+        branches.pre_compare()
+        return branches.compare()
+
+    def test_commits_are_matched_by_jira_id_and_normalized_message(self):
+        result = self._compare(
+            {
+                MASTER_BRANCH: [
+                    "m4 Master only message 2021-09-04T00:00:00+00:00 a@apache.org a@apache.org",
+                    "m3 YARN-3. Master only 2021-09-03T00:00:00+00:00 a@apache.org a@apache.org",
+                    "m2 Fix  the build 2021-09-02T00:00:00+00:00 a@apache.org a@apache.org",
+                    "m1 YARN-1. First 2021-09-01T00:00:00+00:00 a@apache.org a@apache.org",
+                    self.MERGE_BASE_LINE,
+                ],
+                FEATURE_BRANCH: [
+                    "f3 YARN-4. Feature only 2021-09-07T00:00:00+00:00 a@apache.org a@apache.org",
+                    "f2 Fix the build 2021-09-06T00:00:00+00:00 a@apache.org a@apache.org",
+                    "f1 YARN-1. First 2021-09-05T00:00:00+00:00 a@apache.org a@apache.org",
+                    self.MERGE_BASE_LINE,
+                ],
+            }
+        )
+
+        self.assertEqual(
+            [("99999999999", "99999999999"), ("m1", "f1")], [(mc.hash, fc.hash) for mc, fc in result.matched_both]
+        )
+        self.assertEqual([("m2", "f2")], [(mc.hash, fc.hash) for mc, fc in result.matched_only_by_message])
+        self.assertEqual(["m3", "m4"], [c.hash for c in result.unique_commits[BranchType.MASTER]])
+        self.assertEqual(["f3"], [c.hash for c in result.unique_commits[BranchType.FEATURE]])
+
+
+class TestPresenceMatrixWriter(unittest.TestCase):
+    def setUp(self):
+        commits = CommitData.from_git_log_output(
+            [
+                "h1 YARN-1. First <b> 2021-09-01T00:00:00+00:00 a@apache.org a@apache.org",
+                "h2 Without Jira ID 2021-09-02T00:00:00+00:00 a@apache.org b@apache.org",
+            ],
+            Branches._create_git_log_parse_config(),
+        )
+        self.matrix = SparsePresenceMatrix(commits, ["feature", "master"], [{0}, {0, 1}])
+
+    def test_rows_are_generated_from_sparse_presence(self):
+        self.assertEqual(
+            [
+                ["YARN-1", "YARN-1. First <b>", "2021-09-01T00:00:00+00:00", "a@apache.org", True, True],
+                [None, "Without Jira ID", "2021-09-02T00:00:00+00:00", "b@apache.org", False, True],
+            ],
+            list(self.matrix.rows()),
+        )
+
+    def test_write_text(self):
+        stream = io.StringIO()
+        PresenceMatrixWriter(self.matrix).write_text(stream)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(6, len(lines))
+        self.assertEqual(
+            "| Row | Jira ID | Commit message    | Commit date               | Committer    | feature | master |",
+            lines[1],
+        )
+        self.assertEqual(
+            "| 2   |         | Without Jira ID   | 2021-09-02T00:00:00+00:00 | b@apache.org | -       | X      |",
+            lines[4],
+        )
+        self.assertEqual(len(lines[0]), len(lines[4]))
+
+    def test_write_html(self):
+        stream = io.StringIO()
+        PresenceMatrixWriter(self.matrix).write_html(stream)
+        result = stream.getvalue()
+        self.assertIn("<td>YARN-1. First &lt;b&gt;</td>", result)
+        self.assertIn('<td style="color: green">X</td><td style="color: green">X</td></tr>', result)
+        self.assertIn('<td style="color: red">-</td><td style="color: red">X</td></tr>', result)
+
+    def test_all_commits_printed_to_console_in_console_mode(self):
+        config = Object()
+        config.console_mode = True
+        config.output_dir = None
+        output_manager = SimpleOutputManager(config, {BranchType.FEATURE: "feature", BranchType.MASTER: "master"})
+        # Live logging of pytest would reset the patched stdout
+        with patch("yarndevtools.commands.branchcomparator.simple_matching.LOG"):
+            with patch("sys.stdout", new_callable=io.StringIO) as stream:
+                output_manager.write_all_commits(self.matrix)
+        expected = io.StringIO()
+        PresenceMatrixWriter(self.matrix).write_text(expected)
+        self.assertEqual(expected.getvalue(), stream.getvalue())
+
+    def test_all_commits_written_to_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config = Object()
+            config.console_mode = False
+            config.output_dir = tmp_dir
+            output_manager = SimpleOutputManager(config, {BranchType.FEATURE: "feature", BranchType.MASTER: "master"})
+            output_manager.write_all_commits(self.matrix)
+            self.assertEqual(["all-commits-merged.html", "all-commits-merged.txt"], sorted(os.listdir(tmp_dir)))
+
+
+class TestNativeGitCompare(unittest.TestCase):
+    def setUp(self):
+        self.tmp_repo = TemporaryGitRepo()
+
+        def commit(*messages):
+            for message in messages:
+                self.tmp_repo.commit(message)
+
+        commit("YARN-100. Common commit", "HADOOP-1. Another common commit")
+        base = self.tmp_repo.git_repo.head.commit
+        master = self.tmp_repo.create_branch("master-branch", base)
+        feature = self.tmp_repo.create_branch("feature-branch", base)
+        master.checkout()
+        commit("YARN-10. Master only", "HADOOP-5 and YARN-6 fix", "Without Jira ID")
+        feature.checkout()
+        commit("YARN-1. Substring of a master commit", "YARN-7. Feature only", "CDPD-3: YARN-6 backport")
+        side = self.tmp_repo.commit("YARN-9. Side branch", head=False)
+        self.tmp_repo.commit("YARN-8. Merge side branch", parents=[feature.commit, side])
+        # Merge commits are skipped, also when checking if a Jira ID is mentioned
+        master.checkout()
+        self.tmp_repo.commit("CDPD-3. Merge", parents=[master.commit, base])
+        self.repo = self.tmp_repo.repo
+
+    def tearDown(self):
+        self.tmp_repo.cleanup()
+
+    def _create_branch_data(self, br_type: BranchType, name: str) -> BranchData:
+        branch = BranchData(br_type, name)
+        lines = self.repo.log(name, oneline_with_date_author_committer=True)
+        branch.set_commit_objs(
+            list(reversed(CommitData.from_git_log_output(lines, Branches._create_git_log_parse_config())))
+        )
+        return branch
+
+    def _run_script(self, base: str, other: str) -> List[str]:
+        repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = os.path.join(repo_root, "legacy-scripts", "branch-comparator", "git_compare.sh")
+        output = subprocess.check_output(["bash", script, base, other], cwd=self.tmp_repo.path, text=True)
+        return output.splitlines()
+
+    def _native_output(self, base: BranchData, other: BranchData) -> List[str]:
+        with tempfile.TemporaryDirectory() as output_dir:
+            merge_hashes = NativeGitCompare.get_merge_commit_hashes(self.repo, [base.name, other.name])
+            _, output = NativeGitCompare._compare(base, other, output_dir, merge_hashes)
+        return output.splitlines()
+
+    def test_same_output_as_legacy_script(self):
+        master_br = self._create_branch_data(BranchType.MASTER, "master-branch")
+        feature_br = self._create_branch_data(BranchType.FEATURE, "feature-branch")
+
+        self.assertCountEqual(
+            [
+                "YARN-9 exists on branch=feature-branch, but not exist on master-branch",
+                "CDPD-3 exists on branch=feature-branch, but not exist on master-branch",
+                "YARN-7 exists on branch=feature-branch, but not exist on master-branch",
+            ],
+            self._native_output(master_br, feature_br),
+        )
+        self.assertEqual(
+            self._run_script("master-branch", "feature-branch"), self._native_output(master_br, feature_br)
+        )
+        self.assertEqual(
+            self._run_script("feature-branch", "master-branch"), self._native_output(feature_br, master_br)
+        )
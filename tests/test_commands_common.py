@@ -0,0 +1,59 @@
+import datetime
+import unittest
+
+from git import GitCommandError
+from pythoncommons.git_wrapper import GitLogLineFormat
+
+from tests.test_utilities import TemporaryGitRepo
+from yarndevtools.commands_common import CommitData, GitLogParseConfig, GitLogStream
+
+
+class TestGitLogStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp_repo = TemporaryGitRepo()
+        for message in ["YARN-1. First commit", "YARN-2. Second commit", 'Revert "YARN-2. Second commit"']:
+            self.tmp_repo.commit(message)
+        self.repo = self.tmp_repo.repo
+
+    def tearDown(self):
+        self.tmp_repo.cleanup()
+
+    def test_stream_is_equivalent_to_git_log(self):
+        stream = GitLogStream(self.repo, "HEAD", GitLogLineFormat.ONELINE_WITH_DATE_AUTHOR_COMMITTER)
+        self.assertEqual(self.repo.log("HEAD", oneline_with_date_author_committer=True), list(stream))
+
+    def test_parse_stream(self):
+        parse_config = GitLogParseConfig(log_format=GitLogLineFormat.ONELINE_WITH_DATE_AND_AUTHOR)
+        stream = GitLogStream(self.repo, "HEAD", GitLogLineFormat.ONELINE_WITH_DATE_AND_AUTHOR)
+
+        commits = list(CommitData.from_git_log_stream(stream, parse_config))
+
+        self.assertEqual(["YARN-2", "YARN-2", "YARN-1"], [c.jira_id for c in commits])
+        self.assertEqual([True, False, False], [c.reverted for c in commits])
+        self.assertEqual({"author@apache.org"}, {c.author for c in commits})
+
+    def test_stream_with_unknown_revision(self):
+        stream = GitLogStream(self.repo, "unknown_branch", GitLogLineFormat.ONELINE_WITH_DATE)
+        with self.assertRaises(GitCommandError):
+            list(stream)
+
+    def test_stream_closed_early(self):
+        lines = iter(GitLogStream(self.repo, "HEAD", GitLogLineFormat.ONELINE_WITH_DATE))
+        self.assertIn("Revert", next(lines))
+        lines.close()
+        self.assertEqual([], list(lines))
+
+
+class TestCommitData(unittest.TestCase):
+    def test_timestamp_is_parsed_once(self):
+        commit = CommitData("hash", "YARN-1", "YARN-1. Message", "2021-09-28T04:17:22-07:00")
+        expected = datetime.datetime(2021, 9, 28, 11, 17, 22, tzinfo=datetime.timezone.utc).timestamp()
+        self.assertEqual(expected, commit.timestamp)
+
+        commit.date = "invalid date"
+        self.assertEqual(expected, commit.timestamp)
+
+    def test_timestamp_with_different_offsets(self):
+        commit1 = CommitData("hash1", "YARN-1", "YARN-1. Message", "2021-09-28T04:17:22-07:00")
+        commit2 = CommitData("hash2", "YARN-2", "YARN-2. Message", "2021-09-28T12:17:21+01:00")
+        self.assertEqual([commit2, commit1], sorted([commit1, commit2], key=lambda c: c.timestamp))
@@ -1,20 +1,35 @@
+import datetime
 import logging
 import os
 import unittest
+from unittest.mock import patch
 
 from pythoncommons.constants import ExecutionMode
+from pythoncommons.file_utils import FileUtils
 from pythoncommons.logging_setup import SimpleLoggingSetup
 from pythoncommons.project_utils import ProjectRootDeterminationStrategy, ProjectUtils
 
-from tests.test_utilities import TestUtilities
+from tests.test_utilities import TestUtilities, Object
 from yarndevtools.common.shared_command_utils import CommandType
+from yarndevtools.commands.unittestresultaggregator.common.aggregation import AggregationResults
+from yarndevtools.commands.unittestresultaggregator.common.columnar import ColumnarTestFailures
 from yarndevtools.commands.unittestresultaggregator.common.model import (
     AggregateFilter,
     TestCaseFilter,
     TestCaseFilterDefinitions,
+    FailedBuildAbs,
 )
-from yarndevtools.commands.unittestresultaggregator.constants import MatchExpression
-from yarndevtools.constants import YARNDEVTOOLS_MODULE_NAME
+from yarndevtools.commands.unittestresultaggregator.constants import MatchExpression, SummaryMode, OperationMode
+from yarndevtools.commands.unittestresultaggregator.email.config import UnitTestResultAggregatorGSheetConfig
+from yarndevtools.commands.unittestresultaggregator.representation import (
+    SummaryGenerator,
+    ResultPrinter,
+    DataConverter,
+    OutputFormatRules,
+)
+from yarndevtools.commands.unittestresultaggregator.db.model import EmailContent
+from yarndevtools.commands.unittestresultaggregator.gsheet import KnownTestFailures, BatchGSheetWrapper, WorksheetUpdate
+from yarndevtools.constants import YARNDEVTOOLS_MODULE_NAME, ReportFile
 
 CDP_7X = "CDPD-7.x"
 CDP_71X = "CDPD-7.1.x"
@@ -133,3 +148,371 @@ class TestTestCaseFilters(unittest.TestCase):
 
         # Test complements - intersection of non_aggregate vs. aggregate sets is empty
         self.assertCountEqual(set(aggregate).intersection(set(non_aggregate)), set())
+
+
+class FakeGSheetWrapper:
+    def __init__(self, rows, revision=None, row_count=100):
+        self.rows = rows
+        self.read_calls = 0
+        self.read_ranges = []
+        self.options = Object()
+        self.options.spreadsheet = "spreadsheet"
+        self.client = FakeSheetsClient(
+            FakeSpreadsheet([], revision=revision, row_count=row_count, batch_get=self.batch_get)
+        )
+
+    def batch_get(self, ranges):
+        # Serves the batch_get requests of the worksheets of the fake spreadsheet
+        self.read_calls += 1
+        self.read_ranges = ranges
+        pages = []
+        for range in ranges:
+            start, end = [int(cell.lstrip("ABCDE")) for cell in range.split(":")]
+            pages.append([list(row) for row in self.rows[start - 1 : end]])
+        return pages
+
+
+YARN_TC_1 = "org.apache.hadoop.yarn.TestA.testOne"
+YARN_TC_2 = "org.apache.hadoop.yarn.TestB.testTwo"
+YARN_TC_3 = "org.apache.hadoop.yarn.TestC.testThree"
+MR_TC_1 = "org.apache.hadoop.mapreduce.TestD.testFour"
+
+
+class TestAggregationResults(unittest.TestCase):
+    columnar_store = False
+
+    @classmethod
+    def setUpClass(cls):
+        ProjectUtils.set_root_determine_strategy(ProjectRootDeterminationStrategy.COMMON_FILE)
+        ProjectUtils.get_test_output_basedir(YARNDEVTOOLS_MODULE_NAME)
+        cls.filter_defs = TestCaseFilterDefinitions(
+            TestCaseFilterDefinitions.convert_raw_match_expressions_to_objs([YARN_EXPRESSION, MR_EXPRESSION]),
+            [CDP_7X],
+        )
+        cls.yarn_7x_filter = TestCaseFilter(
+            MatchExpression("YARN", YARN_EXPRESSION, YARN_PATTERN), AggregateFilter(CDP_7X), aggregate=True
+        )
+
+    @staticmethod
+    def _create_failed_build(build_number: int, date: datetime.datetime, testcases):
+        job_name = f"Mawo-UT-hadoop-{CDP_7X}"
+        build_url = f"http://jenkins/job/{job_name}/{build_number}/"
+        email_content = EmailContent(
+            f"msg_{build_number}",
+            "thread",
+            date,
+            f"subject {build_number}",
+            build_url,
+            job_name,
+            build_number,
+            testcases,
+        )
+        return FailedBuildAbs.create_from_email(email_content)
+
+    def _aggregate(self, *failed_builds):
+        known_failures = KnownTestFailures(
+            gsheet_wrapper=FakeGSheetWrapper([["Testcase", "Jira", "Resolution date"], [YARN_TC_1, "YARN-1", ""]]),
+            gsheet_jira_table="known failures",
+        )
+        result = AggregationResults(self.filter_defs, known_failures, columnar_store=self.columnar_store)
+        for failed_build in failed_builds:
+            result.start_new_context()
+            result.match_testcases(failed_build)
+            result.finish_context(failed_build)
+        result.finish_processing()
+        return result
+
+    def test_finish_processing_aggregated_failures(self):
+        result = self._aggregate(
+            self._create_failed_build(1, datetime.datetime(2023, 1, 1), [YARN_TC_1, YARN_TC_2, MR_TC_1]),
+            self._create_failed_build(2, datetime.datetime(2023, 1, 3), [YARN_TC_1, YARN_TC_3]),
+            self._create_failed_build(3, datetime.datetime(2023, 1, 2), [YARN_TC_1]),
+        )
+        aggregated = {tc.simple_name: tc for tc in result.get_aggregated_testcases_by_filters(self.yarn_7x_filter)}
+        self.assertCountEqual([YARN_TC_1, YARN_TC_2, YARN_TC_3], aggregated.keys())
+        self.assertEqual(3, aggregated[YARN_TC_1].failure_freq)
+        self.assertEqual(datetime.datetime(2023, 1, 3), aggregated[YARN_TC_1].latest_failure)
+        self.assertEqual(
+            [datetime.datetime(2023, 1, 1), datetime.datetime(2023, 1, 3), datetime.datetime(2023, 1, 2)],
+            aggregated[YARN_TC_1].failure_dates,
+        )
+        self.assertTrue(aggregated[YARN_TC_1].known_failure)
+        self.assertFalse(aggregated[YARN_TC_2].known_failure)
+
+    def test_finish_processing_latest_failures_and_comparison(self):
+        result = self._aggregate(
+            self._create_failed_build(1, datetime.datetime(2023, 1, 1), [YARN_TC_1, YARN_TC_2]),
+            self._create_failed_build(2, datetime.datetime(2023, 1, 2), [YARN_TC_1, YARN_TC_3]),
+        )
+        latest = [tc.full_name() for tc in result.get_latest_failures(self.yarn_7x_filter)]
+        self.assertCountEqual([YARN_TC_1, YARN_TC_3], latest)
+
+        comparison = result.get_build_comparison(self.yarn_7x_filter)
+        self.assertEqual([YARN_TC_2], [tc.simple_name() for tc in comparison.fixed])
+        self.assertEqual([YARN_TC_1], [tc.simple_name() for tc in comparison.still_failing])
+        self.assertEqual([YARN_TC_3], [tc.simple_name() for tc in comparison.new])
+
+    def test_summary_tables_are_rendered_once(self):
+        result = self._aggregate(
+            self._create_failed_build(1, datetime.datetime(2023, 1, 1), [YARN_TC_1, YARN_TC_2]),
+            self._create_failed_build(2, datetime.datetime(2023, 1, 2), [YARN_TC_1, YARN_TC_3]),
+        )
+        config = Object()
+        config.summary_mode = SummaryMode.ALL.value
+        config.abbrev_tc_package = None
+        config.truncate_origin_with = None
+        config.testcase_filter_defs = self.filter_defs
+        config.operation_mode = OperationMode.GSHEET
+        config.get_worksheet_name = UnitTestResultAggregatorGSheetConfig.get_worksheet_name
+        query_result = Object()
+        query_result.subjects_and_ids = [("subject 1", "thread")]
+        query_result.unique_subjects = ["subject 1"]
+        output_manager = FakeOutputManager()
+
+        with patch.object(ResultPrinter, "print_tables", wraps=ResultPrinter.print_tables) as print_tables:
+            SummaryGenerator.process_aggregation_results(result, query_result, config, output_manager)
+
+        # Short report tables are part of the detailed report as well, but each table should only be rendered once
+        rendered_tables = [(tuple(kwargs["header"]), id(kwargs["data"])) for _, kwargs in print_tables.call_args_list]
+        self.assertEqual(len(set(rendered_tables)), len(rendered_tables))
+        self.assertCountEqual(
+            [
+                ReportFile.SHORT_TXT.value,
+                ReportFile.SHORT_HTML.value,
+                ReportFile.DETAILED_TXT.value,
+                ReportFile.DETAILED_HTML.value,
+            ],
+            output_manager.summaries.keys(),
+        )
+        self.assertIn(YARN_TC_3, output_manager.summaries[ReportFile.DETAILED_HTML.value])
+        self.assertEqual(len(self.filter_defs.ALL_VALID_FILTERS), len(output_manager.sheet_updates))
+
+
+class FakeOutputManager:
+    def __init__(self):
+        self.summaries = {}
+        self.sheet_updates = []
+
+    def process_regular_summary(self, rendered_summary: str, filename: str):
+        self.summaries[filename] = rendered_summary
+
+    def process_html_summary(self, rendered_summary: str, filename: str):
+        self.summaries[filename] = rendered_summary
+
+    def process_rendered_table_data(self, table_renderer, data_type):
+        table_renderer.get_tables(data_type)
+
+    def update_gsheet_batch(self, updates, create_not_existing=False):
+        self.sheet_updates.extend(updates)
+
+
+class TestAggregationResultsWithColumnarStore(TestAggregationResults):
+    columnar_store = True
+
+    def test_columnar_store_counts_and_deduplicates(self):
+        failed_build_1 = self._create_failed_build(1, datetime.datetime(2023, 1, 1), [YARN_TC_1, YARN_TC_2])
+        failed_build_2 = self._create_failed_build(
+            2, datetime.datetime(2023, 1, 2), [YARN_TC_1, YARN_TC_3 + "[1]", YARN_TC_3 + "[2]"]
+        )
+        result = self._aggregate(failed_build_1, failed_build_2, failed_build_1)
+
+        store: ColumnarTestFailures = result._aggregation_results.test_failures
+        self.assertIsInstance(store, ColumnarTestFailures)
+        aggregated = {tc.simple_name: tc for tc in result.get_aggregated_testcases_by_filters(self.yarn_7x_filter)}
+        self.assertEqual(
+            {YARN_TC_1: 2, YARN_TC_2: 1, YARN_TC_3: 2}, {name: tc.failure_freq for name, tc in aggregated.items()}
+        )
+        self.assertEqual(
+            {
+                YARN_TC_1: datetime.datetime(2023, 1, 2),
+                YARN_TC_2: datetime.datetime(2023, 1, 1),
+                YARN_TC_3: datetime.datetime(2023, 1, 2),
+            },
+            {name: tc.latest_failure for name, tc in aggregated.items()},
+        )
+        self.assertEqual("N/A", aggregated[YARN_TC_3].full_name)
+        self.assertEqual(5, len(result.get_failures(self.yarn_7x_filter)))
+
+    def test_columnar_store_keeps_build_properties_in_columns(self):
+        failed_build_1 = self._create_failed_build(1, datetime.datetime(2023, 1, 1), [YARN_TC_1, YARN_TC_2])
+        failed_build_2 = self._create_failed_build(2, datetime.datetime(2023, 1, 2), [YARN_TC_1])
+        result = self._aggregate(failed_build_1, failed_build_2)
+
+        store: ColumnarTestFailures = result._aggregation_results.test_failures
+        self.assertEqual(2, len(store.build_dates))
+        failures = store[self.yarn_7x_filter]
+        self.assertEqual(
+            [(YARN_TC_1, datetime.datetime(2023, 1, 1)), (YARN_TC_2, datetime.datetime(2023, 1, 1))],
+            [(f.full_name(), f.date()) for f in failures[:2]],
+        )
+        self.assertEqual(failed_build_2.origin(), failures[2].origin())
+        self.assertEqual(failed_build_2.build_url(), failures[2].build_url())
+        # Builds are shared by the testcases, testcases are not kept by the store
+        self.assertIs(failures[0].failed_build(), failures[1].failed_build())
+        self.assertIsNot(failures[0], store[self.yarn_7x_filter][0])
+
+    def test_columnar_store_renders_same_rows(self):
+        failed_builds = [
+            self._create_failed_build(1, datetime.datetime(2023, 1, 1), [YARN_TC_1, YARN_TC_2]),
+            self._create_failed_build(2, datetime.datetime(2023, 1, 2), [YARN_TC_1, YARN_TC_3]),
+        ]
+        out_fmt = OutputFormatRules(truncate_length=False, abbrev_tc_package=None, truncate_origin_with=None)
+        rows_by_store = []
+        for columnar_store in [False, True]:
+            self.columnar_store = columnar_store
+            result = self._aggregate(*failed_builds)
+            rows_by_store.append(DataConverter.convert_data_to_rows(result.get_failures(self.yarn_7x_filter), out_fmt))
+
+        self.assertEqual(rows_by_store[0], rows_by_store[1])
+        self.assertEqual(["msg_2", "thread"], rows_by_store[1][-1][3:])
+
+
+class FakeWorksheet:
+    def __init__(self, title, row_count=1000, batch_get=None):
+        self.title = title
+        self.row_count = row_count
+        self.batch_get = batch_get
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheet_titles, revision=None, row_count=1000, batch_get=None):
+        self.title = "spreadsheet"
+        self.worksheet_titles = list(worksheet_titles)
+        self.revision = revision
+        self.row_count = row_count
+        self.batch_get = batch_get
+        self.calls = []
+        self.values = {}
+
+    def get_lastUpdateTime(self):
+        if not self.revision:
+            raise ValueError("Revision is not available")
+        return self.revision
+
+    def worksheet(self, title):
+        return FakeWorksheet(title, row_count=self.row_count, batch_get=self.batch_get)
+
+    def worksheets(self):
+        self.calls.append("worksheets")
+        return [FakeWorksheet(title) for title in self.worksheet_titles]
+
+    def batch_update(self, body):
+        self.calls.append("batch_update")
+        self.worksheet_titles.extend(r["addSheet"]["properties"]["title"] for r in body["requests"])
+
+    def values_batch_clear(self, params=None, body=None):
+        self.calls.append("values_batch_clear")
+        self.cleared_ranges = body["ranges"]
+
+    def values_batch_update(self, params=None, body=None):
+        self.calls.append("values_batch_update")
+        for d in body["data"]:
+            self.values[d["range"]] = d["values"]
+
+
+class FakeSheetsClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self.open_calls = 0
+
+    def open(self, title):
+        self.open_calls += 1
+        return self.spreadsheet
+
+
+class TestBatchGSheetWrapper(unittest.TestCase):
+    @staticmethod
+    def _create_gsheet_wrapper(worksheets, existing_worksheets):
+        # Skip the constructor as it authorizes with the Google API
+        gsheet_wrapper = BatchGSheetWrapper.__new__(BatchGSheetWrapper)
+        gsheet_wrapper.options = Object()
+        gsheet_wrapper.options.spreadsheet = "spreadsheet"
+        gsheet_wrapper.options.worksheets = worksheets
+        gsheet_wrapper.client = FakeSheetsClient(FakeSpreadsheet(existing_worksheets))
+        return gsheet_wrapper
+
+    def test_write_data_batch_uses_constant_number_of_calls(self):
+        for no_of_worksheets in [1, 10, 50]:
+            worksheets = [f"ws_{i}" for i in range(no_of_worksheets)]
+            gsheet_wrapper = self._create_gsheet_wrapper(worksheets, worksheets[:1])
+            client = gsheet_wrapper.client
+            updates = [WorksheetUpdate(ws, ["Testcase", "Count"], [[f"tc_{ws}", 1]]) for ws in worksheets]
+
+            gsheet_wrapper.write_data_batch(updates, create_not_existing_worksheet=True)
+
+            self.assertEqual(1, client.open_calls)
+            expected_calls = ["worksheets", "values_batch_clear", "values_batch_update"]
+            if no_of_worksheets > 1:
+                expected_calls.insert(1, "batch_update")
+            self.assertEqual(expected_calls, client.spreadsheet.calls)
+            self.assertEqual([["Testcase", "Count"], ["tc_ws_0", 1]], client.spreadsheet.values["'ws_0'!A1:B2"])
+            self.assertEqual(no_of_worksheets, len(client.spreadsheet.values))
+            self.assertIn("'ws_0'!A1:Z10000", client.spreadsheet.cleared_ranges)
+            self.assertIn("'ws_0'!A1:A1", client.spreadsheet.cleared_ranges)
+
+    def test_write_data_batch_creates_missing_worksheet_once(self):
+        gsheet_wrapper = self._create_gsheet_wrapper(["ws_1", "ws_2"], ["ws_1"])
+        updates = [WorksheetUpdate("ws_2", ["Testcase"], [["tc_1"]]), WorksheetUpdate("ws_2", ["Testcase"], [["tc_2"]])]
+
+        gsheet_wrapper.write_data_batch(updates, create_not_existing_worksheet=True)
+
+        self.assertEqual(["ws_1", "ws_2"], gsheet_wrapper.client.spreadsheet.worksheet_titles)
+
+    def test_write_data_batch_with_missing_worksheet(self):
+        gsheet_wrapper = self._create_gsheet_wrapper(["ws_1", "ws_2"], ["ws_1"])
+        updates = [WorksheetUpdate("ws_2", ["Testcase"], [["tc"]])]
+        with self.assertRaises(ValueError):
+            gsheet_wrapper.write_data_batch(updates, create_not_existing_worksheet=False)
+        with self.assertRaises(ValueError):
+            gsheet_wrapper.write_data_batch([WorksheetUpdate("ws_unknown", ["Testcase"], [])])
+
+
+class TestKnownTestFailures(unittest.TestCase):
+    HEADER = ["Testcase", "Jira", "Resolution date"]
+
+    def setUp(self):
+        self.cache_dir = FileUtils.join_path(
+            ProjectUtils.get_test_output_basedir(YARNDEVTOOLS_MODULE_NAME), "known_failures_cache"
+        )
+        FileUtils.remove_files(self.cache_dir, ".*\\.json")
+
+    def _create_rows(self, count):
+        return [self.HEADER] + [[f"org.apache.TestClass.test{i}", f"YARN-{i}", "01/02/2023"] for i in range(count)]
+
+    def test_reads_whole_table_in_pages(self):
+        gsheet_wrapper = FakeGSheetWrapper(self._create_rows(250), row_count=300)
+        known_failures = KnownTestFailures(gsheet_wrapper, "known failures", page_size=100)
+
+        self.assertEqual(250, len(known_failures))
+        self.assertEqual(1, gsheet_wrapper.client.open_calls)
+        self.assertEqual(1, gsheet_wrapper.read_calls)
+        self.assertEqual("YARN-249", known_failures.by_name["org.apache.TestClass.test249"][0].jira)
+
+    def test_reads_pages_up_to_row_count(self):
+        gsheet_wrapper = FakeGSheetWrapper(self._create_rows(249), row_count=250)
+        known_failures = KnownTestFailures(gsheet_wrapper, "known failures", page_size=100)
+
+        self.assertEqual(249, len(known_failures))
+        self.assertEqual(1, gsheet_wrapper.read_calls)
+        self.assertEqual(["A1:E100", "A101:E200", "A201:E250"], gsheet_wrapper.read_ranges)
+
+    def test_snapshot_is_used_while_revision_is_unchanged(self):
+        gsheet_wrapper = FakeGSheetWrapper(self._create_rows(10), revision="rev1")
+        KnownTestFailures(gsheet_wrapper, "known failures", cache_dir=self.cache_dir)
+        self.assertEqual(1, gsheet_wrapper.read_calls)
+
+        known_failures = KnownTestFailures(gsheet_wrapper, "known failures", cache_dir=self.cache_dir)
+        self.assertEqual(1, gsheet_wrapper.read_calls)
+        self.assertEqual(10, len(known_failures))
+
+        gsheet_wrapper.rows = self._create_rows(12)
+        gsheet_wrapper.client.spreadsheet.revision = "rev2"
+        known_failures = KnownTestFailures(gsheet_wrapper, "known failures", cache_dir=self.cache_dir)
+        self.assertEqual(2, gsheet_wrapper.read_calls)
+        self.assertEqual(12, len(known_failures))
+
+    def test_snapshot_is_not_used_without_revision(self):
+        gsheet_wrapper = FakeGSheetWrapper(self._create_rows(10))
+        KnownTestFailures(gsheet_wrapper, "known failures", cache_dir=self.cache_dir)
+        KnownTestFailures(gsheet_wrapper, "known failures", cache_dir=self.cache_dir)
+        self.assertEqual(2, gsheet_wrapper.read_calls)
@@ -1,14 +1,33 @@
 import logging
+import re
+import tempfile
 import unittest
 
+from pythoncommons.constants import ExecutionMode
 from pythoncommons.file_utils import FileUtils
 from pythoncommons.github_utils import GitHubUtils
-from pythoncommons.project_utils import ProjectUtils
-
+from pythoncommons.jira_wrapper import JiraStatus
+from pythoncommons.logging_setup import SimpleLoggingSetup
+from pythoncommons.project_utils import ProjectRootDeterminationStrategy, ProjectUtils
+
+from yarndevtools.commands.upstreamumbrellafetcher.cache import UmbrellaDataCache, UmbrellaFetcherPhase
+from yarndevtools.commands.upstreamumbrellafetcher.common import (
+    JiraUmbrellaData,
+    SubjiraStatusFetcher,
+    UpstreamCommitsPerBranch,
+)
+from yarndevtools.commands_common import BackportedCommit, BackportedJira, CommitData
 from yarndevtools.common.shared_command_utils import CommandType
 from yarndevtools.commands.upstreamumbrellafetcher.upstream_jira_umbrella_fetcher import UpstreamJiraUmbrellaFetcher
-from yarndevtools.constants import TRUNK, ORIGIN_TRUNK, ORIGIN_BRANCH_3_3, ORIGIN_BRANCH_3_2, SummaryFile
-from tests.test_utilities import TestUtilities, Object
+from yarndevtools.constants import (
+    TRUNK,
+    ORIGIN_TRUNK,
+    ORIGIN_BRANCH_3_3,
+    ORIGIN_BRANCH_3_2,
+    SummaryFile,
+    YARNDEVTOOLS_MODULE_NAME,
+)
+from tests.test_utilities import TestUtilities, Object, TemporaryGitRepo
 
 FILE_JIRA_HTML = "jira.html"
 FILE_SUMMARY_TXT = SummaryFile.TXT.value
@@ -129,7 +148,7 @@ class TestUpstreamJiraUmbrellaFetcher(unittest.TestCase):
             self.utils.jira_umbrella_data_dir,
             self.base_branch,
         )
-        # Run first, to surely have results pickled for this umbrella
+        # Run first, to surely have results cached for this umbrella
         umbrella_fetcher.run()
 
         # Run again, with using cache
@@ -217,5 +236,276 @@ class TestUpstreamJiraUmbrellaFetcher(unittest.TestCase):
         return b.replace("/", "_").replace(".", "_")
 
 
+class TestFindUpstreamCommits(unittest.TestCase):
+    def setUp(self):
+        self.tmp_repo = TemporaryGitRepo()
+        self.tmp_repo.commit("YARN-1. First subjira. Contributed by Some Author")
+        self.tmp_repo.commit("YARN-10. Not a subjira. Contributed by Some Author")
+        self.tmp_repo.commit("Fix scheduler (part 1) Contributed by Some Author")
+        self.tmp_repo.commit("YARN-3. Third subjira. Contributed by Some Author")
+        # Only the fields needed to match the upstream commits
+        self.fetcher = UpstreamJiraUmbrellaFetcher.__new__(UpstreamJiraUmbrellaFetcher)
+        self.fetcher.upstream_repo = self.tmp_repo.repo
+        self.fetcher.config = Object()
+        self.fetcher.config.umbrella_result_basedir = self.tmp_repo.path
+        self.fetcher.data = JiraUmbrellaData()
+        self.fetcher.data.jira_ids_and_titles = {
+            "YARN-1": "First subjira.",
+            "YARN-2": "Fix scheduler (part 1)",
+            "YARN-3": "Third subjira.",
+        }
+        self.fetcher.data.subjira_ids = list(self.fetcher.data.jira_ids_and_titles.keys())
+
+    def tearDown(self):
+        self.tmp_repo.cleanup()
+
+    def test_commits_are_matched_by_jira_id_and_title(self):
+        result = self.fetcher._find_upstream_commits("HEAD")
+        self.assertEqual(
+            [
+                "YARN-2. Fix scheduler (part 1) Contributed by Some Author",
+                "YARN-1. First subjira. Contributed by Some Author",
+                "YARN-3. Third subjira. Contributed by Some Author",
+            ],
+            [line.split(" ", 1)[1].rsplit(" ", 1)[0] for line in result],
+        )
+
+
+class TestGrepDownstreamCommits(unittest.TestCase):
+    def setUp(self):
+        self.tmp_repo = TemporaryGitRepo()
+        base = self.tmp_repo.commit("YARN-1. First commit")
+        self.tmp_repo.commit("YARN-10. Second commit")
+        self.tmp_repo.commit("CDPD-1. Backport\n\nBackport of YARN-2")
+        other = self.tmp_repo.commit("YARN-3. Commit on other branch", parents=[base], head=False)
+        self.tmp_repo.create_branch("other-branch", other)
+        self.repo = self.tmp_repo.repo
+
+    def tearDown(self):
+        self.tmp_repo.cleanup()
+
+    def test_same_result_as_git_log_grep_per_jira(self):
+        jira_ids = ["YARN-1", "YARN-2", "YARN-3", "YARN-4"]
+        result = UpstreamJiraUmbrellaFetcher._grep_downstream_commits(self.repo, jira_ids)
+        for jira_id in jira_ids:
+            self.assertEqual(self.repo.log("HEAD", oneline_with_date=True, all=True, grep=jira_id), result[jira_id])
+        self.assertEqual(2, len(result["YARN-1"]))
+        self.assertEqual([], result["YARN-4"])
+
+
+class TestChangedFilesOfCommits(unittest.TestCase):
+    def setUp(self):
+        self.tmp_repo = TemporaryGitRepo()
+        commit = self.tmp_repo.commit
+        commit("YARN-1. Root commit", {"a.txt": "a", "dir/b.txt": "b"})
+        first = commit("YARN-2. Modify file", {"a.txt": "a2", "dir/c.txt": "c"})
+        self.tmp_repo.git_repo.index.remove(["dir/b.txt"], working_tree=True)
+        second = commit("YARN-3. Delete file")
+        self.tmp_repo.git_repo.index.move(["a.txt", "e.txt"])
+        renamed = commit("YARN-5. Rename file")
+        other = commit("YARN-4. Other branch", {"d.txt": "d"}, parents=[first])
+        merge = commit("Merge", parents=[renamed, other])
+        self.hashes = [c.hexsha for c in (first, second, renamed, other, merge)]
+        self.repo = self.tmp_repo.repo
+
+    def tearDown(self):
+        self.tmp_repo.cleanup()
+
+    def test_same_result_as_diff_tree_per_commit(self):
+        result = UpstreamJiraUmbrellaFetcher._get_changed_files_of_commits(self.repo, self.hashes)
+        self.assertEqual(self.hashes, list(result.keys()))
+        for c_hash in self.hashes:
+            self.assertEqual(
+                self.repo.diff_tree(c_hash, no_commit_id=True, name_only=True, recursive=True), result[c_hash]
+            )
+        self.assertEqual(["a.txt", "dir/c.txt"], result[self.hashes[0]])
+        # Renamed files are listed with both their old and new paths
+        self.assertEqual(["a.txt", "e.txt"], result[self.hashes[2]])
+        self.assertEqual([], result[self.hashes[4]])
+
+    def test_no_commits(self):
+        self.assertEqual({}, UpstreamJiraUmbrellaFetcher._get_changed_files_of_commits(self.repo, []))
+
+
+class TestChangesOfFiles(unittest.TestCase):
+    CONTENT = "\n".join(f"line {i}" for i in range(20))
+
+    def setUp(self):
+        self.tmp_repo = TemporaryGitRepo()
+        commit = self.tmp_repo.commit
+        commit("YARN-1. Add files", {"old/a.txt": self.CONTENT, "b.txt": self.CONTENT + "b"})
+        commit("YARN-2. Modify file", {"old/a.txt": self.CONTENT + "\nmodified"})
+        FileUtils.ensure_dir_created(FileUtils.join_path(self.tmp_repo.path, "new"))
+        self.tmp_repo.git_repo.index.move(["old/a.txt", "new/a.txt"])
+        commit("YARN-3. Rename file")
+        commit("YARN-20. Unrelated change", {"new/a.txt": self.CONTENT + "\nmodified again", "b.txt": "b"})
+        commit("YARN-4. Modify both files", {"new/a.txt": self.CONTENT + "\nfinal", "b.txt": "b2"})
+        self.repo = self.tmp_repo.repo
+
+    def tearDown(self):
+        self.tmp_repo.cleanup()
+
+    def test_same_result_as_git_log_follow_per_file(self):
+        jira_ids = ["YARN-1", "YARN-3", "YARN-4"]
+        files = ["new/a.txt", "b.txt"]
+        result = UpstreamJiraUmbrellaFetcher._get_changes_of_files(self.repo, "HEAD", files, jira_ids)
+        pattern = re.compile("|".join(jira_ids))
+        for file in files:
+            expected = self.tmp_repo.git_repo.git.log("HEAD", "--", file, follow=True, oneline=True).splitlines()
+            self.assertEqual([line for line in expected if pattern.search(line)], result[file])
+        self.assertEqual(["YARN-4.", "YARN-3.", "YARN-1."], [line.split()[1] for line in result["new/a.txt"]])
+
+    def test_no_files(self):
+        self.assertEqual({}, UpstreamJiraUmbrellaFetcher._get_changes_of_files(self.repo, "HEAD", [], ["YARN-1"]))
+
+
+class TestUmbrellaDataCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        ProjectUtils.set_root_determine_strategy(ProjectRootDeterminationStrategy.COMMON_FILE)
+        ProjectUtils.get_test_output_basedir(YARNDEVTOOLS_MODULE_NAME)
+        SimpleLoggingSetup.init_logger(
+            project_name=CommandType.JIRA_UMBRELLA_DATA_FETCHER.real_name,
+            logger_name_prefix=YARNDEVTOOLS_MODULE_NAME,
+            execution_mode=ExecutionMode.TEST,
+            console_debug=True,
+        )
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = FileUtils.join_path(self.tmp_dir.name, "cache.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_only_phases_with_same_inputs_are_reused(self):
+        cache = UmbrellaDataCache(self.cache_file)
+        cache.put(UmbrellaFetcherPhase.UPSTREAM_COMMITS, {"tip": "a"}, ["line1"], name="trunk")
+        cache.put(UmbrellaFetcherPhase.UPSTREAM_COMMITS, {"tip": "b"}, ["line2"], name="branch-3.3")
+        cache.put(UmbrellaFetcherPhase.CHANGED_FILES, {"commit_hashes": ["a"]}, ["file1"])
+        cache.save()
+
+        cache = UmbrellaDataCache(self.cache_file)
+        self.assertEqual(["line1"], cache.get(UmbrellaFetcherPhase.UPSTREAM_COMMITS, {"tip": "a"}, name="trunk"))
+        self.assertIsNone(cache.get(UmbrellaFetcherPhase.UPSTREAM_COMMITS, {"tip": "c"}, name="branch-3.3"))
+        self.assertIsNone(cache.get(UmbrellaFetcherPhase.CHANGED_FILES, {"commit_hashes": ["a", "b"]}))
+        self.assertIsNone(cache.get(UmbrellaFetcherPhase.CHANGES_OF_FILES, {}))
+
+    def test_cached_data_not_used(self):
+        cache = UmbrellaDataCache(self.cache_file)
+        cache.put(UmbrellaFetcherPhase.CHANGED_FILES, {}, ["file1"])
+        cache.save()
+        self.assertIsNone(
+            UmbrellaDataCache(self.cache_file, use_cached_data=False).get(UmbrellaFetcherPhase.CHANGED_FILES, {})
+        )
+
+    def test_backported_jiras_serialization(self):
+        commit = CommitData("hash1", "YARN-1", "YARN-1. Commit", "2021-02-15T14:48:42+01:00", reverted=True)
+        backported_jiras = {"YARN-1": BackportedJira("YARN-1", [BackportedCommit(commit, ["origin/branch-1"])])}
+        data = UmbrellaDataCache.serialize_backported_jiras(backported_jiras)
+        result = UmbrellaDataCache.deserialize_backported_jiras(data)
+
+        self.assertEqual(["YARN-1"], list(result.keys()))
+        backported_commit = result["YARN-1"].commits[0]
+        self.assertEqual(["origin/branch-1"], backported_commit.branches)
+        self.assertEqual(
+            ("hash1", "YARN-1", "YARN-1. Commit", "2021-02-15T14:48:42+01:00", True),
+            (
+                backported_commit.commit_obj.hash,
+                backported_commit.commit_obj.jira_id,
+                backported_commit.commit_obj.message,
+                backported_commit.commit_obj.date,
+                backported_commit.commit_obj.reverted,
+            ),
+        )
+        self.assertIs(backported_commit, result["YARN-1"].commitdata_by_hash["hash1"])
+
+
+class TestJiraUmbrellaData(unittest.TestCase):
+    def test_upstream_branches_by_jira_id(self):
+        data = JiraUmbrellaData()
+        data.add_upstream_commits(
+            UpstreamCommitsPerBranch(
+                ORIGIN_TRUNK,
+                [
+                    "hash1 YARN-1. First commit 2021-02-15T14:48:42+01:00",
+                    "hash2 YARN-2. Second commit 2021-02-16T14:48:42+01:00",
+                    "hash3 YARN-2. Addendum 2021-02-17T14:48:42+01:00",
+                ],
+            )
+        )
+        data.add_upstream_commits(
+            UpstreamCommitsPerBranch(ORIGIN_BRANCH_3_3, ["hash4 YARN-2. Second commit 2021-02-18T14:48:42+01:00"])
+        )
+        data.add_upstream_commits(UpstreamCommitsPerBranch(ORIGIN_BRANCH_3_2, []))
+
+        self.assertEqual(
+            {"YARN-1": [ORIGIN_TRUNK], "YARN-2": [ORIGIN_TRUNK, ORIGIN_BRANCH_3_3]}, data.upstream_branches_by_jira_id
+        )
+        self.assertEqual(
+            [ORIGIN_TRUNK, ORIGIN_BRANCH_3_3, ORIGIN_BRANCH_3_2], list(data.upstream_commits_by_branch.keys())
+        )
+
+
+class FakeJira:
+    def __init__(self, issues):
+        self.issues = issues
+        self.searches = []
+
+    def search_issues(self, jql, startAt=0, maxResults=50, validate_query=True, fields="*all"):
+        self.searches.append((jql, startAt, fields))
+        if jql.startswith("parent = "):
+            matched = [i for i in self.issues if i.parent == jql[len("parent = ") :]]
+        else:
+            keys = jql[len("key in (") : -1].split(", ")
+            matched = [i for i in self.issues if i.key in keys]
+        result = FakeResultList(matched[startAt : startAt + maxResults])
+        result.total = len(matched)
+        return result
+
+
+class FakeResultList(list):
+    total = 0
+
+
+class TestSubjiraStatusFetcher(unittest.TestCase):
+    @staticmethod
+    def _issue(key, parent, status="Open", resolution=None, status_category="To Do"):
+        issue = Object()
+        issue.key = key
+        issue.parent = parent
+        issue.fields = Object()
+        issue.fields.resolution = resolution
+        issue.fields.status = Object()
+        issue.fields.status.name = status
+        issue.fields.status.statusCategory = Object()
+        issue.fields.status.statusCategory.name = status_category
+        return issue
+
+    def test_statuses_fetched_with_paged_searches(self):
+        subtasks = [self._issue(f"YARN-{i}", "YARN-100") for i in range(5)]
+        linked = [self._issue(f"YARN-{i}", None, "Resolved", "Fixed", "Done") for i in range(10, 13)]
+        jira = FakeJira(subtasks + linked + [self._issue("YARN-200", "YARN-300")])
+        subjira_ids = [i.key for i in subtasks + linked] + ["YARN-404"]
+
+        statuses = SubjiraStatusFetcher(jira, page_size=2, keys_per_search=2).get_statuses("YARN-100", subjira_ids)
+
+        self.assertEqual([i.key for i in subtasks + linked], list(statuses.keys()))
+        self.assertEqual(JiraStatus("Resolved", "Fixed", "Done"), statuses["YARN-10"])
+        self.assertEqual(JiraStatus("Open", None, "To Do"), statuses["YARN-0"])
+        # 3 pages of subtasks, then the 4 remaining keys are searched in 2 batches
+        self.assertEqual(
+            [
+                ("parent = YARN-100", 0),
+                ("parent = YARN-100", 2),
+                ("parent = YARN-100", 4),
+                ("key in (YARN-10, YARN-11)", 0),
+                ("key in (YARN-12, YARN-404)", 0),
+            ],
+            [(jql, start_at) for jql, start_at, _ in jira.searches],
+        )
+        self.assertTrue(all(fields == SubjiraStatusFetcher.STATUS_FIELDS for _, _, fields in jira.searches))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,6 @@
 import logging
 import os
+import tempfile
 import unittest
 
 from git import InvalidGitRepositoryError, Repo, GitCommandError, Actor
@@ -43,6 +44,45 @@ class Object(object):
         return key in self.__dict__
 
 
+class TemporaryGitRepo:
+    """
+    Git repository in a temporary directory, for tests that need a small, real git history.
+    All commits are created with the same author and committer.
+    """
+
+    ACTOR = Actor("Some Author", "author@apache.org")
+
+    def __init__(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.path: str = self._tmp_dir.name
+        self.git_repo: Repo = Repo.init(self.path)
+        self.repo: GitWrapper = GitWrapper(self.path)
+
+    def commit(self, message, files=None, parents=None, head=True):
+        """
+        Writes and stages the files (path -> content), then commits the index.
+        With head=False, HEAD is not moved, so commits can be created on other lines of history.
+        """
+        files = files if files else {}
+        for path, content in files.items():
+            FileUtils.save_to_file(FileUtils.join_path(self.path, path), content)
+        if files:
+            self.git_repo.index.add(list(files.keys()))
+        return self.git_repo.index.commit(
+            message, parent_commits=parents, head=head, author=self.ACTOR, committer=self.ACTOR
+        )
+
+    def create_branch(self, name, commit, remote=None):
+        """Creates a local branch, and also a remote tracking branch with the same name if the remote is given."""
+        head = self.git_repo.create_head(name, commit)
+        if remote:
+            self.git_repo.git.update_ref(f"refs/remotes/{remote}/{name}", commit.hexsha)
+        return head
+
+    def cleanup(self):
+        self._tmp_dir.cleanup()
+
+
 class TestUtilities:
     repo = None
     base_branch = TRUNK
@@ -1,14 +1,19 @@
+import copy
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
-from git import Commit
+from git import Commit, GitCommandError
 from pythoncommons.object_utils import CollectionUtils
 from pythoncommons.os_utils import OsUtils
 from pythoncommons.project_utils import ProjectUtils
 from pythoncommons.file_utils import FileUtils
 from pythoncommons.git_wrapper import GitWrapper, GitLogLineFormat
 
+from yarndevtools.commands.branchcomparator.commit_cache import CommitIndexCache
 from yarndevtools.commands.branchcomparator.common import (
     BranchType,
     BranchData,
@@ -19,7 +24,7 @@ from yarndevtools.commands.branchcomparator.group_matching import (
     GroupedCommitMatcher,
     GroupedOutputManager,
 )
-from yarndevtools.commands.branchcomparator.legacy_script import LegacyScriptRunner
+from yarndevtools.commands.branchcomparator.legacy_script import LegacyScriptRunner, LegacyScriptMode
 from yarndevtools.commands.branchcomparator.simple_matching import (
     SimpleCommitMatcher,
     SimpleOutputManager,
@@ -27,6 +32,7 @@ from yarndevtools.commands.branchcomparator.simple_matching import (
 from yarndevtools.commands_common import (
     CommitData,
     GitLogParseConfig,
+    GitLogStream,
     MatchAllJiraIdStrategy,
     JiraIdTypePreference,
     JiraIdChoosePreference,
@@ -38,15 +44,20 @@ from yarndevtools.yarn_dev_tools_config import YarnDevToolsConfig
 
 LOG = logging.getLogger(__name__)
 
+# Git log output is parsed by a process pool in chunks of this many lines, shorter outputs are parsed in-process
+PARALLEL_PARSE_CHUNK_SIZE = 50000
+
 
 class CommitMatchingAlgorithm(Enum):
-    SIMPLE = ("simple", SimpleCommitMatcher, SimpleOutputManager)
-    GROUPED = ("grouped", GroupedCommitMatcher, GroupedOutputManager)
+    # The simple matcher also matches commits by Jira IDs of commits before the merge-base, so it needs full history
+    SIMPLE = ("simple", SimpleCommitMatcher, SimpleOutputManager, True)
+    GROUPED = ("grouped", GroupedCommitMatcher, GroupedOutputManager, False)
 
-    def __init__(self, name, matcher_class, om_class):
+    def __init__(self, name, matcher_class, om_class, needs_full_history):
         self.shortname = name
         self.matcher_class = matcher_class
         self.output_manager_class = om_class
+        self.needs_full_history = needs_full_history
 
     def __str__(self):
         return self.shortname
@@ -80,6 +91,17 @@ class BranchComparatorConfig:
         self.repo_type: RepoType = (
             RepoType[args.repo_type.upper()] if hasattr(args, "repo_type") else RepoType.DOWNSTREAM
         )
+        self.commit_cache_dir: str or None = (
+            FileUtils.join_path(output_dir, "commit_cache") if getattr(args, "commit_cache", False) else None
+        )
+        self.legacy_script_mode: LegacyScriptMode = LegacyScriptMode(
+            getattr(args, "legacy_script_mode", LegacyScriptMode.SCRIPT.value)
+        )
+        # The native implementation of the legacy script works on the commits of the whole history
+        native_legacy_script = self.run_legacy_script and self.legacy_script_mode == LegacyScriptMode.NATIVE
+        self.full_history: bool = (
+            getattr(args, "full_history", False) or self.matching_algorithm.needs_full_history or native_legacy_script
+        )
         self.full_cmd: str or None = None
 
     def __str__(self):
@@ -94,6 +116,9 @@ class BranchComparatorConfig:
             f"Commit author exceptions: {self.commit_author_exceptions}\n"
             f"Console mode: {self.console_mode}\n"
             f"Run legacy comparator script: {self.run_legacy_script}\n"
+            f"Legacy comparator script mode: {self.legacy_script_mode.value}\n"
+            f"Commit cache dir: {self.commit_cache_dir}\n"
+            f"Query full history: {self.full_history}\n"
         )
 
     @staticmethod
@@ -117,8 +142,19 @@ class Branches:
         self.commit_matcher: CommitMatcherBase = self.config.matching_algorithm.matcher_class(self.branch_data)
         self.output_manager = self.config.matching_algorithm.output_manager_class(self.config, branch_dict)
 
+        self.commit_cache: CommitIndexCache or None = None
+        if self.config.commit_cache_dir:
+            self.commit_cache = CommitIndexCache(
+                self.config.commit_cache_dir,
+                self.repo.repo_path,
+                self._create_git_log_parse_config(),
+                self.config.full_history,
+            )
+
         # These are set later
         self.merge_base: CommitData or None = None
+        self._merge_base_commit: CommitData or None = None
+        self._process_pool: ProcessPoolExecutor or None = None
 
     def get_branch(self, br_type: BranchType) -> BranchData:
         return self.branch_data[br_type]
@@ -130,25 +166,111 @@ class Branches:
             LOG.error(f"{br_data.type.name} does not exist with name '{br_data.name}'")
         return branch_exist
 
+    @staticmethod
+    def _create_git_log_parse_config():
+        return GitLogParseConfig(
+            log_format=GitLogLineFormat.ONELINE_WITH_DATE_AUTHOR_COMMITTER,
+            pattern=ANY_JIRA_ID_PATTERN,
+            allow_unmatched_jira_id=True,
+            print_unique_jira_projects=True,
+            jira_id_parse_strategy=MatchAllJiraIdStrategy(
+                type_preference=JiraIdTypePreference.UPSTREAM,
+                choose_preference=JiraIdChoosePreference.FIRST,
+                fallback_type=JiraIdTypePreference.DOWNSTREAM,
+            ),
+            keep_parser_state=True,
+        )
+
+    def _query_commits(self, branch: BranchData, revision_range: str) -> List[CommitData]:
+        # Commits are returned in the order of git log (descending, from newest to oldest)
+        git_log = GitLogStream(self.repo, revision_range, GitLogLineFormat.ONELINE_WITH_DATE_AUTHOR_COMMITTER)
+        return self._parse_git_log(git_log)
+
+    def _parse_git_log(self, git_log_lines: Iterable[str]) -> List[CommitData]:
+        parse_config = self._create_git_log_parse_config()
+        if not self._process_pool:
+            return list(CommitData.from_git_log_stream(git_log_lines, parse_config))
+
+        # Full chunks are parsed by the process pool while git is still producing the output.
+        # Chunks are collected in submission order, so the order of commits is kept.
+        futures = []
+        chunk = []
+        for line in git_log_lines:
+            chunk.append(line)
+            if len(chunk) == PARALLEL_PARSE_CHUNK_SIZE:
+                futures.append(self._process_pool.submit(CommitData.from_git_log_output, chunk, parse_config))
+                chunk = []
+        if futures:
+            LOG.info(f"Parsing {len(futures)} chunks of git log output with a process pool")
+        commits = [commit for future in futures for commit in future.result()]
+        commits.extend(CommitData.from_git_log_stream(chunk, parse_config))
+        return commits
+
+    def _query_commits_with_cache(self, branch: BranchData, revision_range: str) -> List[CommitData]:
+        tip = self.repo.log(branch.name, format="%H", n=1)[0]
+        indexed_tip = self.commit_cache.get_tip(revision_range)
+        if indexed_tip == tip:
+            LOG.info(f"Commit index is up-to-date for revision range: {revision_range}")
+            return self.commit_cache.get_commits(revision_range)
+
+        if indexed_tip and self._is_ancestor(indexed_tip, tip):
+            LOG.info(f"Parsing commits of revision range '{revision_range}' since indexed tip: {indexed_tip}")
+            new_commits = self._query_commits(branch, f"{indexed_tip}..{branch.name}")
+            self.commit_cache.update(revision_range, new_commits, keep_indexed_commits=True)
+        else:
+            LOG.info(f"Parsing all commits of revision range: {revision_range}")
+            new_commits = self._query_commits(branch, revision_range)
+            self.commit_cache.update(revision_range, new_commits, keep_indexed_commits=False)
+        return self.commit_cache.get_commits(revision_range)
+
+    def _is_ancestor(self, ancestor_hash: str, commit_hash: str):
+        try:
+            merge_base: List[Commit] = self.repo.merge_base(ancestor_hash, commit_hash)
+        except GitCommandError:
+            # Indexed tip may not exist anymore, e.g. after a force-push and gc
+            LOG.warning(f"Failed to determine merge base of commits: {ancestor_hash}, {commit_hash}", exc_info=True)
+            return False
+        return len(merge_base) == 1 and merge_base[0].hexsha == ancestor_hash
+
+    def _query_branch_commits(self, branch: BranchData) -> List[CommitData]:
+        # Unless full history is required, only the commits after the merge-base are queried
+        revision_range = branch.name if self.config.full_history else f"{self.merge_base.hash}..{branch.name}"
+        if self.commit_cache:
+            commits = self._query_commits_with_cache(branch, revision_range)
+        else:
+            commits = self._query_commits(branch, revision_range)
+        if not self.config.full_history:
+            # Every branch gets its own copy, so the branches never share commit objects
+            commits.append(copy.deepcopy(self._merge_base_commit))
+            # The commits before the merge-base are not queried, but they still count as commits of the branch
+            branch.total_number_of_commits = int(self.repo.repo.git.rev_list(branch.name, count=True))
+        return commits
+
     def execute_git_log(self):
+        self.get_merge_base()
+        # Branches are queried and parsed concurrently: git log runs in a subprocess, large outputs are parsed
+        # by a process pool while being streamed. Worker processes are only started when a large output is parsed.
+        # Spawned workers are used as forking is not safe while the querying threads are running.
+        self._process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=len(BranchType)) as executor:
+                futures = {
+                    br_type: executor.submit(self._query_branch_commits, self.branch_data[br_type])
+                    for br_type in BranchType
+                }
+                commits_by_branch: Dict[BranchType, List[CommitData]] = {
+                    br_type: future.result() for br_type, future in futures.items()
+                }
+        finally:
+            self._process_pool.shutdown()
+            self._process_pool = None
+
         for br_type in BranchType:
             branch: BranchData = self.branch_data[br_type]
-            branch.gitlog_results = self.repo.log(branch.name, oneline_with_date_author_committer=True)
-            parse_config = GitLogParseConfig(
-                log_format=GitLogLineFormat.ONELINE_WITH_DATE_AUTHOR_COMMITTER,
-                pattern=ANY_JIRA_ID_PATTERN,
-                allow_unmatched_jira_id=True,
-                print_unique_jira_projects=True,
-                jira_id_parse_strategy=MatchAllJiraIdStrategy(
-                    type_preference=JiraIdTypePreference.UPSTREAM,
-                    choose_preference=JiraIdChoosePreference.FIRST,
-                    fallback_type=JiraIdTypePreference.DOWNSTREAM,
-                ),
-                keep_parser_state=True,
-            )
-
             # Store commit objects in reverse order (ascending by date)
-            branch.set_commit_objs(list(reversed(CommitData.from_git_log_output(branch.gitlog_results, parse_config))))
+            branch.set_commit_objs(list(reversed(commits_by_branch[br_type])))
             for idx, commit in enumerate(branch.commit_objs):
                 branch.hash_to_index[commit.hash] = idx
                 # Simply skip commits that doesn't have jira_id set to a valid value, as they are None.
@@ -159,12 +281,14 @@ class Branches:
                 if commit.jira_id not in branch.jira_id_to_commits:
                     branch.jira_id_to_commits[commit.jira_id] = []
                 branch.jira_id_to_commits[commit.jira_id].append(commit)
+        if self.commit_cache:
+            self.commit_cache.save()
 
         # These must be executed after branch.hash_to_index is set !
         self.set_commits_with_missing_jira_id()
-        self.get_merge_base()
         for br_type in BranchType:
             branch: BranchData = self.branch_data[br_type]
+            branch.set_merge_base(self.merge_base)
             branch.commits_after_merge_base_filtered = list(
                 filter(lambda c: c.author not in self.config.commit_author_exceptions, branch.commits_after_merge_base)
             )
@@ -184,16 +308,16 @@ class Branches:
             raise ValueError(f"Ambiguous merge base: {merge_base}.")
         elif len(merge_base) == 0:
             raise ValueError("Merge base not found between branches!")
+        merge_base_line = self.repo.log(merge_base[0].hexsha, oneline_with_date_author_committer=True, n=1)[0]
         self.merge_base = CommitData.from_git_log_str(
-            self.repo.log(
-                merge_base[0].hexsha,
-                oneline_with_date_author_committer=True,
-            )[0],
+            merge_base_line,
             format=GitLogLineFormat.ONELINE_WITH_DATE_AUTHOR_COMMITTER,
             allow_unmatched_jira_id=True,
         )
-        for br_type in BranchType:
-            self.branch_data[br_type].set_merge_base(self.merge_base)
+        # The merge-base commit as part of the branches, parsed the same way as all the other commits
+        self._merge_base_commit = CommitData.from_git_log_output(
+            [merge_base_line], self._create_git_log_parse_config()
+        )[0]
 
     def compare(self) -> MatchingResultBase:
         # Let the game begin :) --> Start to compare / A.K.A. match commits
@@ -310,6 +434,29 @@ class BranchComparator(CommandAbs):
             default=False,
             help="Console mode: Instead of writing output files, print everything to the console",
         )
+        legacy_script_modes = [m.value for m in LegacyScriptMode]
+        parser.add_argument(
+            "--legacy-script-mode",
+            default=LegacyScriptMode.SCRIPT.value,
+            choices=legacy_script_modes,
+            help="How to run the legacy comparator script: 'script' executes git_compare.sh, "
+            "'native' produces the same outputs in-process, from the parsed commits of the full history of the branches",
+        )
+
+        parser.add_argument(
+            "--commit-cache",
+            action="store_true",
+            default=False,
+            help="Keep an on-disk index of parsed commits and only parse commits added since the last run",
+        )
+
+        parser.add_argument(
+            "--full-history",
+            action="store_true",
+            default=False,
+            help="Query the full history of the branches, not only the commits after the merge-base. "
+            "Always enabled for the simple algorithm.",
+        )
 
         repo_types = [rt.value for rt in RepoType]
         parser.add_argument(
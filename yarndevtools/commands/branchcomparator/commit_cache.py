@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+from pythoncommons.file_utils import FileUtils, JsonFileUtils
+
+from yarndevtools.commands_common import CommitData, JiraIdData, GitLogParseConfig
+
+LOG = logging.getLogger(__name__)
+
+COMMIT_INDEX_VERSION = 2
+
+
+class CommitIndexCache:
+    """
+    On-disk index of parsed commits of a repository, keyed by commit hash.
+    For every revision range (e.g. a branch), the list of commit hashes is stored from newest to oldest,
+    so the first hash is the indexed tip.
+    Subsequent runs only need to query and parse the commits that were added since the last run.
+    The index is only used if the commits were parsed with the same settings.
+    """
+
+    def __init__(self, cache_dir: str, repo_path: str, parse_config: GitLogParseConfig, full_history: bool):
+        repo_id = hashlib.sha1(repo_path.encode()).hexdigest()[:10]
+        self.file_path = FileUtils.join_path(cache_dir, f"{FileUtils.basename(repo_path)}-{repo_id}.json")
+        self.fingerprint = self._get_fingerprint(parse_config, full_history)
+        self._commits: Dict[str, Dict[str, Any]] = {}
+        self._revision_ranges: Dict[str, List[str]] = {}
+        # Revision ranges may be updated concurrently
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        data, _ = JsonFileUtils.load_data_from_json_file(self.file_path, swallow_value_error=True)
+        if not data or data.get("version") != COMMIT_INDEX_VERSION:
+            LOG.info("Ignoring commit index with unknown version from file: %s", self.file_path)
+            return
+        if data.get("fingerprint") != self.fingerprint:
+            LOG.info("Ignoring commit index that was parsed with different settings from file: %s", self.file_path)
+            return
+        self._commits = data["commits"]
+        self._revision_ranges = data["revision_ranges"]
+        LOG.info(
+            f"Loaded {len(self._commits)} commits of {len(self._revision_ranges)} revision ranges from: {self.file_path}"
+        )
+
+    def save(self):
+        data = {
+            "version": COMMIT_INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "commits": self._commits,
+            "revision_ranges": self._revision_ranges,
+        }
+        JsonFileUtils.write_data_to_file_as_json(self.file_path, data)
+        LOG.info(
+            f"Saved {len(self._commits)} commits of {len(self._revision_ranges)} revision ranges to: {self.file_path}"
+        )
+
+    @staticmethod
+    def _get_fingerprint(parse_config: GitLogParseConfig, full_history: bool) -> str:
+        strategy = parse_config.jira_id_parse_strategy
+        settings = {
+            "log_format": str(parse_config.log_format),
+            "pattern": parse_config.pattern.pattern,
+            "allow_unmatched_jira_id": parse_config.allow_unmatched_jira_id,
+            "author": parse_config.author,
+            "commit_field_separator": parse_config.commit_field_separator,
+            "jira_id_parse_strategy": type(strategy).__name__,
+            "jira_id_parse_strategy_settings": {k: str(v) for k, v in vars(strategy).items()},
+            "full_history": full_history,
+        }
+        return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    def get_tip(self, revision_range: str) -> str or None:
+        hashes = self._revision_ranges.get(revision_range)
+        return hashes[0] if hashes else None
+
+    def get_commits(self, revision_range: str) -> List[CommitData]:
+        """Returns the indexed commits of the revision range, ordered from newest to oldest."""
+        return [self._deserialize(self._commits[c_hash]) for c_hash in self._revision_ranges.get(revision_range, [])]
+
+    def update(self, revision_range: str, new_commits: List[CommitData], keep_indexed_commits: bool):
+        """
+        Stores the commits of a revision range, ordered from newest to oldest.
+        If keep_indexed_commits is True, new_commits are the descendants of the indexed tip of the revision range.
+        """
+        serialized_commits = {c.hash: self._serialize(c) for c in new_commits}
+        with self._lock:
+            hashes = list(serialized_commits.keys())
+            if keep_indexed_commits:
+                hashes.extend(self._revision_ranges.get(revision_range, []))
+            self._commits.update(serialized_commits)
+            self._revision_ranges[revision_range] = hashes
+
+    @staticmethod
+    def _serialize(commit: CommitData) -> Dict[str, Any]:
+        jira_id_data: JiraIdData = commit.jira_id_data
+        return {
+            "hash": commit.hash,
+            "jira_id": commit.jira_id,
+            "message": commit.message,
+            "date": commit.date,
+            "author": commit.author,
+            "committer": commit.committer,
+            "reverted": commit.reverted,
+            "reverted_at_least_once": commit.reverted_at_least_once,
+            "jira_ids": (jira_id_data.chosen, jira_id_data._all_matched) if jira_id_data else None,
+        }
+
+    @staticmethod
+    def _deserialize(data: Dict[str, Any]) -> CommitData:
+        jira_ids: Tuple[str, Dict[str, Any]] or None = data["jira_ids"]
+        return CommitData(
+            data["hash"],
+            data["jira_id"],
+            data["message"],
+            data["date"],
+            reverted=data["reverted"],
+            reverted_at_least_once=data["reverted_at_least_once"],
+            author=data["author"],
+            committer=data["committer"],
+            jira_id_data=JiraIdData(*jira_ids) if jira_ids else None,
+        )
@@ -66,7 +66,6 @@ class BranchData:
         self.shortname = branch_name.split("/")[1] if "/" in branch_name else branch_name
 
         # Set later
-        self.gitlog_results: List[str] = []
         # CommitData objects stored in a list, ordered from last to first commit (descending, from oldest to newest)
         self.commit_objs: List[CommitData] = []
 
@@ -74,13 +73,13 @@ class BranchData:
         self.commits_with_missing_jira_id: List[CommitData] = []
 
         # Dict key: commit hash, value: CommitData obj
-        self.commits_with_missing_jira_id_filtered: Dict[str, CommitData] = {}
+        self._commits_with_missing_jira_id_filtered: Dict[str, CommitData] = {}
 
         self.commits_before_merge_base: List[CommitData] = []
         self.commits_after_merge_base: List[CommitData] = []
 
         # Commits filtered by author exceptions (may contain commits with missing Jira ID)
-        self.commits_after_merge_base_filtered: List[CommitData] = []
+        self._commits_after_merge_base_filtered: List[CommitData] = []
 
         # Dict: commit hash to commit index
         self.hash_to_index: Dict[str, int] = {}
@@ -88,23 +87,52 @@ class BranchData:
         # Dict: Jira ID (e.g. YARN-1234) to List of CommitData objects
         self.jira_id_to_commits: Dict[str, List[CommitData]] = {}
         self.merge_base_idx: int = -1
+        # Set only if the commits before the merge-base are not queried
+        self.total_number_of_commits: int or None = None
         # TODO this should not be stored here
         self.unique_jira_ids_legacy_script: List[str] = []
 
+        # Lookup maps, built on first use and invalidated when the filtered commits are replaced
+        self._filtered_commits_by_hash: Dict[str, CommitData] or None = None
+        self._filtered_commits_by_message: Dict[str, List[CommitData]] or None = None
+
     def __str__(self):
         return f"Branch type: {self.type}"
 
     def __repr__(self):
         return f"Branch type: {self.type}"
 
-    def get_commit_hashes(self) -> Set[str]:
+    @property
+    def commits_after_merge_base_filtered(self) -> List[CommitData]:
+        return self._commits_after_merge_base_filtered
+
+    @commits_after_merge_base_filtered.setter
+    def commits_after_merge_base_filtered(self, commits: List[CommitData]):
+        self._commits_after_merge_base_filtered = commits
+        self._filtered_commits_by_hash = None
+
+    @property
+    def commits_with_missing_jira_id_filtered(self) -> Dict[str, CommitData]:
+        return self._commits_with_missing_jira_id_filtered
+
+    @commits_with_missing_jira_id_filtered.setter
+    def commits_with_missing_jira_id_filtered(self, commits: Dict[str, CommitData]):
+        self._commits_with_missing_jira_id_filtered = commits
+        self._filtered_commits_by_message = None
+
+    @property
+    def filtered_commits_by_hash(self) -> Dict[str, CommitData]:
         # Searching through the commits after merge base, filtered (removed commits with "to filter" authors)
-        return set([commit.hash for commit in self.commits_after_merge_base_filtered])
+        if self._filtered_commits_by_hash is None:
+            self._filtered_commits_by_hash = {c.hash: c for c in self.commits_after_merge_base_filtered}
+        return self._filtered_commits_by_hash
+
+    def get_commit_hashes(self) -> Set[str]:
+        return set(self.filtered_commits_by_hash.keys())
 
     def get_commits_by_hashes(self, c_hashes: Set[str]) -> Dict[str, CommitData]:
-        # Searching through the commits after merge base, filtered (removed commits with "to filter" authors)
-        hash_to_commit_dict = dict([(c.hash, c) for c in self.commits_after_merge_base_filtered])
-        return {hash: commit for hash, commit in hash_to_commit_dict.items() if hash in c_hashes}
+        commits_by_hash = self.filtered_commits_by_hash
+        return {hash: commits_by_hash[hash] for hash in c_hashes if hash in commits_by_hash}
 
     @property
     def filtered_commit_list(self) -> List[CommitData]:
@@ -113,18 +141,22 @@ class BranchData:
     @property
     def filtered_commits_by_message(self) -> Dict[str, List[CommitData]]:
         # We may have more commits for a commit message
-        result_dict: Dict[str, List[CommitData]] = {}
-        for commit in self.commits_with_missing_jira_id_filtered.values():
-            if commit.message not in result_dict:
-                result_dict[commit.message] = []
-            result_dict[commit.message].append(commit)
-        return result_dict
+        if self._filtered_commits_by_message is None:
+            result_dict: Dict[str, List[CommitData]] = {}
+            for commit in self.commits_with_missing_jira_id_filtered.values():
+                if commit.message not in result_dict:
+                    result_dict[commit.message] = []
+                result_dict[commit.message].append(commit)
+            self._filtered_commits_by_message = result_dict
+        return self._filtered_commits_by_message
 
     @property
     def number_of_commits(self):
-        if not self.gitlog_results:
+        if not self.commit_objs:
             raise ValueError("Git log is not yet queried so number of commits is not yet stored.")
-        return len(self.gitlog_results)
+        if self.total_number_of_commits is not None:
+            return self.total_number_of_commits
+        return len(self.commit_objs)
 
     def set_merge_base(self, merge_base: CommitData):
         merge_base_hash = merge_base.hash
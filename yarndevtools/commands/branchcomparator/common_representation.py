@@ -318,8 +318,12 @@ class OutputManagerAbs(ABC):
             if self.config.console_mode:
                 LOG.info(f"Found {br_data.number_of_commits} commits on {br_type.value}: {br_data.name}")
             if self.config.save_to_file:
-                # We would like to maintain descending order of commits in printouts
-                self.write_to_file_or_console("git log output full raw", br_data, list(reversed(br_data.commit_objs)))
+                # We would like to maintain descending order of commits in printouts.
+                # Without full history, only the commits since the merge-base are queried.
+                output_type = (
+                    "git log output full raw" if self.config.full_history else "git log output raw since mergebase"
+                )
+                self.write_to_file_or_console(output_type, br_data, list(reversed(br_data.commit_objs)))
 
             self.write_to_file_or_console("before mergebase commits", br_data, br_data.commits_before_merge_base)
             self.write_to_file_or_console("after mergebase commits", br_data, br_data.commits_after_merge_base)
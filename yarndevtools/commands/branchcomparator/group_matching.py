@@ -1,6 +1,5 @@
 import logging
 import typing
-from datetime import datetime
 from enum import Enum
 from typing import Dict, List, Set, Tuple, FrozenSet
 
@@ -69,9 +68,7 @@ class CommitGroup:
     def __init__(self, br_type: BranchType or None, commits: Set[CommitData], match_type: CommitMatchType):
         # Put commits into ascending order by date
         self.br_type: BranchType = br_type
-        self.commits: List[CommitData] = sorted(
-            commits, key=lambda cd: datetime.strptime(cd.date, "%Y-%m-%dT%H:%M:%S%z")
-        )
+        self.commits: List[CommitData] = sorted(commits, key=lambda cd: cd.timestamp)
         self.match_type: CommitMatchType = match_type
         self.all_jira_ids = frozenset([jid for c in self.commits for jid in c.jira_id_data.all_matched_jira_ids])
         self.commits_by_jira_id: Dict[str, List[CommitData]] = self._populate_commits_by_jira_id()
@@ -245,7 +242,10 @@ class GroupedCommitMatcherSummaryData(SummaryDataAbs):
     def add_stats_matched_commits_on_branches(self, res):
         res += "\n\n=====Stats: COMMON COMMITS=====\n"
         res += f"Merge-base commit: {self.branches.merge_base.as_oneline_string(incl_date=True)}\n"
-        res += f"Number of common commits before merge-base: {len(self.maching_result.before_merge_base)}\n"
+        if self.config.full_history:
+            res += f"Number of common commits before merge-base: {len(self.maching_result.before_merge_base)}\n"
+        else:
+            res += "Number of common commits before merge-base: N/A (only commits after merge-base were queried)\n"
         res += f"Number of common commit groups after merge-base: {len(self.maching_result.matched_groups)}\n"
         res += f"Number of common commits after merge-base: {self.maching_result.no_of_common_commits}\n"
         return res
@@ -290,8 +290,9 @@ class GroupedCommitMatcher(CommitMatcherBase):
         # TODO print groups that has 2 or more jira IDS (also print to file)
         # TODO Start a second-pass that tries to group jira-id based groups with commit message groups?
         # It can happen that a commit message group has the same commit message like already existing commits in groups, with jira ids
-        master_groups: Dict[FrozenSet, CommitGroup] = self.commit_grouper.groups_by_jira_id_dict()[BranchType.MASTER]
-        feature_groups: Dict[FrozenSet, CommitGroup] = self.commit_grouper.groups_by_jira_id_dict()[BranchType.FEATURE]
+        groups_by_jira_id = self.commit_grouper.groups_by_jira_id_dict()
+        master_groups: Dict[FrozenSet, CommitGroup] = groups_by_jira_id[BranchType.MASTER]
+        feature_groups: Dict[FrozenSet, CommitGroup] = groups_by_jira_id[BranchType.FEATURE]
         LOG.info(
             f"Matching commit groups: "
             f"Found master groups: {len(master_groups)}, "
@@ -303,7 +304,7 @@ class GroupedCommitMatcher(CommitMatcherBase):
             if jira_ids_set in feature_groups:
                 f_group = feature_groups[jira_ids_set]
                 result.matched_group_candidate(jira_ids_set, m_group, f_group)
-        result.finalize(self.commit_grouper.groups_by_jira_id_dict())
+        result.finalize(groups_by_jira_id)
         result.group_stats = self.commit_grouper.group_stats
         return result
 
@@ -339,6 +340,27 @@ class JiraIdToCommitMappings:
         return self._dict[br_type]
 
 
+class JiraIdUnionFind:
+    """Disjoint sets of Jira IDs, with path compression."""
+
+    def __init__(self):
+        self._parent: Dict[str, str] = {}
+
+    def find(self, jira_id: str) -> str:
+        root = self._parent.setdefault(jira_id, jira_id)
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while jira_id != root:
+            self._parent[jira_id], jira_id = root, self._parent[jira_id]
+        return root
+
+    def union(self, jira_id_1: str, jira_id_2: str):
+        root_1 = self.find(jira_id_1)
+        root_2 = self.find(jira_id_2)
+        if root_1 != root_2:
+            self._parent[root_2] = root_1
+
+
 class CommitGrouper:
     def __init__(self, branch_data: Dict[BranchType, BranchData], jira_id_to_commits: JiraIdToCommitMappings):
         # Example commit messages from git log:
@@ -357,11 +379,17 @@ class CommitGrouper:
         self.jira_id_to_commits: JiraIdToCommitMappings = jira_id_to_commits
         self._groups_by_jira_id: Dict[BranchType, List[CommitGroup]] = self._create_groups()
         self._groups_by_msg: Dict[BranchType, List[CommitGroup]] = self._create_groups_by_message()
+        self._groups_by_jira_id_dict: Dict[BranchType, Dict[FrozenSet, CommitGroup]] or None = None
         self.sanity_check()
         self.group_stats = CommitGroupStats(self._groups_by_jira_id, self._groups_by_msg)
 
-    # TODO store this to property
     def groups_by_jira_id_dict(self) -> Dict[BranchType, Dict[FrozenSet, CommitGroup]]:
+        # Groups are not modified after they are created, so the mapping is built only once
+        if self._groups_by_jira_id_dict is None:
+            self._groups_by_jira_id_dict = self._create_groups_by_jira_id_dict()
+        return self._groups_by_jira_id_dict
+
+    def _create_groups_by_jira_id_dict(self) -> Dict[BranchType, Dict[FrozenSet, CommitGroup]]:
         result: Dict[BranchType, Dict[FrozenSet, CommitGroup]] = {}
         for br_type, br_data in self.branch_data.items():
             result[br_type] = {}
@@ -392,8 +420,6 @@ class CommitGrouper:
             jira_ids_commits_for_branch: Dict[str, List[CommitData]] = self.jira_id_to_commits.get_by_branch_type(
                 br_type
             )
-            visited_commit_hashes: Set[str] = set()
-
             # In the following scenario, grouped_commits could hold ee50a12d60ca19941f13fd123b9e8a8ea5d41f42 twice.
             # for key: COMPX-3136:
             # 0 = {CommitData} CommitData(hash=ee50a12d60ca19941f13fd123b9e8a8ea5d41f42, jira_id=YARN-10295,
@@ -410,39 +436,23 @@ class CommitGrouper:
             # --> SOLUTION: Use set collection type for 'grouped_commits'.
             # --> PROBLEM: This drops away the ordering info of commits.
 
-            all_visited_jira_ids: Set[str] = set()
-            for jira_id, commits in jira_ids_commits_for_branch.items():
-                if jira_id in all_visited_jira_ids:
-                    continue
-                # Get all related jira ids first
-                visited_jira_ids: Set[str] = set()
-                jira_ids: Set[str] = self._get_all_jira_ids(visited_jira_ids, jira_id, jira_ids_commits_for_branch)
-
-                # Get all commits for all jira ids
-                grouped_commits: Set[CommitData] = set()
-                for jid in jira_ids:
-                    grouped_commits.update(jira_ids_commits_for_branch[jid])
+            # Jira IDs mentioned by the same commit are in the same set, the sets are the groups
+            union_find = JiraIdUnionFind()
+            for commits in jira_ids_commits_for_branch.values():
+                for commit in commits:
+                    jira_ids: List[str] = commit.jira_id_data.all_matched_jira_ids
+                    for jid in jira_ids[1:]:
+                        union_find.union(jira_ids[0], jid)
 
+            # Groups are created in the order of the first Jira ID of the sets
+            commits_by_root: Dict[str, Set[CommitData]] = {}
+            for jira_id, commits in jira_ids_commits_for_branch.items():
+                commits_by_root.setdefault(union_find.find(jira_id), set()).update(commits)
+            for grouped_commits in commits_by_root.values():
                 if len(grouped_commits) > 0:
                     groups[br_type].append(CommitGroup(br_type, grouped_commits, CommitMatchType.MATCHED_BY_ID))
-                    visited_commit_hashes.update([c.hash for c in grouped_commits])
-
-                all_visited_jira_ids.update(jira_ids)
         return groups
 
-    def _get_all_jira_ids(self, visited: Set[str], jira_id: str, jira_ids_to_commits_dict: Dict[str, List[CommitData]]):
-        all_jira_ids: Set[str] = set()
-        commits: List[CommitData] = jira_ids_to_commits_dict[jira_id]
-        for commit in commits:
-            all_jira_ids.update(commit.jira_id_data.all_matched_jira_ids)
-            visited.add(jira_id)
-
-        # Make a copy of set for iteration, to avoid: RuntimeError: Set changed size during iteration
-        for jira_id in set(all_jira_ids):
-            if jira_id not in visited:
-                all_jira_ids.update(self._get_all_jira_ids(visited, jira_id, jira_ids_to_commits_dict))
-        return all_jira_ids
-
     def _create_groups_by_message(self) -> Dict[BranchType, List[CommitGroup]]:
         groups: Dict[BranchType, List[CommitGroup]] = {}
         for br_type in self.branch_data.keys():
@@ -1,20 +1,32 @@
 import logging
-from typing import Dict, Tuple
+import re
+from enum import Enum
+from typing import Dict, Tuple, List, Set, Collection
 
 from pythoncommons.file_utils import FileUtils
+from pythoncommons.git_wrapper import GitWrapper
 from pythoncommons.process import CommandRunner
 
 from yarndevtools.commands.branchcomparator.common import BranchType, BranchData
 
 LOG = logging.getLogger(__name__)
 
+# Same pattern as the one used by git_compare.sh: grep -e '[A-Z]\+-[0-9]\+' -o
+JIRA_ID_TOKEN_PATTERN = re.compile(r"[A-Z]+-[0-9]+")
+
+
+class LegacyScriptMode(Enum):
+    NATIVE = "native"
+    SCRIPT = "script"
+
 
 class LegacyScriptRunner:
     @staticmethod
     def start(config, branches, repo_path, matching_result):
-        script_results: Dict[BranchType, Tuple[str, str]] = LegacyScriptRunner._execute_compare_script(
-            config, branches, working_dir=repo_path
-        )
+        if config.legacy_script_mode == LegacyScriptMode.NATIVE:
+            script_results: Dict[BranchType, Tuple[str, str]] = NativeGitCompare.execute(config, branches)
+        else:
+            script_results = LegacyScriptRunner._execute_compare_script(config, branches, working_dir=repo_path)
         for br_type in BranchType:
             branch_data = branches.get_branch(br_type)
             branch_data.unique_jira_ids_legacy_script = LegacyScriptRunner._get_unique_jira_ids_for_branch(
@@ -63,13 +75,18 @@ class LegacyScriptRunner:
 
         return unique_jira_ids
 
+    @staticmethod
+    def get_output_dir(config):
+        output_dir = FileUtils.join_path(config.output_dir, "git_compare_script_output")
+        FileUtils.ensure_dir_created(output_dir)
+        return output_dir
+
     @staticmethod
     def _execute_compare_script(config, branches, working_dir) -> Dict[BranchType, Tuple[str, str]]:
         compare_script = config.legacy_compare_script_path
         master_br_name = branches.get_branch(BranchType.MASTER).shortname
         feature_br_name = branches.get_branch(BranchType.FEATURE).shortname
-        output_dir = FileUtils.join_path(config.output_dir, "git_compare_script_output")
-        FileUtils.ensure_dir_created(output_dir)
+        output_dir = LegacyScriptRunner.get_output_dir(config)
 
         results: Dict[BranchType, Tuple[str, str]] = {
             BranchType.MASTER: LegacyScriptRunner._exec_script_only_on_master(
@@ -98,3 +115,70 @@ class LegacyScriptRunner:
             compare_script, args=args2, working_dir=working_dir, output_file=output_file2, use_tee=True
         )
         return cli_cmd, cli_output
+
+
+class NativeGitCompare:
+    """
+    In-process equivalent of git_compare.sh, working on the commits already parsed by the branch comparator.
+    For both branches, it lists the Jira IDs mentioned by commits that are only on that branch,
+    which are not mentioned anywhere in the history of the other branch.
+    Like the script, a Jira ID is considered mentioned if it is a substring of any commit message of the other branch,
+    and merge commits are skipped.
+    Requires the full history of both branches.
+    """
+
+    @staticmethod
+    def execute(config, branches) -> Dict[BranchType, Tuple[str, str]]:
+        output_dir = LegacyScriptRunner.get_output_dir(config)
+        master_br: BranchData = branches.get_branch(BranchType.MASTER)
+        feature_br: BranchData = branches.get_branch(BranchType.FEATURE)
+        merge_hashes = NativeGitCompare.get_merge_commit_hashes(branches.repo, [master_br.name, feature_br.name])
+        return {
+            BranchType.MASTER: NativeGitCompare._compare(feature_br, master_br, output_dir, merge_hashes),
+            BranchType.FEATURE: NativeGitCompare._compare(master_br, feature_br, output_dir, merge_hashes),
+        }
+
+    @staticmethod
+    def get_merge_commit_hashes(repo: GitWrapper, branch_names: Collection[str]) -> Set[str]:
+        return set(repo.repo.git.rev_list(*branch_names, merges=True).split())
+
+    @staticmethod
+    def _compare(base: BranchData, other: BranchData, output_dir: str, merge_hashes: Set[str]) -> Tuple[str, str]:
+        cmd = f"[native] git_compare.sh {base.shortname} {other.shortname}"
+        lines = [
+            f"{jira_id} exists on branch={other.shortname}, but not exist on {base.shortname}"
+            for jira_id in NativeGitCompare.find_missing_jira_ids(base, other, merge_hashes)
+        ]
+        output = "\n".join(lines)
+        FileUtils.save_to_file(FileUtils.join_path(output_dir, f"only-on-{other.shortname}"), output)
+        return cmd, output
+
+    @staticmethod
+    def find_missing_jira_ids(base: BranchData, other: BranchData, merge_hashes: Set[str]) -> List[str]:
+        """Jira IDs of non-merge commits on other but not on base, not mentioned by any non-merge commit of base."""
+        base_hashes: Set[str] = {c.hash for c in base.commit_objs}
+        mentioned_on_base: Set[str] = NativeGitCompare._create_mention_index(base, merge_hashes)
+        result: List[str] = []
+        # Commit objects are stored in ascending order, the script lists them in the order of git log
+        for commit in reversed(other.commit_objs):
+            if commit.hash in base_hashes or commit.hash in merge_hashes:
+                continue
+            result.extend(
+                jira_id for jira_id in JIRA_ID_TOKEN_PATTERN.findall(commit.message) if jira_id not in mentioned_on_base
+            )
+        return result
+
+    @staticmethod
+    def _create_mention_index(branch: BranchData, merge_hashes: Set[str]) -> Set[str]:
+        # A Jira ID like token is a substring of a commit message if it is a substring of a maximal token,
+        # with a suffix of its project part and a prefix of its number part, e.g. YARN-1 of HADOOPYARN-123
+        result: Set[str] = set()
+        for commit in branch.commit_objs:
+            if commit.hash in merge_hashes:
+                continue
+            for token in JIRA_ID_TOKEN_PATTERN.findall(commit.message):
+                project, number = token.split("-")
+                for i in range(len(project)):
+                    for j in range(1, len(number) + 1):
+                        result.add(f"{project[i:]}-{number[:j]}")
+        return result
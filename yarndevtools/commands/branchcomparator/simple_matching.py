@@ -1,6 +1,9 @@
+import html
 import logging
+import sys
 import typing
-from typing import List, Dict, Tuple
+from functools import cached_property
+from typing import List, Dict, Tuple, Iterator, TextIO
 from typing import Set, Any
 
 from pythoncommons.result_printer import (
@@ -33,6 +36,10 @@ from yarndevtools.commands_common import CommitData
 
 LOG = logging.getLogger(__name__)
 
+# Above this number of commits, the merged list of all commits is not rendered into the summary tables.
+# It is streamed to separate text and HTML files instead.
+ALL_COMMITS_TABLE_STREAMING_THRESHOLD = 5000
+
 
 class SimpleMatchingResult(MatchingResultBase):
     def __init__(self):
@@ -70,31 +77,25 @@ class SimpleCommitMatcherSummaryData(SummaryDataAbs):
             + self.maching_result.unique_commits[BranchType.FEATURE]
             + self.common_commits_after_merge_base()
         )
-        all_commits.sort(key=lambda c: c.date, reverse=True)
+        all_commits.sort(key=lambda c: c.timestamp, reverse=True)
         return all_commits
 
+    @cached_property
+    def presence_matrix(self) -> "SparsePresenceMatrix":
+        commits = self.all_commits
+        branch_names = [self.get_branch(br_type).name for br_type in BranchType]
+        present_rows: List[Set[int]] = [
+            {idx for idx, commit in enumerate(commits) if self.is_commit_present_on_branch(commit, br_type)}
+            for br_type in BranchType
+        ]
+        return SparsePresenceMatrix(commits, branch_names, present_rows)
+
     @property
     def all_commits_presence_matrix(self) -> List[List]:
-        rows: List[List] = []
-        for commit in self.all_commits:
-            jira_id = commit.jira_id
-            row: List[Any] = [jira_id, commit.message, commit.date, commit.committer]
-
-            presence: List[bool] = []
-            if self.is_commit_present_on_branch(commit, BranchType.MASTER) and self.is_commit_present_on_branch(
-                commit, BranchType.FEATURE
-            ):
-                presence = [True, True]
-            elif self.is_commit_present_on_branch(commit, BranchType.MASTER):
-                presence = [True, False]
-            elif self.is_commit_present_on_branch(commit, BranchType.FEATURE):
-                presence = [False, True]
-            row.extend(presence)
-            rows.append(row)
-        return rows
+        return list(self.presence_matrix.rows())
 
     def get_branch_names(self):
-        return [bd.name for bd in self.branch_data.values()]
+        return self.presence_matrix.branch_names
 
     def get_branch(self, br_type: BranchType):
         return self.branch_data[br_type]
@@ -208,79 +209,82 @@ class SimpleCommitMatcher(CommitMatcherBase):
         These unique commits will be saved to the 'unique_commits' property of a given branch. As this is a list,
         the algorithm keeps the original ordering of the commits.
 
+        All lookups are served by hash indexes (see SimpleCommitIndex) so matching is linear in the number of commits.
+        Commit messages are compared in their normalized form.
         """
-        feature_br: BranchData = self.branch_data[BranchType.FEATURE]
-        master_br: BranchData = self.branch_data[BranchType.MASTER]
+        self._match_by_indexes()
+        for br_data in self.branch_data.values():
+            LOG.info(
+                f"Identified {len(self.matching_result.unique_commits[br_data.type])}"
+                f" unique commits on branch: {br_data.name}"
+            )
+
+        summary_data: SimpleCommitMatcherSummaryData = SimpleCommitMatcherSummaryData(
+            config, branches, self.matching_result
+        )
+        # TODO this is a bug, summary table rendering happens here but new result files will be created afterwards
+        self.matching_result.rendered_summary = SimpleRenderedSummary(summary_data, self.matching_result)
+        return self.matching_result
 
+    def _match_by_indexes(self):
+        indexes: Dict[BranchType, SimpleCommitIndex] = {
+            br_type: SimpleCommitIndex(br_data) for br_type, br_data in self.branch_data.items()
+        }
+        master_index: SimpleCommitIndex = indexes[BranchType.MASTER]
+        feature_index: SimpleCommitIndex = indexes[BranchType.FEATURE]
         common_jira_ids: Set[str] = set()
         common_commit_msgs: Set[str] = set()
-        master_commits_by_message: Dict[str, List[CommitData]] = master_br.filtered_commits_by_message
-        feature_commits_by_message: Dict[str, List[CommitData]] = feature_br.filtered_commits_by_message
 
         # List of tuples.
         # First item: Master branch CommitData, second item: feature branch CommitData
-        for master_commit in master_br.commits_after_merge_base:
+        for master_commit in self.branch_data[BranchType.MASTER].commits_after_merge_base:
             master_jira_id = master_commit.jira_id
             if not master_jira_id:
                 # If this commit is without jira id and author was not an item of authors to filter,
                 # then try to match commits across branches by commit message.
-                self.match_by_commit_message(
-                    master_commit, common_commit_msgs, feature_commits_by_message, master_commits_by_message
-                )
-            elif master_jira_id in feature_br.jira_id_to_commits:
+                self.match_by_commit_message(master_commit, common_commit_msgs, feature_index, master_index)
+            elif master_jira_id in feature_index.by_jira_id:
                 # Normal path: Try to match commits across branches by Jira ID
-                self.match_by_jira_id(common_jira_ids, feature_br, master_commit, master_jira_id)
+                self.match_by_jira_id(common_jira_ids, feature_index, master_commit, master_jira_id)
 
-        for br_data in self.branch_data.values():
-            commits_by_msg = (
-                master_commits_by_message if br_data.type == BranchType.MASTER else feature_commits_by_message
-            )
-            self.matching_result.unique_commits[br_data.type] = self._determine_unique_commits(
-                br_data.commits_after_merge_base,
-                commits_by_msg,
-                common_jira_ids,
-                common_commit_msgs,
-            )
-            LOG.info(
-                f"Identified {len(self.matching_result.unique_commits[br_data.type])}"
-                f" unique commits on branch: {br_data.name}"
+        for br_type, br_data in self.branch_data.items():
+            self.matching_result.unique_commits[br_type] = self._determine_unique_commits(
+                br_data.commits_after_merge_base, indexes[br_type], common_jira_ids, common_commit_msgs
             )
 
-        summary_data: SimpleCommitMatcherSummaryData = SimpleCommitMatcherSummaryData(
-            config, branches, self.matching_result
-        )
-        # TODO this is a bug, summary table rendering happens here but new result files will be created afterwards
-        self.matching_result.rendered_summary = SimpleRenderedSummary(summary_data, self.matching_result)
-        return self.matching_result
-
     def match_by_commit_message(
-        self, master_commit, common_commit_msgs, feature_commits_by_message, master_commits_by_message
+        self,
+        master_commit: CommitData,
+        common_commit_msgs: Set[str],
+        feature_index: "SimpleCommitIndex",
+        master_index: "SimpleCommitIndex",
     ):
-        master_commit_msg = master_commit.message
-        if master_commit_msg in master_commits_by_message:
+        master_commit_msg = SimpleCommitIndex.normalize_message(master_commit.message)
+        if master_commit_msg in master_index.by_message:
             LOG.debug(
                 "Trying to match commit by commit message as Jira ID is missing. \n"
                 f"Branch: master branch\n"
                 f"Commit: {CommonUtils.convert_commit_to_str(master_commit)}\n"
             )
             # Master commit message found in missing jira id list of the feature branch, record match
-            if master_commit_msg in feature_commits_by_message:
+            if master_commit_msg in feature_index.by_message:
+                feature_commits: List[CommitData] = feature_index.by_message[master_commit_msg]
                 LOG.warning(
                     "Found match by commit message.\n"
                     f"Branch: master branch\n"
                     f"Master branch commit: {CommonUtils.convert_commit_to_str(master_commit)}\n"
-                    f"Feature branch commit(s): {CommonUtils.convert_commits_to_oneline_strings(feature_commits_by_message[master_commit_msg])}\n"
+                    f"Feature branch commit(s): {CommonUtils.convert_commits_to_oneline_strings(feature_commits)}\n"
                 )
                 common_commit_msgs.add(master_commit_msg)
-                commit_group: RelatedCommitGroupSimple = RelatedCommitGroupSimple(
-                    [master_commit], feature_commits_by_message[master_commit_msg]
-                )
+                commit_group: RelatedCommitGroupSimple = RelatedCommitGroupSimple([master_commit], feature_commits)
                 # ATM, these are groups that contain 1 master / 1 feature commit
                 self.matching_result.after_merge_base.extend(commit_group.get_matched_by_msg)
                 self.matching_result.matched_only_by_message.extend(commit_group.get_matched_by_msg)
 
-    def match_by_jira_id(self, common_jira_ids, feature_br, master_commit, master_jira_id):
-        feature_commits: List[CommitData] = feature_br.jira_id_to_commits[master_jira_id]
+    def match_by_jira_id(
+        self, common_jira_ids: Set[str], feature_index: "SimpleCommitIndex", master_commit, master_jira_id
+    ):
+        feature_commits: List[CommitData] = feature_index.by_jira_id[master_jira_id]
         LOG.debug(
             "Found matching commits by Jira ID. Details: \n"
             f"Master branch commit: {master_commit.as_oneline_string()}\n"
@@ -296,7 +300,7 @@ class SimpleCommitMatcher(CommitMatcherBase):
     @staticmethod
     def _determine_unique_commits(
         commits: List[CommitData],
-        commits_by_message: Dict[str, List[CommitData]],
+        index: "SimpleCommitIndex",
         common_jira_ids: Set[str],
         common_commit_msgs: Set[str],
     ) -> List[CommitData]:
@@ -306,15 +310,117 @@ class SimpleCommitMatcher(CommitMatcherBase):
         # special authored commit and it's not a common commit by its message
         # 2. If Jira ID is in common_jira_ids, it's not a unique commit, either.
         for commit in commits:
-            special_unique_commit: bool = (
-                not commit.jira_id and commit.message in commits_by_message and commit.message not in common_commit_msgs
-            )
+            special_unique_commit: bool = False
+            if not commit.jira_id:
+                message = SimpleCommitIndex.normalize_message(commit.message)
+                special_unique_commit = message in index.by_message and message not in common_commit_msgs
             normal_unique_commit: bool = commit.jira_id is not None and commit.jira_id not in common_jira_ids
             if special_unique_commit or normal_unique_commit:
                 result.append(commit)
         return result
 
 
+class SimpleCommitIndex:
+    """
+    Hash indexes of the commits of a branch, built once per comparison.
+    Jira IDs are mapped to commits and normalized commit messages are mapped to filtered commits without Jira ID.
+    """
+
+    def __init__(self, br_data: BranchData):
+        self.by_jira_id: Dict[str, List[CommitData]] = br_data.jira_id_to_commits
+        self.by_message: Dict[str, List[CommitData]] = {}
+        for message, commits in br_data.filtered_commits_by_message.items():
+            self.by_message.setdefault(self.normalize_message(message), []).extend(commits)
+
+    @staticmethod
+    def normalize_message(message: str) -> str:
+        # Whitespace differences are usually introduced while cherry-picking or backporting commits
+        return " ".join(message.split())
+
+
+class SparsePresenceMatrix:
+    """
+    Presence of commits on branches.
+    Commits are only referenced and for every branch, only the row indices of the present commits are stored.
+    Dense rows of the matrix are generated on demand.
+    """
+
+    def __init__(self, commits: List[CommitData], branch_names: List[str], present_rows: List[Set[int]]):
+        if len(branch_names) != len(present_rows):
+            raise ValueError(f"Presence data is misaligned with branches! Branches: {branch_names}")
+        self.commits = commits
+        self.branch_names = branch_names
+        self._present_rows = present_rows
+
+    def __len__(self):
+        return len(self.commits)
+
+    def presence(self, idx: int) -> List[bool]:
+        return [idx in rows for rows in self._present_rows]
+
+    def rows(self) -> Iterator[List[Any]]:
+        for idx, commit in enumerate(self.commits):
+            yield [commit.jira_id, commit.message, commit.date, commit.committer] + self.presence(idx)
+
+
+class PresenceMatrixWriter:
+    """
+    Writes the presence matrix as a text or HTML table to a stream, row by row.
+    The format follows the ALL_COMMITS_MERGED summary tables: row number, commit details, "X" / "-" for presence.
+    """
+
+    PRESENT = "X"
+    NOT_PRESENT = "-"
+
+    def __init__(self, matrix: SparsePresenceMatrix):
+        self.matrix = matrix
+        h = BranchComparatorHeader
+        self.header = [
+            h.ROW.value,
+            h.JIRA_ID.value,
+            h.COMMIT_MSG.value,
+            h.COMMIT_DATE.value,
+            h.COMMITTER.value,
+        ] + matrix.branch_names
+
+    def _cells(self) -> Iterator[List[str]]:
+        for idx, row in enumerate(self.matrix.rows()):
+            cells = [str(idx + 1)] + ["" if cell is None else str(cell) for cell in row[:4]]
+            cells.extend(self.PRESENT if present else self.NOT_PRESENT for present in row[4:])
+            yield cells
+
+    def write_text(self, stream: TextIO):
+        # Column widths are determined by a pass over the commits, without keeping the rendered rows
+        widths = [len(h) for h in self.header]
+        for cells in self._cells():
+            widths = [max(width, len(cell)) for width, cell in zip(widths, cells)]
+        separator = "+" + "+".join("-" * (width + 2) for width in widths) + "+\n"
+
+        def write_row(cells):
+            stream.write("| " + " | ".join(cell.ljust(width) for cell, width in zip(cells, widths)) + " |\n")
+
+        stream.write(separator)
+        write_row(self.header)
+        stream.write(separator.replace("-", "="))
+        for cells in self._cells():
+            write_row(cells)
+        stream.write(separator)
+
+    def write_html(self, stream: TextIO):
+        stream.write("<table>\n<thead>\n<tr>")
+        stream.write("".join(f"<th>{html.escape(h)}</th>" for h in self.header))
+        stream.write("</tr>\n</thead>\n<tbody>\n")
+        for cells in self._cells():
+            # Same coloring as the colorized table: green if present on all branches, red otherwise
+            presence = cells[5:]
+            color = Color.GREEN.value if all(p == self.PRESENT for p in presence) else Color.RED.value
+            stream.write("<tr>")
+            stream.write("".join(f"<td>{html.escape(cell)}</td>" for cell in cells[:5]))
+            stream.write("".join(f'<td style="color: {color}">{p}</td>' for p in presence))
+            stream.write("</tr>\n")
+        stream.write("</tbody>\n</table>\n")
+
+
 class RelatedCommitGroupSimple:
     def __init__(self, master_commits: List[CommitData], feature_commits: List[CommitData]):
         self.master_commits = master_commits
@@ -339,8 +445,10 @@ class RelatedCommitGroupSimple:
         mc = self.master_commits[0]
         result: List[CommitData]
         for fc in self.feature_commits:
-            match_by_id = mc.jira_id == fc.jira_id
-            match_by_msg = mc.message == fc.message
+            match_by_id = mc.jira_id is not None and mc.jira_id == fc.jira_id
+            match_by_msg = SimpleCommitIndex.normalize_message(mc.message) == SimpleCommitIndex.normalize_message(
+                fc.message
+            )
             if match_by_id and match_by_msg:
                 result_dict[CommitMatchType.MATCHED_BY_BOTH].append((mc, fc))
             elif match_by_id:
@@ -395,25 +503,52 @@ class SimpleOutputManager(OutputManagerAbs):
         for br_data in branch_data.values():
             self.write_to_file_or_console("unique commits", br_data, matching_result.unique_commits[br_data.type])
 
+        rendered_summary: SimpleRenderedSummary = matching_result.rendered_summary
+        if rendered_summary.all_commits_streamed:
+            self.write_all_commits(rendered_summary.summary_data.presence_matrix)
+
+    def write_all_commits(self, matrix: SparsePresenceMatrix):
+        if self.config.console_mode:
+            LOG.info(f"Printing all commits merged ({len(matrix)} rows)")
+            PresenceMatrixWriter(matrix).write_text(sys.stdout)
+        else:
+            self.write_all_commits_files(matrix)
+
+    def write_all_commits_files(self, matrix: SparsePresenceMatrix):
+        writer = PresenceMatrixWriter(matrix)
+        prefix = self._convert_output_type_str_to_file_prefix("all commits merged", add_sep_to_end=False)
+        basename = self._generate_filename(self.config.output_dir, prefix)
+        for file_path, write_func in ((f"{basename}.txt", writer.write_text), (f"{basename}.html", writer.write_html)):
+            LOG.info(f"Saving all commits merged ({len(matrix)} rows) to file: {file_path}")
+            with open(file_path, "w") as f:
+                write_func(f)
+
 
 class SimpleRenderedSummary(RenderedSummaryAbs):
     def __init__(self, summary_data, matching_result):
+        # Large merged commit lists are written by SimpleOutputManager with a PresenceMatrixWriter, row by row,
+        # instead of keeping several rendered copies of them in memory
+        self.all_commits_streamed = len(summary_data.presence_matrix) > ALL_COMMITS_TABLE_STREAMING_THRESHOLD
         # TODO list of RenderedTableType: Error-prone as if any of it is missing, rendering will be wrong
-        super().__init__(
-            summary_data,
-            matching_result,
-            [
-                BranchComparatorTableType.RESULT_FILES,
-                BranchComparatorTableType.UNIQUE_ON_BRANCH,
-                BranchComparatorTableType.COMMON_COMMITS_SINCE_DIVERGENCE,
-                BranchComparatorTableType.ALL_COMMITS_MERGED,
-            ],
-        )
+        table_types = [
+            BranchComparatorTableType.RESULT_FILES,
+            BranchComparatorTableType.UNIQUE_ON_BRANCH,
+            BranchComparatorTableType.COMMON_COMMITS_SINCE_DIVERGENCE,
+        ]
+        if not self.all_commits_streamed:
+            table_types.append(BranchComparatorTableType.ALL_COMMITS_MERGED)
+        super().__init__(summary_data, matching_result, table_types)
 
         self.add_result_files_table()
         self.add_unique_commit_tables(matching_result)
         self.add_matched_commits_table()
-        self.add_all_commits_tables()
+        if self.all_commits_streamed:
+            LOG.info(
+                f"Not rendering {BranchComparatorTableType.ALL_COMMITS_MERGED.header} table into the summary "
+                f"as it has more than {ALL_COMMITS_TABLE_STREAMING_THRESHOLD} rows, it is written separately"
+            )
+        else:
+            self.add_all_commits_tables()
         self.printable_summary_str, self.writable_summary_str, self.html_summary = self.generate_summary_msgs()
 
     def add_matched_commits_table(self):
@@ -3,7 +3,11 @@ from typing import Dict, List
 import re
 import logging
 
+from jira import Issue
 from pythoncommons.jira_wrapper import JiraWrapper, PatchApplicability, AdvancedJiraPatch
+from requests import RequestException
+
+from yarndevtools.common.jira_cache import JiraDocumentCache
 
 LOG = logging.getLogger(__name__)
 
@@ -12,9 +16,21 @@ TRUNK_PATCH_FILENAME_PATTERN_TEMPLATE = r"^(\w+-\d+)$SEPCHAR(\d+)\." + DEFAULT_P
 
 
 class HadoopJiraWrapper(JiraWrapper):
-    def __init__(self, jira_url, default_branch, patches_root, git_wrapper):
+    def __init__(self, jira_url, default_branch, patches_root, git_wrapper, jira_cache: JiraDocumentCache = None):
         super().__init__(jira_url, default_branch, patches_root)
         self.git_wrapper = git_wrapper
+        self.jira_cache = jira_cache
+
+    def get_jira_issue(self, issue_id: str):
+        if not self.jira_cache:
+            return super().get_jira_issue(issue_id)
+        try:
+            raw_issue = self.jira_cache.get_issue_json(self.jira_url, issue_id)
+        except RequestException:
+            LOG.exception("Failed to fetch Jira issue: %s", issue_id)
+            return None
+        # Same as the issue objects of the jira client, but created from the cached JSON
+        return Issue(self.jira._options, self.jira._session, raw=raw_issue)
 
     def get_patches_per_branch(self, issue_id, additional_branches, committed_on_branches):
         issue = self.get_jira_issue(issue_id)
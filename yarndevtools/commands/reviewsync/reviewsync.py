@@ -18,6 +18,7 @@ from yarndevtools.commands.reviewsync.common import ReviewsyncData
 from yarndevtools.commands.reviewsync.jira_wrapper import HadoopJiraWrapper
 from yarndevtools.commands.reviewsync.representation import ReviewSyncOutputManager
 from yarndevtools.commands_common import CommandAbs
+from yarndevtools.common.jira_cache import JiraDocumentCache
 from yarndevtools.common.shared_command_utils import CommandType
 from yarndevtools.constants import TRUNK, ORIGIN_TRUNK, UPSTREAM_JIRA_SERVER_URL
 from yarndevtools.yarn_dev_tools_config import YarnDevToolsConfig
@@ -38,6 +39,8 @@ class ReviewSyncConfig:
         self.full_cmd: str = OsUtils.determine_full_command_filtered(filter_password=True)
         self.downstream_branches = args.branches if hasattr(args, "branches") else []
         self.issues = args.issues if hasattr(args, "issues") else []
+        self.jira_cache_ttl: int = args.jira_cache_ttl if hasattr(args, "jira_cache_ttl") else 0
+        self.use_jira_cache: bool = not args.no_jira_cache if hasattr(args, "no_jira_cache") else True
 
     @staticmethod
     def _validate_args(parser, args):
@@ -73,6 +76,9 @@ class ReviewSyncConfig:
         else:
             raise ValueError("Unknown fetch mode!")
 
+        if hasattr(args, "jira_cache_ttl") and args.jira_cache_ttl < 0:
+            parser.error(f"--jira-cache-ttl should not be negative. Current value: {args.jira_cache_ttl}")
+
     def __str__(self):
         return (
             f"Full command was: {self.full_cmd}\n"
@@ -95,7 +101,13 @@ class ReviewSync(CommandAbs):
         self.branches = self.get_branches(args)
         self.upstream_repo: GitWrapper = upstream_repo
         self.jira_wrapper = HadoopJiraWrapper(
-            UPSTREAM_JIRA_SERVER_URL, DEFAULT_BRANCH, self.config.patches_dir, self.upstream_repo
+            UPSTREAM_JIRA_SERVER_URL,
+            DEFAULT_BRANCH,
+            self.config.patches_dir,
+            self.upstream_repo,
+            jira_cache=(
+                JiraDocumentCache.create_default(self.config.jira_cache_ttl) if self.config.use_jira_cache else None
+            ),
         )
         self.issue_fetch_mode = args.fetch_mode
         if self.issue_fetch_mode == JiraFetchMode.GSHEET:
@@ -132,6 +144,24 @@ class ReviewSync(CommandAbs):
             help="More verbose log",
         )
 
+        parser.add_argument(
+            "--jira-cache-ttl",
+            dest="jira_cache_ttl",
+            type=int,
+            default=0,
+            required=False,
+            help="Number of seconds while downloaded Jira issues are used from the cache without any request. "
+            "With the default value of 0, cached issues are revalidated with a conditional request on every run",
+        )
+        parser.add_argument(
+            "--no-jira-cache",
+            action="store_true",
+            dest="no_jira_cache",
+            default=False,
+            required=False,
+            help="Do not use the on-disk cache of Jira issues, always download them with the Jira client",
+        )
+
         exclusive_group = parser.add_mutually_exclusive_group()
         exclusive_group.add_argument(
             "-i", "--issues", nargs="+", type=str, help="List of Jira issues to check", required=False
@@ -7,6 +7,7 @@ from pythoncommons.date_utils import DateUtils, DATEFORMAT_DASH_COLON
 from pythoncommons.object_utils import ListUtils
 from pythoncommons.string_utils import RegexUtils
 
+from yarndevtools.commands.unittestresultaggregator.common.columnar import ColumnarTestFailures
 from yarndevtools.commands.unittestresultaggregator.constants import MATCH_ALL_LINES_EXPRESSION, MatchExpression
 from yarndevtools.commands.unittestresultaggregator.gsheet import KnownTestFailures, KnownTestFailureInJira
 from yarndevtools.commands.unittestresultaggregator.common.model import (
@@ -27,9 +28,75 @@ import logging
 LOG = logging.getLogger(__name__)
 
 
+class _FailuresPerFilterIndex:
+    def __init__(self, tcf: TestCaseFilter, testcases: List[FailedTestCaseAbs]):
+        # Testcases in reverse chronological order. Sort is stable, so testcases of the same build keep their order.
+        self.sorted_by_date: List[FailedTestCaseAbs] = sorted(testcases, key=lambda ftc: ftc.date(), reverse=True)
+        # Keys are in reverse chronological order as dicts preserve insertion order
+        self.by_date: Dict[datetime.datetime, List[FailedTestCaseAbs]] = {}
+        for testcase in self.sorted_by_date:
+            self.by_date.setdefault(testcase.date(), []).append(testcase)
+        self.dates: List[datetime.datetime] = list(self.by_date.keys())
+
+        # Grouped in the original order of testcases, so that failure dates are listed in the order of processing
+        self.by_tc_key: Dict[TestCaseKey, List[FailedTestCaseAbs]] = defaultdict(list)
+        for testcase in testcases:
+            tc_key = TestCaseKey.create_from(
+                tcf, testcase, use_simple_name=True, use_full_name=False, include_origin=False
+            )
+            self.by_tc_key[tc_key].append(testcase)
+
+    def __len__(self):
+        return len(self.sorted_by_date)
+
+    def get_by_date(self, date: datetime.datetime) -> List[FailedTestCaseAbs]:
+        return self.by_date[date]
+
+    def get_testcases_by_tc_key(self) -> Dict[TestCaseKey, List[FailedTestCaseAbs]]:
+        return self.by_tc_key
+
+    def get_failure_dates_by_tc_key(self) -> Dict[TestCaseKey, List[datetime.datetime]]:
+        return {tc_key: [tc.date() for tc in testcases] for tc_key, testcases in self.by_tc_key.items()}
+
+    def get_latest_n_dates(self, n: int) -> List[FailedTestCaseAbs]:
+        result = []
+        for date in self.dates[:n]:
+            result.extend(self.by_date[date])
+        return result
+
+    def get_since(self, start_date: datetime.datetime) -> List[FailedTestCaseAbs]:
+        result = []
+        for date in self.dates:
+            if date < start_date:
+                break
+            result.extend(self.by_date[date])
+        return result
+
+
+class TestFailureIndex:
+    """
+    Indexes test failures by filter, by date and by testcase key.
+    Each filter is indexed once, lazily, and all derived views (aggregation, latest failures, comparison)
+    are reading from this shared index instead of sorting and grouping the same failures over and over again.
+    """
+
+    def __init__(self, test_failures: TestFailuresByFilters or ColumnarTestFailures):
+        self._test_failures: TestFailuresByFilters or ColumnarTestFailures = test_failures
+        self._by_filter: Dict[TestCaseFilter, _FailuresPerFilterIndex] = {}
+
+    def __getitem__(self, tcf: TestCaseFilter) -> _FailuresPerFilterIndex:
+        if tcf not in self._by_filter:
+            LOG.debug("Indexing test failures for testcase filter: %s", tcf.short_str())
+            if isinstance(self._test_failures, ColumnarTestFailures):
+                self._by_filter[tcf] = self._test_failures.view(tcf)
+            else:
+                self._by_filter[tcf] = _FailuresPerFilterIndex(tcf, self._test_failures[tcf])
+        return self._by_filter[tcf]
+
+
 class _PreAggregationPerFilter:
-    def __init__(self, failures):
-        self._test_failures: TestFailuresByFilters = failures
+    def __init__(self, index: TestFailureIndex):
+        self._index: TestFailureIndex = index
         # TODO TestCaseKey could be replaced with FailedTestCaseAbs if:
         #   - TestCaseKey wouldn't contain TestCaseFilter
         #   - FailedTestCaseAbs would be independent from TestCaseFilter
@@ -38,31 +105,17 @@ class _PreAggregationPerFilter:
         #   - FailedTestCaseAggregated would be simply created from FailedTestCaseAbs or use failed testcase as a field with composition
         self.failure_freqs: Dict[TestCaseKey, int] = {}
         self.latest_failures: Dict[TestCaseKey, datetime.datetime] = {}
-        self.failures_per_tc_key: Dict[TestCaseKey, List[FailedTestCaseAbs]] = defaultdict(list)
-        self.failure_dates: Dict[TestCaseKey, List[datetime.datetime]] = defaultdict(list)
+        self.failures_per_tc_key: Dict[TestCaseKey, List[FailedTestCaseAbs]] = {}
+        self.failure_dates: Dict[TestCaseKey, List[datetime.datetime]] = {}
 
     def perform(self, tcf: TestCaseFilter):
-        for testcase in self._test_failures[tcf]:
-            tc_key = TestCaseKey.create_from(
-                tcf, testcase, use_simple_name=True, use_full_name=False, include_origin=False
-            )
-            self.failures_per_tc_key[tc_key].append(testcase)
-            self.failure_dates[tc_key].append(testcase.date())
-
-            if tc_key not in self.failure_freqs:
-                self.failure_freqs[tc_key] = 1
-                self.latest_failures[tc_key] = testcase.date()
-            else:
-                LOG.trace(
-                    "Found already stored testcase key. "
-                    f"Current testcase: {testcase}, "
-                    f"Previously stored testcase failure freq: {self.failure_freqs[tc_key]}, "
-                )
-                self.failure_freqs[tc_key] = self.failure_freqs[tc_key] + 1
-
-                # Only store latest testcase per TC key
-                if testcase.date() > self.latest_failures[tc_key]:
-                    self.latest_failures[tc_key] = testcase.date()
+        failures = self._index[tcf]
+        self.failures_per_tc_key = failures.get_testcases_by_tc_key()
+        for tc_key, dates in failures.get_failure_dates_by_tc_key().items():
+            self.failure_dates[tc_key] = dates
+            self.failure_freqs[tc_key] = len(dates)
+            # Only store latest testcase per TC key
+            self.latest_failures[tc_key] = max(dates)
 
 
 class _PropertyModifierAggregatorPerFilter:
@@ -84,7 +137,7 @@ class _PropertyModifierAggregatorPerFilter:
             # If parameterized, we can't choose between full names.
             arbitrary_tc: FailedTestCaseAbs = testcases[0]
             parameterized = arbitrary_tc.parameterized()
-            parameterized_more_testcases = parameterized and len(testcases) > 1
+            parameterized_more_testcases = parameterized and self._pre_aggr.failure_freqs[tc_key] > 1
             parameter = arbitrary_tc.parameter() if parameterized else None
 
             # Simple names were also sanity checked that they are the same, choose the first.
@@ -108,9 +161,9 @@ class _PropertyModifierAggregatorPerFilter:
 
 
 class AggregatedTestFailures(UserDict):
-    def __init__(self, filters: TestCaseFilters, test_failures: TestFailuresByFilters):
+    def __init__(self, filters: TestCaseFilters, index: TestFailureIndex):
         super().__init__()
-        self.data: Dict[TestCaseFilter, List[FailedTestCaseAggregated]] = self._aggregate(filters, test_failures)
+        self.data: Dict[TestCaseFilter, List[FailedTestCaseAggregated]] = self._aggregate(filters, index)
         self._by_name: Dict[TestCaseFilter, Dict[str, FailedTestCaseAggregated]] = self._get_testcases_by_name(filters)
 
     def __getitem__(self, tcf):
@@ -119,10 +172,10 @@ class AggregatedTestFailures(UserDict):
     def get_failed_testcases_by_name(self, tcf: TestCaseFilter):
         return self._by_name[tcf]
 
-    def _aggregate(self, filters: TestCaseFilters, test_failures: TestFailuresByFilters):
+    def _aggregate(self, filters: TestCaseFilters, index: TestFailureIndex):
         result = {}
         for tcf in filters:
-            aggr_per_filter = _PreAggregationPerFilter(test_failures)
+            aggr_per_filter = _PreAggregationPerFilter(index)
             aggr_per_filter.perform(tcf)
             aggregator = _PropertyModifierAggregatorPerFilter(aggr_per_filter, self._sanity_check_testcases)
             aggregator.perform()
@@ -212,14 +265,14 @@ class LatestTestFailures(UserDict):
     def __init__(
         self,
         filters: TestCaseFilters,
-        test_failures: TestFailuresByFilters,
+        index: TestFailureIndex,
         last_n_days: int = -1,
         only_last_results: bool = False,
         reset_oldest_day_to_midnight: bool = True,
         strict_mode: bool = False,
     ):
         super().__init__()
-        self._test_failures = test_failures
+        self._index: TestFailureIndex = index
         self.data = self._create_latest_failures(
             filters,
             last_n_days=last_n_days,
@@ -243,21 +296,20 @@ class LatestTestFailures(UserDict):
             raise ValueError("Either last_n_days or only_last_results mode should be enabled.")
 
         start_date = "unknown"
+        if last_n_days > -1:
+            start_date = self._get_start_date(last_n_days, reset_oldest_day_to_midnight)
+            LOG.info(f"Using start date to filter dates from: {start_date}")
+
         result = defaultdict(list)
         for tcf in filters:
-            sorted_testcases = sorted(self._test_failures[tcf], key=lambda ftc: ftc.date(), reverse=True)
-            if not sorted_testcases:
-                return []
+            failures = self._index[tcf]
+            if not failures:
+                continue
 
-            if last_n_days:
-                start_date = self._get_start_date(last_n_days, reset_oldest_day_to_midnight)
-                LOG.info(f"Using start date to filter dates from: {start_date}")
+            if only_last_results:
+                result[tcf] = failures.get_latest_n_dates(1)
             else:
-                start_date = sorted_testcases[0].date()
-
-            for testcase in sorted_testcases:
-                if testcase.date() >= start_date:
-                    result[tcf].append(testcase)
+                result[tcf] = failures.get_since(start_date)
 
         if not result and strict_mode:
             raise ValueError("No latest test failures found! Start date was: {}".format(start_date))
@@ -274,23 +326,15 @@ class LatestTestFailures(UserDict):
 
 class FailedBuilds:
     def __init__(self):
-        self._by_build_url = defaultdict(list)
-        self._by_job_name = defaultdict(list)
+        # Only the dates are stored, the failed builds themselves are not kept after processing them
+        self._dates_by_job_name: Dict[str, List[datetime.datetime]] = defaultdict(list)
 
     def add_build(self, failed_build: FailedBuildAbs):
-        self._by_build_url[failed_build.build_url()].append(failed_build)
-        self._by_job_name[failed_build.job_name()].append(failed_build)
-
-    def get_by_dates(self) -> Dict[str, List[FailedTestCaseAbs]]:
-        res = {}
-        for k, failed_builds in self._by_job_name.items():
-            res[k] = sorted(failed_builds, key=lambda m: m.date(), reverse=True)
-        return res
+        self._dates_by_job_name[failed_build.job_name()].append(failed_build.date())
 
     def get_datetimes(self) -> Dict[str, List[datetime.datetime]]:
         result = {}
-        for job_name, failed_builds in self._by_job_name.items():
-            datetimes: List[datetime.datetime] = [build.date() for build in failed_builds]
+        for job_name, datetimes in self._dates_by_job_name.items():
             result[job_name] = sorted(datetimes, reverse=True)
         return result
 
@@ -307,13 +351,13 @@ class TestFailureComparison(UserDict):
     def __init__(
         self,
         filters: TestCaseFilters,
-        test_failures: TestFailuresByFilters,
+        index: TestFailureIndex,
         compare_with_last: bool = True,
         compare_with_n_days_old: int = -1,
     ):
         super().__init__()
         self._filters = filters
-        self._test_failures = test_failures
+        self._index: TestFailureIndex = index
         self.data: Dict[TestCaseFilter, BuildComparisonResult] = self._compare(
             compare_with_last=compare_with_last, compare_with_n_days_old=compare_with_n_days_old
         )
@@ -326,12 +370,13 @@ class TestFailureComparison(UserDict):
         result = {}
         for tcf in self._filters:
             LOG.debug("Creating failure comparison for testcase filter: %s", tcf)
-            sorted_testcases = sorted(self._test_failures[tcf], key=lambda ftc: ftc.date(), reverse=True)
-            if not sorted_testcases:
+            failures = self._index[tcf]
+            if not failures:
                 LOG.warning("No failed testcases found for testcase filter: %s", tcf)
-                return
+                result[tcf] = BuildComparisonResult.create_empty()
+                continue
 
-            latest_tcs, old_build_tcs = self._get_comparable_testcase_lists(sorted_testcases, last_n_days)
+            latest_tcs, old_build_tcs = self._get_comparable_testcase_lists(failures, last_n_days)
             latest_tc_keys: Set[str] = set(latest_tcs.keys())
             older_tc_keys: Set[str] = set(old_build_tcs.keys())
 
@@ -358,62 +403,43 @@ class TestFailureComparison(UserDict):
 
     @staticmethod
     def _get_comparable_testcase_lists(
-        sorted_testcases: List[FailedTestCaseAbs], last_n_days: int
+        failures: _FailuresPerFilterIndex, last_n_days: int
     ) -> Tuple[Dict[str, FailedTestCaseAbs], Dict[str, FailedTestCaseAbs]]:
         # Find all testcases for latest build
-        reference_date: datetime.datetime = sorted_testcases[0].date()
-        latest_testcases, start_idx = TestFailureComparison._find_index_of_tc_with_first_different_date(
-            reference_date, sorted_testcases
-        )
+        reference_date: datetime.datetime = failures.dates[0]
+        latest_testcases: Dict[str, FailedTestCaseAbs] = {
+            tc.simple_name(): tc for tc in failures.get_by_date(reference_date)
+        }
 
         # Find all testcases for build to compare:
         # Either build before last build or build with specified "distance" from the latest build
-        testcases_to_compare = TestFailureComparison._find_testcases_to_compare(
-            sorted_testcases, reference_date, last_n_days, start_idx
-        )
+        testcases_to_compare = TestFailureComparison._find_testcases_to_compare(failures, reference_date, last_n_days)
 
         # If we haven't found any other testcase, it means delta_days haven't reached the given number of days.
         # Relax criteria
-        if not testcases_to_compare:
-            next_date = sorted_testcases[start_idx].date()
-            for i in range(start_idx, len(sorted_testcases)):
-                tc = sorted_testcases[i]
-                if not tc.date() == next_date:
-                    break
+        if not testcases_to_compare and len(failures.dates) > 1:
+            next_date = failures.dates[1]
+            for tc in failures.get_by_date(next_date):
                 testcases_to_compare[tc.simple_name()] = tc
 
         return latest_testcases, testcases_to_compare
 
     @staticmethod
-    def _find_testcases_to_compare(sorted_testcases, reference_date, last_n_days, start_idx):
+    def _find_testcases_to_compare(failures: _FailuresPerFilterIndex, reference_date, last_n_days):
         stored_delta: int or None = None
         testcases_to_compare: Dict[str, FailedTestCaseAbs] = {}
-        for i in range(len(sorted_testcases) - 1, start_idx, -1):
-            tc = sorted_testcases[i]
-            delta_days = (reference_date - tc.date()).days
-            if stored_delta and delta_days != stored_delta:
+        # Walk the dates of older builds, starting from the oldest one
+        for date in reversed(failures.dates[1:]):
+            delta_days = (reference_date - date).days
+            if stored_delta is not None and delta_days != stored_delta:
                 break
 
             if delta_days <= last_n_days:
-                if not stored_delta:
-                    stored_delta = delta_days
-                testcases_to_compare[tc.simple_name()] = tc
+                stored_delta = delta_days
+                for tc in failures.get_by_date(date):
+                    testcases_to_compare[tc.simple_name()] = tc
         return testcases_to_compare
 
-    @staticmethod
-    def _find_index_of_tc_with_first_different_date(reference_date, sorted_testcases):
-        latest_testcases: Dict[str, FailedTestCaseAbs] = {}
-        start_idx = 0
-        while True:
-            tc = sorted_testcases[start_idx]
-            if tc.date() != reference_date:
-                # We found a new date, will be processed with the next loop
-                break
-
-            latest_testcases[tc.simple_name()] = tc
-            start_idx += 1
-        return latest_testcases, start_idx
-
 
 class KnownTestFailureChecker:
     def __init__(
@@ -479,12 +505,17 @@ class KnownTestFailureChecker:
 
 
 class AggregationResults:
-    def __init__(self, testcase_filter_defs: TestCaseFilterDefinitions, known_failures: KnownTestFailures):
+    def __init__(
+        self,
+        testcase_filter_defs: TestCaseFilterDefinitions,
+        known_failures: KnownTestFailures,
+        columnar_store: bool = False,
+    ):
         self._match_all_testcases: bool = self._should_match_all_testcases(testcase_filter_defs)
         self._testcase_filter_defs: TestCaseFilterDefinitions = testcase_filter_defs
         self._known_failures: KnownTestFailures = known_failures
         self._aggregation_results: FinalAggregationResults = FinalAggregationResults(
-            self._testcase_filter_defs.ALL_VALID_FILTERS
+            self._testcase_filter_defs.ALL_VALID_FILTERS, columnar_store=columnar_store
         )
 
         # This is a temporary dict - usually for a context of a message
@@ -573,18 +604,20 @@ class AggregationResults:
     def finish_processing(self):
         self.print_objects()
 
+        # Sort and group the failures only once, all derived views are reading from this index
+        index = TestFailureIndex(self._aggregation_results.test_failures)
         self._aggregation_results._aggregated = AggregatedTestFailures(
             self._testcase_filter_defs.get_aggregate_filters(),
-            self._aggregation_results.test_failures,
+            index,
         )
         self._aggregation_results._latest_failures = LatestTestFailures(
             self._testcase_filter_defs.LATEST_FAILURE_FILTERS,
-            self._aggregation_results.test_failures,
+            index,
             only_last_results=True,
         )
         self._aggregation_results._comparison = TestFailureComparison(
             self._testcase_filter_defs.LATEST_FAILURE_FILTERS,
-            self._aggregation_results.test_failures,
+            index,
             compare_with_last=True,
         )
         self._aggregation_results._known_failure_checker = KnownTestFailureChecker(
@@ -641,8 +674,12 @@ class AggregationResults:
 
 
 class FinalAggregationResults:
-    def __init__(self, all_filters: TestCaseFilters):
-        self.test_failures = TestFailuresByFilters(all_filters)
+    def __init__(self, all_filters: TestCaseFilters, columnar_store: bool = False):
+        if columnar_store:
+            LOG.info("Using columnar store for test failures")
+            self.test_failures = ColumnarTestFailures(all_filters)
+        else:
+            self.test_failures = TestFailuresByFilters(all_filters)
         self._aggregated: AggregatedTestFailures = None
         self._comparison: TestFailureComparison = None
         self._latest_failures: LatestTestFailures = None
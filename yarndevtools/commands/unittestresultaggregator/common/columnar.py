@@ -0,0 +1,233 @@
+import datetime
+import logging
+from array import array
+from typing import Dict, List, Set, Tuple
+
+from yarndevtools.commands.unittestresultaggregator.common.model import (
+    TestCaseFilter,
+    TestCaseFilters,
+    FailedBuildAbs,
+    FailedTestCase,
+    TestCaseKey,
+)
+
+LOG = logging.getLogger(__name__)
+
+
+class ColumnarFailedBuild(FailedBuildAbs):
+    """
+    Failed build that is resolved from the build columns of ColumnarTestFailures.
+    """
+
+    def __init__(self, store: "ColumnarTestFailures", build_id: int):
+        super().__init__([])
+        self._store = store
+        self._build_id = build_id
+
+    def build_url(self) -> str:
+        return self._store.build_urls[self._build_id]
+
+    def job_name(self) -> str:
+        return self._store.build_job_names[self._build_id]
+
+    def build_number(self) -> str:
+        return self._store.build_numbers[self._build_id]
+
+    def origin(self):
+        return self._store.build_origins[self._build_id]
+
+    def date(self) -> datetime.datetime:
+        return self._store.build_dates[self._build_id]
+
+    def message_id(self) -> str:
+        return self._store.build_message_ids[self._build_id]
+
+    def thread_id(self) -> str:
+        return self._store.build_thread_ids[self._build_id]
+
+
+class ColumnarTestFailures:
+    """
+    Memory-compact alternative of TestFailuresByFilters.
+    Every failure is stored as a row of integer-encoded, array-backed columns: testcase id and build id.
+    Testcase names, filters and the properties of builds are stored only once, in the encoding tables.
+    Testcase objects are not stored: they are created on demand, when they are returned to the caller.
+    """
+
+    def __init__(self, all_filters: TestCaseFilters):
+        # Encoding tables
+        self._filter_ids: Dict[TestCaseFilter, int] = {}
+        self._testcase_ids: Dict[str, int] = {}
+        self._testcase_names: List[str] = []
+        self._simple_names: List[str] = []
+        self._build_ids: Dict[Tuple[str, str, str, int], int] = {}
+        # Same semantics as the testcase cache of TestFailuresByFilters: (filter id, testcase id, origin)
+        self._seen: Set[Tuple[int, int, str]] = set()
+
+        # Build columns, indexed by build id
+        self.build_job_names: List[str] = []
+        self.build_numbers: List[str] = []
+        self.build_urls: List[str] = []
+        self.build_origins: List[str] = []
+        self.build_dates: List[datetime.datetime] = []
+        self.build_message_ids: List[str] = []
+        self.build_thread_ids: List[str] = []
+        # Build dates in microseconds since the epoch, used for ordering and grouping
+        self._build_encoded_dates = array("q")
+        self._builds: List[ColumnarFailedBuild] = []
+
+        # Failure columns, indexed by row
+        self._testcase_col = array("I")
+        self._build_col = array("I")
+        # Rows of every filter, indexed by filter id
+        self._rows_by_filter: List[array] = []
+
+        for tcf in all_filters:
+            self._encode_filter(tcf)
+
+    def __len__(self):
+        return len(self._testcase_col)
+
+    def __getitem__(self, tcf) -> List[FailedTestCase]:
+        return self.materialize(self.get_rows(tcf))
+
+    def get_filters(self):
+        return self._filter_ids.keys()
+
+    def add(self, tcf: TestCaseFilter, failed_testcase: FailedTestCase):
+        filter_id = self._encode_filter(tcf)
+        testcase_id = self._encode_testcase(failed_testcase)
+        key = (filter_id, testcase_id, failed_testcase.origin())
+        if key in self._seen:
+            LOG.trace(f"Found already existing testcase: {failed_testcase.full_name()}, filter: {tcf.short_str()}")
+            return
+        self._seen.add(key)
+
+        self._rows_by_filter[filter_id].append(len(self._testcase_col))
+        self._testcase_col.append(testcase_id)
+        self._build_col.append(self._encode_build(failed_testcase.failed_build()))
+
+    def _encode_filter(self, tcf: TestCaseFilter) -> int:
+        if tcf not in self._filter_ids:
+            self._filter_ids[tcf] = len(self._rows_by_filter)
+            self._rows_by_filter.append(array("I"))
+        return self._filter_ids[tcf]
+
+    def _encode_testcase(self, failed_testcase: FailedTestCase) -> int:
+        full_name = failed_testcase.full_name()
+        if full_name not in self._testcase_ids:
+            self._testcase_ids[full_name] = len(self._testcase_names)
+            self._testcase_names.append(full_name)
+            self._simple_names.append(failed_testcase.simple_name())
+        return self._testcase_ids[full_name]
+
+    def _encode_build(self, failed_build: FailedBuildAbs) -> int:
+        encoded_date = self.encode_date(failed_build.date())
+        key = (failed_build.job_name(), failed_build.build_number(), failed_build.origin(), encoded_date)
+        if key not in self._build_ids:
+            build_id = len(self.build_dates)
+            self._build_ids[key] = build_id
+            self.build_job_names.append(failed_build.job_name())
+            self.build_numbers.append(failed_build.build_number())
+            self.build_urls.append(failed_build.build_url())
+            self.build_origins.append(failed_build.origin())
+            self.build_dates.append(failed_build.date())
+            self.build_message_ids.append(failed_build.message_id())
+            self.build_thread_ids.append(failed_build.thread_id())
+            self._build_encoded_dates.append(encoded_date)
+            self._builds.append(ColumnarFailedBuild(self, build_id))
+        return self._build_ids[key]
+
+    @staticmethod
+    def encode_date(date: datetime.datetime) -> int:
+        return int(date.timestamp() * 1_000_000)
+
+    def get_rows(self, tcf: TestCaseFilter) -> array:
+        if tcf not in self._filter_ids:
+            return array("I")
+        return self._rows_by_filter[self._filter_ids[tcf]]
+
+    def get_testcase_id(self, row: int) -> int:
+        return self._testcase_col[row]
+
+    def get_simple_name(self, row: int) -> str:
+        return self._simple_names[self._testcase_col[row]]
+
+    def get_encoded_date(self, row: int) -> int:
+        return self._build_encoded_dates[self._build_col[row]]
+
+    def get_date(self, row: int) -> datetime.datetime:
+        return self.build_dates[self._build_col[row]]
+
+    def materialize(self, rows) -> List[FailedTestCase]:
+        return [
+            FailedTestCase(self._testcase_names[self._testcase_col[row]], self._builds[self._build_col[row]])
+            for row in rows
+        ]
+
+    def view(self, tcf: TestCaseFilter) -> "ColumnarFailuresPerFilter":
+        return ColumnarFailuresPerFilter(self, tcf)
+
+
+class ColumnarFailuresPerFilter:
+    """
+    Per-filter view over ColumnarTestFailures, with the same interface as the entries of TestFailureIndex.
+    Ordering, grouping and aggregation is done on the integer columns.
+    Testcase objects are only created for the failures that are returned, and they are not kept by the view.
+    """
+
+    def __init__(self, store: ColumnarTestFailures, tcf: TestCaseFilter):
+        self._store = store
+        self._tcf = tcf
+        self._rows: array = store.get_rows(tcf)
+        # Sort is stable, so testcases of the same build keep their order
+        self._sorted_rows = array("I", sorted(self._rows, key=store.get_encoded_date, reverse=True))
+        # Keys are in reverse chronological order as dicts preserve insertion order
+        self._rows_by_date: Dict[int, array] = {}
+        for row in self._sorted_rows:
+            self._rows_by_date.setdefault(store.get_encoded_date(row), array("I")).append(row)
+        self.dates: List[datetime.datetime] = [store.get_date(rows[0]) for rows in self._rows_by_date.values()]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _materialize(self, rows) -> List[FailedTestCase]:
+        return self._store.materialize(rows)
+
+    @property
+    def sorted_by_date(self) -> List[FailedTestCase]:
+        return self._materialize(self._sorted_rows)
+
+    def get_by_date(self, date: datetime.datetime) -> List[FailedTestCase]:
+        return self._materialize(self._rows_by_date[ColumnarTestFailures.encode_date(date)])
+
+    def _get_tc_key(self, row: int) -> TestCaseKey:
+        return TestCaseKey(self._tcf, self._store.get_simple_name(row))
+
+    def get_testcases_by_tc_key(self) -> Dict[TestCaseKey, List[FailedTestCase]]:
+        # One testcase per distinct testcase name is enough to describe the testcases of a key
+        first_rows: Dict[TestCaseKey, Dict[int, int]] = {}
+        for row in self._rows:
+            first_rows.setdefault(self._get_tc_key(row), {}).setdefault(self._store.get_testcase_id(row), row)
+        return {tc_key: self._materialize(rows.values()) for tc_key, rows in first_rows.items()}
+
+    def get_failure_dates_by_tc_key(self) -> Dict[TestCaseKey, List[datetime.datetime]]:
+        result: Dict[TestCaseKey, List[datetime.datetime]] = {}
+        for row in self._rows:
+            result.setdefault(self._get_tc_key(row), []).append(self._store.get_date(row))
+        return result
+
+    def get_latest_n_dates(self, n: int) -> List[FailedTestCase]:
+        result = []
+        for rows in list(self._rows_by_date.values())[:n]:
+            result.extend(self._materialize(rows))
+        return result
+
+    def get_since(self, start_date: datetime.datetime) -> List[FailedTestCase]:
+        start = ColumnarTestFailures.encode_date(start_date)
+        result = []
+        for date, rows in self._rows_by_date.items():
+            if date < start:
+                break
+            result.extend(self._materialize(rows))
+        return result
@@ -63,6 +63,12 @@ class FailedBuildAbs(ABC):
     def date(self) -> datetime.datetime:
         pass
 
+    def message_id(self) -> str:
+        return ""
+
+    def thread_id(self) -> str:
+        return ""
+
     def short_str(self):
         return f"Job: {self.job_name()}\n" f"build number: {self.build_number()}"
 
@@ -124,6 +130,12 @@ class FailedBuildFromEmail(FailedBuildAbs):
     def date(self) -> datetime.datetime:
         return self._email_content.date
 
+    def message_id(self) -> str:
+        return self._email_content.msg_id
+
+    def thread_id(self) -> str:
+        return self._email_content.thread_id
+
 
 class AggregatedFailurePropertyFilter(Enum):
     UNKNOWN = ("unknown", "known_failure", True)
@@ -168,6 +180,10 @@ class FailedTestCaseAbs(ABC):
     def job_name(self) -> str:
         pass
 
+    @abstractmethod
+    def failed_build(self) -> FailedBuildAbs:
+        pass
+
 
 @dataclass
 class BuildComparisonResult:
@@ -458,6 +474,9 @@ class FailedTestCase(FailedTestCaseAbs):
     def job_name(self) -> str:
         return self._failed_build.job_name()
 
+    def failed_build(self) -> FailedBuildAbs:
+        return self._failed_build
+
 
 class TestFailuresByFilters(UserDict):
     def __init__(self, all_filters: TestCaseFilters):
@@ -65,6 +65,15 @@ class UnitTestResultAggregatorCommonParserParams:
             "value specified by the --gsheet-worksheet argument.",
         )
 
+        parser.add_argument(
+            "--columnar-store",
+            dest="columnar_store",
+            action="store_true",
+            default=False,
+            help="Store failed testcases in a memory-compact, columnar representation during aggregation. "
+            "Recommended for aggregating long histories of test results.",
+        )
+
         exclusive_group = parser.add_mutually_exclusive_group(required=True)
         exclusive_group.add_argument(
             "-p", "--print", action="store_true", dest="do_print", help="Print results to console", required=False
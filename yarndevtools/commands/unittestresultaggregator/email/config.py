@@ -54,7 +54,9 @@ class UnitTestResultAggregatorConfig:
         self.console_mode = getattr(args, "console mode", False)
         self.abbrev_tc_package: str = getattr(args, "abbrev_testcase_package", None)
         self.summary_mode = args.summary_mode
+        self.columnar_store: bool = getattr(args, "columnar_store", False)
         self.output_dir = output_dir
+        self.known_failures_cache_dir = FileUtils.join_path(output_dir, "known_failures_cache")
         self.session_dir = ProjectUtils.get_session_dir_under_child_dir(FileUtils.basename(output_dir))
         self._full_cmd: str = OsUtils.determine_full_command_filtered(filter_password=True)
 
@@ -107,6 +109,7 @@ class UnitTestResultAggregatorConfig:
             f"Output dir: {self.output_dir}\n"
             f"Account email: {self.account_email}\n"
             f"Email cache dir: {self.email_cache_dir}\n"
+            f"Known test failures cache dir: {self.known_failures_cache_dir}\n"
             f"Session dir: {self.session_dir}\n"
             f"Console mode: {self.console_mode}\n"
             f"Gmail query: {self.gmail_query}\n"
@@ -119,6 +122,7 @@ class UnitTestResultAggregatorConfig:
             f"Truncate subject with: {self.truncate_origin_with}\n"
             f"Abbreviate testcase package: {self.abbrev_tc_package}\n"
             f"Summary mode: {self.summary_mode}\n"
+            f"Columnar store: {self.columnar_store}\n"
         )
 
     @property
@@ -6,7 +6,6 @@ from googleapiwrapper.common import ServiceType
 from googleapiwrapper.gmail_api import GmailWrapper, ThreadQueryResults
 from googleapiwrapper.gmail_domain import GmailMessage
 from googleapiwrapper.google_auth import GoogleApiAuthorizer
-from googleapiwrapper.google_sheet import GSheetWrapper
 from pythoncommons.url_utils import UrlUtils
 
 from yarndevtools.cdsw.constants import SECRET_PROJECTS_DIR
@@ -21,7 +20,7 @@ from yarndevtools.commands.unittestresultaggregator.constants import (
     OperationMode,
 )
 from yarndevtools.commands.unittestresultaggregator.db.model import EmailContent
-from yarndevtools.commands.unittestresultaggregator.gsheet import KnownTestFailures
+from yarndevtools.commands.unittestresultaggregator.gsheet import KnownTestFailures, BatchGSheetWrapper
 from yarndevtools.common.common_model import JenkinsJobUrl
 
 LOG = logging.getLogger(__name__)
@@ -50,8 +49,12 @@ class EmailUtilsForAggregators:
 
     def fetch_known_test_failures(self):
         if self.config.operation_mode == OperationMode.GSHEET:
-            gsheet_wrapper = GSheetWrapper(self.config.gsheet_options)
-            return KnownTestFailures(gsheet_wrapper=gsheet_wrapper, gsheet_jira_table=self.config.gsheet_jira_table)
+            gsheet_wrapper = BatchGSheetWrapper(self.config.gsheet_options)
+            return KnownTestFailures(
+                gsheet_wrapper=gsheet_wrapper,
+                gsheet_jira_table=self.config.gsheet_jira_table,
+                cache_dir=self.config.known_failures_cache_dir,
+            )
         return None
 
     def get_gmail_query(self):
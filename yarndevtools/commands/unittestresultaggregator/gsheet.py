@@ -1,14 +1,22 @@
 import datetime
+import json
+import os
 from collections import defaultdict
 from dataclasses import dataclass
 from typing import List, Dict
 
+from googleapiwrapper.google_sheet import GSheetWrapper, ROWS, COLS
 from pythoncommons.date_utils import DateUtils
+from pythoncommons.file_utils import FileUtils
 
 import logging
 
 LOG = logging.getLogger(__name__)
 
+KNOWN_FAILURES_FIRST_COLUMN = "A"
+KNOWN_FAILURES_LAST_COLUMN = "E"
+DEFAULT_PAGE_SIZE = 500
+
 
 @dataclass(eq=True, frozen=True)
 class KnownTestFailureInJira:
@@ -17,10 +25,125 @@ class KnownTestFailureInJira:
     resolution_date: datetime.datetime
 
 
+@dataclass
+class WorksheetUpdate:
+    worksheet_name: str
+    header: List[str]
+    data: List[List[str]]
+
+
+class BatchGSheetWrapper(GSheetWrapper):
+    """
+    GSheetWrapper that can write the data of multiple worksheets with one batch request per operation,
+    so the number of Sheets API calls does not depend on the number of worksheets.
+    """
+
+    @staticmethod
+    def _get_range_to_update(header: List[str], rows: int):
+        col_letter = chr(ord("a") + len(header) - 1).upper()
+        return "{}:{}{}".format(GSheetWrapper.A1, col_letter, rows)
+
+    def write_data_batch(self, updates: List[WorksheetUpdate], create_not_existing_worksheet=False):
+        """
+        Same as calling write_data with clear_range=True for each worksheet.
+        :param updates: Data to write, one item per worksheet
+        :param create_not_existing_worksheet: Whether to create worksheets that are not existing in the spreadsheet
+        :return:
+        """
+        if not updates:
+            return
+        unknown_worksheets = [u.worksheet_name for u in updates if u.worksheet_name not in self.options.worksheets]
+        if unknown_worksheets:
+            raise ValueError(
+                f"Provided worksheet names are not available: {unknown_worksheets}. "
+                f"Available worksheets: {self.options.worksheets}"
+            )
+
+        sheet = self.client.open(self.options.spreadsheet)
+        existing_worksheets = {ws.title for ws in sheet.worksheets()}
+        missing_worksheets = list(
+            dict.fromkeys(u.worksheet_name for u in updates if u.worksheet_name not in existing_worksheets)
+        )
+        if missing_worksheets:
+            if not create_not_existing_worksheet:
+                raise ValueError(f"Worksheets were not found with names: {missing_worksheets}")
+            LOG.info(f"Creating worksheets: {missing_worksheets}, rows: {ROWS}, columns: {COLS}")
+            sheet.batch_update(
+                {
+                    "requests": [
+                        {
+                            "addSheet": {
+                                "properties": {"title": ws, "gridProperties": {"rowCount": ROWS, "columnCount": COLS}}
+                            }
+                        }
+                        for ws in missing_worksheets
+                    ]
+                }
+            )
+
+        ranges_to_clear = [self._get_range_to_clear(self.DEFAULT_RANGE_TO_CLEAR, u.worksheet_name) for u in updates]
+        # Same workaround as in clear_range: clear A1:A1 of every worksheet after clearing the whole range
+        ranges_to_clear.extend(self._get_range_to_clear("A1:A1", u.worksheet_name) for u in updates)
+        LOG.info("Clearing all values from sheet '%s', ranges: %s", sheet.title, ranges_to_clear)
+        sheet.values_batch_clear(body={"ranges": ranges_to_clear})
+
+        data = []
+        for update in updates:
+            all_values = [update.header] + update.data
+            range_to_update = self._get_range_to_update(update.header, len(all_values))
+            data.append(
+                {"range": self._get_range_to_clear(range_to_update, update.worksheet_name), "values": all_values}
+            )
+        LOG.info("Adding values to sheet '%s', ranges: %s", sheet.title, [d["range"] for d in data])
+        sheet.values_batch_update(body={"valueInputOption": "RAW", "data": data})
+
+
+class KnownTestFailuresSnapshotCache:
+    """
+    Stores the raw rows of the known test failures worksheet on disk, along with the revision of the spreadsheet.
+    A snapshot is only valid as long as the revision of the remote spreadsheet is unchanged.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _get_file_path(self, worksheet_name: str):
+        file_name = "".join(c if c.isalnum() else "_" for c in worksheet_name)
+        return FileUtils.join_path(self.cache_dir, f"{file_name}.json")
+
+    def get(self, worksheet_name: str, revision: str) -> List[List[str]] or None:
+        file_path = self._get_file_path(worksheet_name)
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            LOG.warning("Failed to read known test failures snapshot from file: %s", file_path, exc_info=True)
+            return None
+        if snapshot.get("worksheet") != worksheet_name or snapshot.get("revision") != revision:
+            LOG.info("Known test failures snapshot is outdated. File: %s", file_path)
+            return None
+        return snapshot["rows"]
+
+    def save(self, worksheet_name: str, revision: str, rows: List[List[str]]):
+        FileUtils.ensure_dir_created(self.cache_dir)
+        file_path = self._get_file_path(worksheet_name)
+        with open(file_path, "w") as f:
+            json.dump({"worksheet": worksheet_name, "revision": revision, "rows": rows}, f)
+        LOG.info("Saved snapshot of known test failures to file: %s", file_path)
+
+
 class KnownTestFailures:
-    def __init__(self, gsheet_wrapper=None, gsheet_jira_table=None):
+    def __init__(self, gsheet_wrapper=None, gsheet_jira_table=None, cache_dir=None, page_size=DEFAULT_PAGE_SIZE):
+        if page_size < 1:
+            raise ValueError(f"Page size should be a positive number. Current value: {page_size}")
         self._testcases_to_jiras: List[KnownTestFailureInJira] = []
         self.gsheet_wrapper = gsheet_wrapper
+        self.cache: KnownTestFailuresSnapshotCache or None = (
+            KnownTestFailuresSnapshotCache(cache_dir) if cache_dir else None
+        )
+        self.page_size = page_size
         if gsheet_jira_table:
             self._testcases_to_jiras: List[KnownTestFailureInJira] = self._load_and_convert_known_test_failures_in_jira(
                 gsheet_jira_table
@@ -44,8 +167,9 @@ class KnownTestFailures:
         return result
 
     def _load_and_convert_known_test_failures_in_jira(self, gsheet_jira_table) -> List[KnownTestFailureInJira]:
-        raw_data_from_gsheet = self.gsheet_wrapper.read_data(gsheet_jira_table, "A1:E150")
-        LOG.info(f"Successfully loaded data from worksheet: {gsheet_jira_table}")
+        raw_data_from_gsheet = self._read_rows(gsheet_jira_table)
+        if not raw_data_from_gsheet:
+            raise ValueError(f"Known test failures table is empty. Worksheet: {gsheet_jira_table}")
 
         header: List[str] = raw_data_from_gsheet[0]
         expected_header = ["Testcase", "Jira", "Resolution date"]
@@ -67,6 +191,44 @@ class KnownTestFailures:
 
         return known_tc_failures
 
+    def _read_rows(self, gsheet_jira_table) -> List[List[str]]:
+        revision = self._get_revision() if self.cache else None
+        if revision:
+            rows = self.cache.get(gsheet_jira_table, revision)
+            if rows is not None:
+                LOG.info(f"Loaded data of worksheet '{gsheet_jira_table}' from snapshot, revision: {revision}")
+                return rows
+
+        rows = self._read_rows_paged(gsheet_jira_table)
+        LOG.info(f"Successfully loaded data from worksheet: {gsheet_jira_table}")
+        if revision:
+            self.cache.save(gsheet_jira_table, revision, rows)
+        return rows
+
+    def _read_rows_paged(self, gsheet_jira_table) -> List[List[str]]:
+        # The worksheet is opened once and all pages are fetched with a single request.
+        # Pages of empty grid rows are returned as empty ranges.
+        sheet = self.gsheet_wrapper.client.open(self.gsheet_wrapper.options.spreadsheet)
+        worksheet = sheet.worksheet(gsheet_jira_table)
+        ranges = []
+        for start_row in range(1, worksheet.row_count + 1, self.page_size):
+            end_row = min(start_row + self.page_size - 1, worksheet.row_count)
+            ranges.append(f"{KNOWN_FAILURES_FIRST_COLUMN}{start_row}:{KNOWN_FAILURES_LAST_COLUMN}{end_row}")
+        rows = []
+        for page in worksheet.batch_get(ranges):
+            rows.extend(page)
+        return rows
+
+    def _get_revision(self) -> str or None:
+        try:
+            sheet = self.gsheet_wrapper.client.open(self.gsheet_wrapper.options.spreadsheet)
+            return sheet.get_lastUpdateTime()
+        except Exception:
+            LOG.warning(
+                "Failed to query revision of spreadsheet, not using known test failures snapshot", exc_info=True
+            )
+            return None
+
     @staticmethod
     def _preprocess_row(row):
         row_len = len(row)
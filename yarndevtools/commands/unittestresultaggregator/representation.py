@@ -1,9 +1,9 @@
 import copy
 import datetime
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple
 from enum import Enum
-from typing import Dict, List, Sized, Callable
+from typing import Dict, List, Sized, Callable, Tuple
 
 from googleapiwrapper.gmail_api import ThreadQueryResults
 from pythoncommons.file_utils import FileUtils
@@ -28,10 +28,10 @@ from yarndevtools.commands.unittestresultaggregator.common.model import (
     FailedTestCaseAbs,
     TestCaseFilters,
     AggregatedFailurePropertyFilter,
-    FailedBuildFromEmail,
+    FailedBuildAbs,
 )
 from yarndevtools.commands.unittestresultaggregator.common.aggregation import AggregationResults
-from yarndevtools.commands.unittestresultaggregator.db.model import EmailContent
+from yarndevtools.commands.unittestresultaggregator.gsheet import WorksheetUpdate
 from yarndevtools.constants import (
     ReportFile,
 )
@@ -128,6 +128,42 @@ class SummaryGenerator:
     def process_aggregation_results(
         cls, aggr_results: AggregationResults, query_result: ThreadQueryResults, config, output_manager
     ):
+        data_dict: Dict[TableDataType, Callable[[TestCaseFilter, OutputFormatRules], List[List[str]]]] = {
+            TableDataType.MATCHED_LINES: lambda tcf, out_fmt: DataConverter.convert_data_to_rows(
+                aggr_results.get_failures(tcf),
+                out_fmt,
+            ),
+            TableDataType.MATCHED_LINES_AGGREGATED: lambda tcf, out_fmt: DataConverter.render_aggregated_rows_table(
+                aggr_results.get_aggregated_testcases_by_filters(tcf),
+                out_fmt,
+            ),
+            TableDataType.MAIL_SUBJECTS: lambda tcf, out_fmt: DataConverter.convert_email_subjects(query_result),
+            TableDataType.UNIQUE_MAIL_SUBJECTS: lambda tcf, out_fmt: DataConverter.convert_unique_email_subjects(
+                query_result
+            ),
+            TableDataType.LATEST_FAILURES: lambda tcf, out_fmt: DataConverter.render_latest_failures_table(
+                aggr_results.get_latest_failures(tcf)
+            ),
+            TableDataType.BUILD_COMPARISON: lambda tcf, out_fmt: DataConverter.render_build_comparison_table(
+                aggr_results.get_build_comparison(tcf)
+            ),
+            TableDataType.UNKNOWN_FAILURES: lambda tcf, out_fmt: DataConverter.render_aggregated_rows_table(
+                aggr_results.get_aggregated_testcases_by_filters(tcf, AggregatedFailurePropertyFilter.UNKNOWN),
+                out_fmt,
+                basic_mode=True,
+            ),
+            TableDataType.REOCCURRED_FAILURES: lambda tcf, out_fmt: DataConverter.render_aggregated_rows_table(
+                aggr_results.get_aggregated_testcases_by_filters(tcf, AggregatedFailurePropertyFilter.REOCCURRED),
+                out_fmt,
+                basic_mode=True,
+            ),
+            TableDataType.TESTCASES_TO_JIRAS: lambda tcf, out_fmt: DataConverter.render_aggregated_rows_table(
+                aggr_results.get_aggregated_testcases_by_filters(tcf), out_fmt
+            ),
+        }
+        # Shared by all reports: Tables are converted and rendered once, then serialized to each output format
+        table_models = TableModelCache(data_dict)
+
         if config.summary_mode != SummaryMode.NONE.value:
             # TODO fix
             # truncate = self.config.operation_mode == OperationMode.PRINT
@@ -146,40 +182,6 @@ class SummaryGenerator:
                     config.abbrev_tc_package = None
                     config.truncate_origin_with = None
 
-            data_dict: Dict[TableDataType, Callable[[TestCaseFilter, OutputFormatRules], List[List[str]]]] = {
-                TableDataType.MATCHED_LINES: lambda tcf, out_fmt: DataConverter.convert_data_to_rows(
-                    aggr_results.get_failures(tcf),
-                    out_fmt,
-                ),
-                TableDataType.MATCHED_LINES_AGGREGATED: lambda tcf, out_fmt: DataConverter.render_aggregated_rows_table(
-                    aggr_results.get_aggregated_testcases_by_filters(tcf),
-                    out_fmt,
-                ),
-                TableDataType.MAIL_SUBJECTS: lambda tcf, out_fmt: DataConverter.convert_email_subjects(query_result),
-                TableDataType.UNIQUE_MAIL_SUBJECTS: lambda tcf, out_fmt: DataConverter.convert_unique_email_subjects(
-                    query_result
-                ),
-                TableDataType.LATEST_FAILURES: lambda tcf, out_fmt: DataConverter.render_latest_failures_table(
-                    aggr_results.get_latest_failures(tcf)
-                ),
-                TableDataType.BUILD_COMPARISON: lambda tcf, out_fmt: DataConverter.render_build_comparison_table(
-                    aggr_results.get_build_comparison(tcf)
-                ),
-                TableDataType.UNKNOWN_FAILURES: lambda tcf, out_fmt: DataConverter.render_aggregated_rows_table(
-                    aggr_results.get_aggregated_testcases_by_filters(tcf, AggregatedFailurePropertyFilter.UNKNOWN),
-                    out_fmt,
-                    basic_mode=True,
-                ),
-                TableDataType.REOCCURRED_FAILURES: lambda tcf, out_fmt: DataConverter.render_aggregated_rows_table(
-                    aggr_results.get_aggregated_testcases_by_filters(tcf, AggregatedFailurePropertyFilter.REOCCURRED),
-                    out_fmt,
-                    basic_mode=True,
-                ),
-                TableDataType.TESTCASES_TO_JIRAS: lambda tcf, out_fmt: DataConverter.render_aggregated_rows_table(
-                    aggr_results.get_aggregated_testcases_by_filters(tcf), out_fmt
-                ),
-            }
-
             detailed_render_confs = cls.detailed_render_confs(config, truncate)
             short_render_confs = cls.short_render_confs(config, truncate)
             detailed_report_files: Dict[SummaryMode, str] = {
@@ -191,10 +193,10 @@ class SummaryGenerator:
                 SummaryMode.TEXT: ReportFile.SHORT_TXT.value,
             }
 
-            cls._render_reports(config, data_dict, output_manager, short_render_confs, short_report_files)
+            cls._render_reports(config, table_models, output_manager, short_render_confs, short_report_files)
 
             table_renderer = cls._render_reports(
-                config, data_dict, output_manager, detailed_render_confs, detailed_report_files
+                config, table_models, output_manager, detailed_render_confs, detailed_report_files
             )
 
             # These should be written to files regardless of the SummaryMode setting
@@ -203,36 +205,42 @@ class SummaryGenerator:
 
         if config.operation_mode == OperationMode.GSHEET:
             # We need to re-generate all the data here, as table renderer might rendered truncated data.
+            # Untruncated data is only converted again if it was not converted for any of the reports.
             LOG.info("Updating Google sheet with data...")
+            untruncated_out_fmt = OutputFormatRules(False, None, None)
+            worksheet_updates: List[WorksheetUpdate] = []
             for tcf in config.testcase_filter_defs.get_non_aggregate_filters():
-                failed_testcases = aggr_results.get_failures(tcf)
-                table_data = DataConverter.convert_data_to_rows(failed_testcases, OutputFormatRules(False, None, None))
-                SummaryGenerator._write_to_sheet(
-                    config, "data", cls.matched_testcases_all_header, output_manager, table_data, tcf
+                table_data = table_models.get_rows(TableDataType.MATCHED_LINES, tcf, untruncated_out_fmt)
+                worksheet_updates.append(
+                    cls._create_worksheet_update(config, "data", cls.matched_testcases_all_header, table_data, tcf)
                 )
             for tcf in config.testcase_filter_defs.get_aggregate_filters():
-                failed_testcases = aggr_results.get_aggregated_testcases_by_filters(tcf)
-                table_data = DataConverter.render_aggregated_rows_table(
-                    failed_testcases, OutputFormatRules(False, None, None)
-                )
-                SummaryGenerator._write_to_sheet(
-                    config,
-                    f"aggregated data for aggregation filter {tcf}",
-                    cls.matched_testcases_aggregated_header_full,
-                    output_manager,
-                    table_data,
-                    tcf,
+                table_data = table_models.get_rows(TableDataType.MATCHED_LINES_AGGREGATED, tcf, untruncated_out_fmt)
+                worksheet_updates.append(
+                    cls._create_worksheet_update(
+                        config,
+                        f"aggregated data for aggregation filter {tcf}",
+                        cls.matched_testcases_aggregated_header_full,
+                        table_data,
+                        tcf,
+                    )
                 )
+            # Write all filters with a constant number of Sheets API calls
+            output_manager.update_gsheet_batch(worksheet_updates, create_not_existing=True)
+        table_models.log_stats()
 
     @classmethod
-    def _render_reports(cls, config, data_dict, output_manager, render_confs, report_files: Dict[SummaryMode, str]):
+    def _render_reports(cls, config, table_models, output_manager, render_confs, report_files: Dict[SummaryMode, str]):
         LOG.debug(f"Rendering reports by configs: {render_confs}.\n" f"Report files: {report_files}")
         text_based_report: bool = config.summary_mode in [SummaryMode.TEXT.value, SummaryMode.ALL.value]
         html_report: bool = config.summary_mode in [SummaryMode.HTML.value, SummaryMode.ALL.value]
 
-        table_renderer = TableRenderer()
+        table_renderer = TableRenderer(table_models)
         for render_conf in render_confs:
-            table_renderer.render_by_config(render_conf, data_dict[render_conf.data_type])
+            data_type = render_conf.data_type
+            table_renderer.render_by_config(
+                render_conf, lambda tcf, out_fmt: table_models.get_rows(data_type, tcf, out_fmt)
+            )
         summary_generator = SummaryGenerator(table_renderer)
 
         if text_based_report:
@@ -338,14 +346,14 @@ class SummaryGenerator:
         ] + SummaryGenerator.short_render_confs(config, truncate)
 
     @staticmethod
-    def _write_to_sheet(config, data_descriptor, header, output_manager, table_data, tcf):
+    def _create_worksheet_update(config, data_descriptor, header, table_data, tcf) -> WorksheetUpdate:
         worksheet_name: str = config.get_worksheet_name(tcf)
         LOG.info(
             f"Writing GSheet {data_descriptor}. "
             f"Worksheet name: {worksheet_name}, "
             f"Number of lines will be written: {len(table_data)}"
         )
-        output_manager.update_gsheet(header, table_data, worksheet_name=worksheet_name, create_not_existing=True)
+        return WorksheetUpdate(worksheet_name, header, table_data)
 
     def _regular_table(self, dt: TableDataType, alias=None):
         rendered_tables = self.table_renderer.get_tables(
@@ -421,10 +429,48 @@ class SummaryGenerator:
         )
 
 
+class TableModelCache:
+    """
+    Memoized table models for summary generation.
+    Data is converted to rows via DataConverter once per data type, testcase filter and output format rules,
+    and rendered by ResultPrinter once per table. Each report and output format is serialized from the cached tables.
+    """
+
+    def __init__(self, data_dict: Dict[TableDataType, Callable[[TestCaseFilter, OutputFormatRules], List[List[str]]]]):
+        self._data_dict = data_dict
+        self._rows: Dict[Tuple, List[List[str]]] = {}
+        self._rendered: Dict[Tuple, Dict[TabulateTableFormat, GenericTableWithHeader]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get_rows(
+        self, data_type: TableDataType, tcf: TestCaseFilter or None, out_fmt: OutputFormatRules or None
+    ) -> List[List[str]]:
+        key = (data_type, tcf, astuple(out_fmt) if out_fmt else None)
+        if key in self._rows:
+            self._hits += 1
+        else:
+            self._misses += 1
+            self._rows[key] = self._data_dict[data_type](tcf, out_fmt)
+        return self._rows[key]
+
+    def get_rendered(self, key: Tuple, render_func: Callable[[], Dict[TabulateTableFormat, GenericTableWithHeader]]):
+        if key in self._rendered:
+            self._hits += 1
+        else:
+            self._misses += 1
+            self._rendered[key] = render_func()
+        return self._rendered[key]
+
+    def log_stats(self):
+        LOG.debug("Table model cache stats: hits: %d, misses: %d", self._hits, self._misses)
+
+
 # TODO refactor: Try to extract this to common class (pythoncommons?), BranchComparator should move to this implementation later.
 class TableRenderer:
-    def __init__(self):
+    def __init__(self, table_models: TableModelCache = None):
         self._tables: Dict[str, List[GenericTableWithHeader]] = {}
+        self._table_models: TableModelCache or None = table_models
 
     def render_by_config(
         self,
@@ -470,6 +516,27 @@ class TableRenderer:
                     f"First row of data table: {data[0]}"
                 )
 
+        header_title = dtype.header
+        if append_to_header_title:
+            header_title += append_to_header_title
+
+        if self._table_models:
+            # The same table can be part of multiple reports, only render it once
+            cache_key = (dtype, table_alias, header_title, tuple(header), tuple(formats), colorized, id(data))
+            result_dict = self._table_models.get_rendered(
+                cache_key, lambda: self._render_with_printer(header, data, formats, colorized, header_title)
+            )
+        else:
+            result_dict = self._render_with_printer(header, data, formats, colorized, header_title)
+
+        for table_with_header in result_dict.values():
+            self._add_table(dtype, table_with_header, alias=table_alias)
+        return result_dict
+
+    @staticmethod
+    def _render_with_printer(
+        header: List[str], data: List[List[str]], formats: List[TabulateTableFormat], colorized, header_title: str
+    ) -> Dict[TabulateTableFormat, GenericTableWithHeader]:
         render_conf = UnitTestResultAggregatorTableRenderingConfig(
             row_callback=lambda row: row,
             print_result=False,
@@ -483,14 +550,9 @@ class TableRenderer:
         )
         result_dict: Dict[TabulateTableFormat, GenericTableWithHeader] = {}
         for table_fmt, rendered_table in rendered_tables.items():
-            header_title = dtype.header
-            if append_to_header_title:
-                header_title += append_to_header_title
-            table_with_header = GenericTableWithHeader(
+            result_dict[table_fmt] = GenericTableWithHeader(
                 header_title, header, data, rendered_table, table_fmt=table_fmt, colorized=colorized
             )
-            self._add_table(dtype, table_with_header, alias=table_alias)
-            result_dict[table_fmt] = table_with_header
         return result_dict
 
     def _add_table(self, dtype: TableDataType, table: GenericTableWithHeader, alias=None):
@@ -588,14 +650,8 @@ class UnitTestResultOutputManager:
         rendered_table: str = table_renderer.get_tables(data_type)[0].table
         self._write_to_configured_destinations(rendered_table, data_type)
 
-    def update_gsheet(self, header, data, worksheet_name: str = None, create_not_existing=False):
-        self.gsheet_wrapper.write_data(
-            header,
-            data,
-            clear_range=True,
-            worksheet_name=worksheet_name,
-            create_not_existing_worksheet=create_not_existing,
-        )
+    def update_gsheet_batch(self, updates: List[WorksheetUpdate], create_not_existing=False):
+        self.gsheet_wrapper.write_data_batch(updates, create_not_existing_worksheet=create_not_existing)
 
 
 # TODO refactor: This should be a simple renderer class without any data business logic
@@ -614,20 +670,14 @@ class DataConverter:
                 out_fmt, testcase, truncate_origin_by_length, truncate_testcase_by_length
             )
 
-            # TODO yarndevtoolsv2 DB: dirty hack to get email fields
-            message_id, thread_id = "", ""
-            failed_build: FailedBuildFromEmail = getattr(testcase, "_failed_build")
-            if isinstance(failed_build, FailedBuildFromEmail):
-                email_content: EmailContent = getattr(failed_build, "_email_content")
-                message_id, thread_id = email_content.msg_id, email_content.thread_id
-
+            failed_build: FailedBuildAbs = testcase.failed_build()
             data_table.append(
                 [
                     str(testcase.date()),
                     origin,
                     testcase_name,
-                    message_id,
-                    thread_id,
+                    failed_build.message_id(),
+                    failed_build.thread_id(),
                 ]
             )
         return data_table
@@ -74,12 +74,16 @@ class UnitTestResultAggregator(CommandAbs):
             email_content_processors = [DBWriterEmailContentProcessor(self._db)]
 
         if self.config.execution_mode == ExecutionMode.DB_ONLY:
-            result = AggregationResults(self.config.testcase_filter_defs, self._known_test_failures)
+            result = AggregationResults(
+                self.config.testcase_filter_defs, self._known_test_failures, columnar_store=self.config.columnar_store
+            )
             self._db_aggregator.aggregate(result)
 
         if self.config.should_fetch_mails:
             gmail_query_result = self._email_utils.perform_gmail_query()
-            result = AggregationResults(self.config.testcase_filter_defs, self._known_test_failures)
+            result = AggregationResults(
+                self.config.testcase_filter_defs, self._known_test_failures, columnar_store=self.config.columnar_store
+            )
             self._email_utils.process_gmail_results(
                 gmail_query_result,
                 result,
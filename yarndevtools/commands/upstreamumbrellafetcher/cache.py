@@ -0,0 +1,105 @@
+import hashlib
+import json
+import logging
+import os
+from enum import Enum
+from typing import Any, Dict, List
+
+from pythoncommons.file_utils import JsonFileUtils
+
+from yarndevtools.commands_common import BackportedJira, BackportedCommit, CommitData
+
+LOG = logging.getLogger(__name__)
+
+UMBRELLA_DATA_CACHE_VERSION = 1
+
+
+class UmbrellaFetcherPhase(Enum):
+    UPSTREAM_COMMITS = "upstream_commits"
+    DOWNSTREAM_COMMITS = "downstream_commits"
+    CHANGED_FILES = "changed_files"
+    CHANGES_OF_FILES = "changes_of_files"
+
+
+class UmbrellaDataCache:
+    """
+    On-disk cache of the results of the umbrella fetcher phases.
+    Every result is stored with the key of the inputs it was computed from (e.g. subjiras, branch tips),
+    so subsequent runs only recompute the phases whose inputs have changed.
+    """
+
+    def __init__(self, file_path: str, use_cached_data: bool = True):
+        self.file_path = file_path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if use_cached_data:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        data, _ = JsonFileUtils.load_data_from_json_file(self.file_path, swallow_value_error=True)
+        if not data or data.get("version") != UMBRELLA_DATA_CACHE_VERSION:
+            LOG.info("Ignoring umbrella data cache with unknown version from file: %s", self.file_path)
+            return
+        self._entries = data["entries"]
+        LOG.info("Loaded %d cached umbrella data entries from: %s", len(self._entries), self.file_path)
+
+    def save(self):
+        JsonFileUtils.write_data_to_file_as_json(
+            self.file_path, {"version": UMBRELLA_DATA_CACHE_VERSION, "entries": self._entries}
+        )
+        LOG.info("Saved %d umbrella data entries to: %s", len(self._entries), self.file_path)
+
+    @staticmethod
+    def _entry_name(phase: UmbrellaFetcherPhase, name: str or None):
+        return f"{phase.value}/{name}" if name else phase.value
+
+    @staticmethod
+    def _key_of(inputs: Dict[str, Any]) -> str:
+        return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    def get(self, phase: UmbrellaFetcherPhase, inputs: Dict[str, Any], name: str = None) -> Any or None:
+        """Returns the cached result of the phase, or None if it was not computed yet from the same inputs."""
+        entry_name = self._entry_name(phase, name)
+        entry = self._entries.get(entry_name)
+        if not entry or entry["key"] != self._key_of(inputs):
+            LOG.info("No up-to-date cached umbrella data for: %s", entry_name)
+            return None
+        LOG.info("Using cached umbrella data for: %s", entry_name)
+        return entry["data"]
+
+    def put(self, phase: UmbrellaFetcherPhase, inputs: Dict[str, Any], data: Any, name: str = None):
+        self._entries[self._entry_name(phase, name)] = {"key": self._key_of(inputs), "data": data}
+
+    @staticmethod
+    def serialize_backported_jiras(backported_jiras: Dict[str, BackportedJira]) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            jira_id: [
+                {
+                    "hash": bc.commit_obj.hash,
+                    "jira_id": bc.commit_obj.jira_id,
+                    "message": bc.commit_obj.message,
+                    "date": bc.commit_obj.date,
+                    "reverted": bc.commit_obj.reverted,
+                    "branches": bc.branches,
+                }
+                for bc in backported_jira.commits
+            ]
+            for jira_id, backported_jira in backported_jiras.items()
+        }
+
+    @staticmethod
+    def deserialize_backported_jiras(data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, BackportedJira]:
+        return {
+            jira_id: BackportedJira(
+                jira_id,
+                [
+                    BackportedCommit(
+                        CommitData(c["hash"], c["jira_id"], c["message"], c["date"], reverted=c["reverted"]),
+                        c["branches"],
+                    )
+                    for c in commits
+                ],
+            )
+            for jira_id, commits in data.items()
+        }
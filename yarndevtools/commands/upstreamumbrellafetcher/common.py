@@ -4,6 +4,7 @@ from enum import Enum
 from typing import List, Dict
 
 from pythoncommons.git_wrapper import GitLogLineFormat
+from pythoncommons.jira_wrapper import JiraStatus
 from pythoncommons.string_utils import auto_str
 
 from yarndevtools.commands_common import (
@@ -13,6 +14,8 @@ from yarndevtools.commands_common import (
 )
 
 LOG = logging.getLogger(__name__)
+JIRA_SEARCH_PAGE_SIZE = 100
+JIRA_KEYS_PER_SEARCH = 100
 
 
 @dataclass
@@ -70,13 +73,18 @@ class JiraUmbrellaData:
         self.subjira_ids: List[str] = []
         self.jira_ids_and_titles: Dict[str, str] = {}
         self.jira_html: str or None = None
-        self.piped_jira_ids: str or None = None
         self.list_of_changed_files: List[str] or None = None
         self.execution_mode: ExecutionMode or None = None
         self.backported_jiras: Dict[str, BackportedJira] = {}  # Key: Jira ID
         self.upstream_commits_by_branch: Dict[str, UpstreamCommitsPerBranch] = {}  # Key: branch name
+        self.upstream_branches_by_jira_id: Dict[str, List[str]] = {}  # Key: Jira ID
         self.jira_data = None
 
+    def add_upstream_commits(self, upstream_commits: UpstreamCommitsPerBranch):
+        self.upstream_commits_by_branch[upstream_commits.branch] = upstream_commits
+        for jira_id in dict.fromkeys(c.jira_id for c in upstream_commits.matched_upstream_commitdata_list):
+            self.upstream_branches_by_jira_id.setdefault(jira_id, []).append(upstream_commits.branch)
+
     @property
     def no_of_jiras(self):
         return len(self.subjira_ids)
@@ -86,6 +94,46 @@ class JiraUmbrellaData:
         return len(self.list_of_changed_files)
 
 
+class SubjiraStatusFetcher:
+    """
+    Fetches statuses of the subjiras of an umbrella with a few paged JQL searches, instead of querying them one by one.
+    Subtasks are found by their parent, other subjiras (e.g. linked issues) are searched in batches of keys.
+    Only the status fields of the issues are fetched.
+    """
+
+    STATUS_FIELDS = "status,resolution"
+
+    def __init__(self, jira, page_size: int = JIRA_SEARCH_PAGE_SIZE, keys_per_search: int = JIRA_KEYS_PER_SEARCH):
+        self.jira = jira
+        self.page_size = page_size
+        self.keys_per_search = keys_per_search
+
+    def get_statuses(self, umbrella_jira_id: str, subjira_ids: List[str]) -> Dict[str, JiraStatus]:
+        statuses = self._search(f"parent = {umbrella_jira_id}")
+        missing_jira_ids = [jira_id for jira_id in subjira_ids if jira_id not in statuses]
+        for i in range(0, len(missing_jira_ids), self.keys_per_search):
+            keys = ", ".join(missing_jira_ids[i : i + self.keys_per_search])
+            statuses.update(self._search(f"key in ({keys})"))
+        LOG.info("Fetched statuses of %d jiras for umbrella: %s", len(statuses), umbrella_jira_id)
+        return statuses
+
+    def _search(self, jql: str) -> Dict[str, JiraStatus]:
+        statuses: Dict[str, JiraStatus] = {}
+        start_at = 0
+        while True:
+            # Unknown keys should not fail the whole query
+            issues = self.jira.search_issues(
+                jql, startAt=start_at, maxResults=self.page_size, fields=self.STATUS_FIELDS, validate_query=False
+            )
+            for issue in issues:
+                statuses[issue.key] = JiraStatus(
+                    issue.fields.status.name, issue.fields.resolution, issue.fields.status.statusCategory.name
+                )
+            start_at += len(issues)
+            if not issues or start_at >= issues.total:
+                return statuses
+
+
 class ExecutionMode(Enum):
     AUTO_BRANCH_MODE = "auto_branch_mode"
     MANUAL_BRANCH_MODE = "manual_branch_mode"
@@ -1,5 +1,6 @@
 import logging
 import os
+import re
 import sys
 from dataclasses import dataclass
 from typing import List, Any, Collection, Set, Dict
@@ -8,9 +9,8 @@ from pythoncommons.file_utils import FileUtils
 from pythoncommons.git_wrapper import GitWrapper, GitLogLineFormat
 from pythoncommons.jira_utils import JiraUtils
 from pythoncommons.jira_wrapper import JiraWrapper, JiraStatus
-from pythoncommons.object_utils import ListUtils, PickleUtils
+from pythoncommons.object_utils import ListUtils
 from pythoncommons.os_utils import OsUtils
-from pythoncommons.process import CommandRunner
 from pythoncommons.project_utils import ProjectUtils
 from pythoncommons.string_utils import StringUtils
 
@@ -21,18 +21,33 @@ from pythoncommons.git_constants import (
     ORIGIN,
 )
 
+from yarndevtools.commands.upstreamumbrellafetcher.cache import UmbrellaDataCache, UmbrellaFetcherPhase
 from yarndevtools.commands.upstreamumbrellafetcher.common import (
     JiraUmbrellaData,
     ExecutionMode,
     UpstreamCommitsPerBranch,
+    SubjiraStatusFetcher,
 )
 from yarndevtools.commands.upstreamumbrellafetcher.representation import (
     UmbrellaFetcherOutputManager,
     UmbrellaFetcherRenderedSummary,
     UmbrellaFetcherSummaryData,
 )
-from yarndevtools.commands_common import CommitData, BackportedJira, BackportedCommit, CommandAbs
-from yarndevtools.common.shared_command_utils import SharedCommandUtils, CommandType
+from yarndevtools.commands_common import (
+    CommitData,
+    BackportedJira,
+    BackportedCommit,
+    CommandAbs,
+    GIT_LOG_FORMATS,
+    read_git_process_lines,
+)
+from yarndevtools.common.jira_cache import JiraDocumentCache, DEFAULT_JIRA_CACHE_TTL_SECONDS
+from yarndevtools.common.shared_command_utils import (
+    SharedCommandUtils,
+    CommandType,
+    BranchContainmentIndex,
+    JiraIdMatcher,
+)
 from yarndevtools.constants import (
     ORIGIN_TRUNK,
     SummaryFile,
@@ -42,7 +57,7 @@ from yarndevtools.constants import (
 from yarndevtools.yarn_dev_tools_config import YarnDevToolsConfig, DEFAULT_BASE_BRANCH
 
 LOG = logging.getLogger(__name__)
-PICKLED_DATA_FILENAME = "pickled_umbrella_data.obj"
+UMBRELLA_DATA_CACHE_FILENAME = "umbrella_data_cache.json"
 COMMON_UPSTREAM_BRANCHES = [ORIGIN_TRUNK, "branch-3.3", "branch-3.2", "branch-3.1"]
 DEFAULT_BRANCH = "trunk"
 
@@ -127,6 +142,11 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
 
         # These fields will be assigned when data is fetched
         self.data: JiraUmbrellaData
+        self.cache: UmbrellaDataCache
+        # In force mode, cached Jira documents are always revalidated
+        self.jira_cache = JiraDocumentCache.create_default(
+            ttl_seconds=0 if self.config.force_mode else DEFAULT_JIRA_CACHE_TTL_SECONDS
+        )
         self.output_manager = UmbrellaFetcherOutputManager(self.config)
 
     @staticmethod
@@ -140,7 +160,7 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
             "--force-mode",
             action="store_true",
             dest="force_mode",
-            help="Force fetching data from jira and use git log commands to find all changes.",
+            help="Don't use cached umbrella data: fetch data from jira and use git log commands to find all changes.",
         )
         parser.add_argument(
             "--ignore-changes",
@@ -179,15 +199,8 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
         self.upstream_repo.fetch(all=True)
         self.downstream_repo.fetch(all=True)
         if self.config.force_mode:
-            LOG.info("FORCE MODE is on")
-            self.do_fetch()
-        else:
-            loaded = self.load_pickled_umbrella_data()
-            if not loaded:
-                self.do_fetch()
-            else:
-                LOG.info("Loaded pickled data from: %s", self.pickled_data_file)
-                self.print_summary()
+            LOG.info("FORCE MODE is on, cached umbrella data won't be used")
+        self.do_fetch()
 
     def get_file_path_from_basedir(self, file_name):
         return FileUtils.join_path(self.config.umbrella_result_basedir, file_name)
@@ -221,8 +234,12 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
         return self.get_file_path_from_basedir("intermediate-results.txt")
 
     @property
-    def pickled_data_file(self):
-        return self.get_file_path_from_basedir(PICKLED_DATA_FILENAME)
+    def branch_containment_cache_dir(self):
+        return FileUtils.join_path(self.config.output_dir, "branch_containment_cache")
+
+    @property
+    def umbrella_data_cache_file(self):
+        return self.get_file_path_from_basedir(UMBRELLA_DATA_CACHE_FILENAME)
 
     @property
     def patches_basedir(self):
@@ -231,12 +248,10 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
     def do_fetch(self):
         LOG.info("Fetching jira umbrella data...")
         self.data = JiraUmbrellaData()
+        self.cache = UmbrellaDataCache(self.umbrella_data_cache_file, use_cached_data=not self.config.force_mode)
         self.fetch_jira_ids()
         self.find_upstream_commits_and_save_to_file()
-        if self.config.execution_mode == ExecutionMode.AUTO_BRANCH_MODE:
-            self.find_downstream_commits_auto_mode()
-        elif self.config.execution_mode == ExecutionMode.MANUAL_BRANCH_MODE:
-            self.data.backported_jiras = self.find_downstream_commits_manual_mode()
+        self.find_downstream_commits()
         self.data.execution_mode = self.config.execution_mode
 
         if self.config.ignore_changes:
@@ -248,18 +263,10 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
         # TODO Write self.subjira_statuses to file
         # TODO Write self.subjira_statuses to table
         self.write_all_changes_files()
-        self.pickle_umbrella_data()
+        LOG.debug("Final umbrella data object: %s", self.data)
+        self.cache.save()
         self.print_summary()
 
-    def load_pickled_umbrella_data(self):
-        LOG.info("Trying to load pickled data from file: %s", self.pickled_data_file)
-        if FileUtils.does_file_exist(self.pickled_data_file):
-            self.data = PickleUtils.load(self.pickled_data_file)
-            return True
-        else:
-            LOG.info("Pickled umbrella data file not found under path: %s", self.pickled_data_file)
-            return False
-
     def log_current_upstream_repo_branch(self, force_switch_branch=True):
         curr_branch = self.upstream_repo.get_current_branch_name()
         LOG.info("Current branch: %s", curr_branch)
@@ -272,7 +279,7 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
 
     def fetch_jira_ids(self):
         LOG.info("Fetching HTML of jira: %s", self.config.jira_id)
-        self.data.jira_html = JiraUtils.download_jira_html(
+        self.data.jira_html = self.jira_cache.download_jira_html(
             UPSTREAM_JIRA_BASE_URL, self.config.jira_id, self.jira_html_file
         )
         self.data.jira_ids_and_titles = JiraUtils.parse_subjiras_and_jira_titles_from_umbrella_html(
@@ -282,37 +289,30 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
         if not self.data.subjira_ids:
             raise ValueError(f"Cannot find subjiras for jira with id: {self.config.jira_id}")
         LOG.info("Found %d subjiras: %s", len(self.data.subjira_ids), self.data.subjira_ids)
-        self.data.piped_jira_ids = "|".join(self.data.subjira_ids)
 
     def find_upstream_commits_and_save_to_file(self):
-        # It's quite complex to grep for multiple jira IDs with gitpython, so let's rather call an external command
         upstream_branches = self._get_branches()
         for upstream_branch in upstream_branches:
-            git_log_result = self.upstream_repo.log(
-                SharedCommandUtils.ensure_remote_specified(upstream_branch), oneline_with_date=True
-            )
-            cmd, output = SharedCommandUtils._run_egrep(
-                git_log_result, self.intermediate_results_file, self.data.piped_jira_ids
+            remote_branch = SharedCommandUtils.ensure_remote_specified(upstream_branch)
+            inputs = {
+                "jira_ids_and_titles": self.data.jira_ids_and_titles,
+                "tip": self.upstream_repo.repo.git.rev_parse(remote_branch),
+            }
+            matched_upstream_commit_list = self.cache.get(
+                UmbrellaFetcherPhase.UPSTREAM_COMMITS, inputs, name=upstream_branch
             )
-            if not output:
-                LOG.warning(
-                    f"Cannot find any commits for jira: {self.config.jira_id} on upstream branch: {upstream_branch}"
+            if matched_upstream_commit_list is None:
+                matched_upstream_commit_list = self._find_upstream_commits(remote_branch)
+                self.cache.put(
+                    UmbrellaFetcherPhase.UPSTREAM_COMMITS, inputs, matched_upstream_commit_list, name=upstream_branch
                 )
-                self.data.upstream_commits_by_branch[upstream_branch] = UpstreamCommitsPerBranch(upstream_branch, [])
-                continue
-
-            normal_commit_lines = output.split("\n")
-            modified_log_lines = self._find_missing_upstream_commits_by_message(git_log_result, normal_commit_lines)
-            matched_upstream_commit_list = normal_commit_lines + modified_log_lines
             if not matched_upstream_commit_list:
                 LOG.warning(
                     f"Cannot find any commits for jira: {self.config.jira_id} on upstream branch: {upstream_branch}"
                 )
-                self.data.upstream_commits_by_branch[upstream_branch] = UpstreamCommitsPerBranch(upstream_branch, [])
+                self.data.add_upstream_commits(UpstreamCommitsPerBranch(upstream_branch, []))
                 continue
 
-            # Commits in reverse order (the oldest first)
-            matched_upstream_commit_list.reverse()
             upstream_commits_by_branch = UpstreamCommitsPerBranch(upstream_branch, matched_upstream_commit_list)
 
             LOG.info(
@@ -329,7 +329,20 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
                 self.commits_file(upstream_branch),
                 StringUtils.list_to_multiline_string(upstream_commits_by_branch.matched_upstream_commit_hashes),
             )
-            self.data.upstream_commits_by_branch[upstream_branch] = upstream_commits_by_branch
+            self.data.add_upstream_commits(upstream_commits_by_branch)
+
+    def _find_upstream_commits(self, remote_branch: str) -> List[str]:
+        git_log_result = self.upstream_repo.log(remote_branch, oneline_with_date=True)
+        # The git log the commits are matched in, saved for reference
+        FileUtils.save_to_file(self.intermediate_results_file, StringUtils.list_to_multiline_string(git_log_result))
+        normal_commit_lines = JiraIdMatcher(self.data.subjira_ids).filter_lines(git_log_result)
+        if not normal_commit_lines:
+            return []
+        modified_log_lines = self._find_missing_upstream_commits_by_message(git_log_result, normal_commit_lines)
+        matched_upstream_commit_list = normal_commit_lines + modified_log_lines
+        # Commits in reverse order (the oldest first)
+        matched_upstream_commit_list.reverse()
+        return matched_upstream_commit_list
 
     def _get_branches(self):
         if self.config.common_upstream_branches:
@@ -351,15 +364,11 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
         LOG.debug("Not found jira ids in git log: %s", not_found_jira_ids)
         LOG.debug("Trying to find commits by jira titles from git log: %s", not_found_jira_titles)
 
-        # If the not_found_jira_titles are all unresolved jiras,
-        # egrep would fail, so we don't want to fail the whole script here,
-        # so disabling fail_on_error / fail_on_empty_output
-        cmd, output = SharedCommandUtils._run_egrep(
-            git_log_result, self.intermediate_results_file, "|".join(not_found_jira_titles)
-        )
-        if not output:
+        if not not_found_jira_titles:
             return []
-        output_lines2 = output.split("\n")
+        # Titles are matched as plain text, anywhere in the git log lines
+        title_pattern = re.compile("|".join(re.escape(title) for title in not_found_jira_titles))
+        output_lines2 = [line for line in git_log_result if title_pattern.search(line)]
         # For these special commits, prepend Jira ID to commit message if it was there
         # Create reverse-dict
         temp_dict = {v: k for k, v in self.data.jira_ids_and_titles.items()}
@@ -386,12 +395,36 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
                 modified_log_lines.append(modified_log_line)
         return modified_log_lines
 
+    def find_downstream_commits(self):
+        inputs = {
+            "jira_ids": sorted(self.get_jira_ids_from_all_upstream_branches()),
+            "execution_mode": self.config.execution_mode.value,
+            "branches": self.config.downstream_branches,
+            "refs": self.downstream_repo.repo.git.for_each_ref(format="%(objectname) %(refname)"),
+        }
+        cached_backported_jiras = self.cache.get(UmbrellaFetcherPhase.DOWNSTREAM_COMMITS, inputs)
+        if cached_backported_jiras is not None:
+            self.data.backported_jiras = UmbrellaDataCache.deserialize_backported_jiras(cached_backported_jiras)
+            return
+
+        if self.config.execution_mode == ExecutionMode.AUTO_BRANCH_MODE:
+            self.find_downstream_commits_auto_mode()
+        elif self.config.execution_mode == ExecutionMode.MANUAL_BRANCH_MODE:
+            self.data.backported_jiras = self.find_downstream_commits_manual_mode()
+        self.cache.put(
+            UmbrellaFetcherPhase.DOWNSTREAM_COMMITS,
+            inputs,
+            UmbrellaDataCache.serialize_backported_jiras(self.data.backported_jiras),
+        )
+
     def find_downstream_commits_auto_mode(self):
         jira_ids = self.get_jira_ids_from_all_upstream_branches()
+        branch_index = BranchContainmentIndex(self.downstream_repo, cache_dir=self.branch_containment_cache_dir)
+        downstream_commits_by_jira = self._grep_downstream_commits(self.downstream_repo, jira_ids)
         for idx, jira_id in enumerate(jira_ids):
             progress = f"[{idx + 1} / {len(jira_ids)}] "
             LOG.info("%s Checking if %s is backported to downstream repo", progress, jira_id)
-            downstream_commits_for_jira = self.downstream_repo.log(HEAD, oneline_with_date=True, all=True, grep=jira_id)
+            downstream_commits_for_jira = downstream_commits_by_jira[jira_id]
             LOG.info("%s Downstream git log result for %s: %s", progress, jira_id, downstream_commits_for_jira)
 
             if downstream_commits_for_jira:
@@ -409,19 +442,48 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
                 )
 
                 backported_jira: BackportedJira = BackportedJira(jira_id, backported_commits)
-
-                for backported_commit in backported_jira.commits:
-                    commit_hash = backported_commit.commit_obj.hash
-                    LOG.info(
-                        "%s Looking for remote branches of backported commit: %s (hash: %s)",
-                        progress,
-                        jira_id,
-                        commit_hash,
-                    )
-                    backported_commit.branches = self.downstream_repo.branch(None, recursive=True, contains=commit_hash)
                 self.data.backported_jiras[jira_id] = backported_jira
                 LOG.info("%s Finished checking downstream backport for jira: %s", progress, jira_id)
 
+        # Branches of all backported commits are determined at once
+        branch_index.add_commits(
+            [
+                c.commit_obj.hash
+                for backported_jira in self.data.backported_jiras.values()
+                for c in backported_jira.commits
+            ]
+        )
+        for jira_id, backported_jira in self.data.backported_jiras.items():
+            for backported_commit in backported_jira.commits:
+                commit_hash = backported_commit.commit_obj.hash
+                LOG.info("Looking for remote branches of backported commit: %s (hash: %s)", jira_id, commit_hash)
+                backported_commit.branches = branch_index.get_branches(commit_hash)
+
+    @staticmethod
+    def _grep_downstream_commits(downstream_repo: GitWrapper, jira_ids: Collection[str]) -> Dict[str, List[str]]:
+        """
+        Equivalent of running 'git log --all --grep=<jira_id>' for every Jira ID, with a single git log.
+        Git only lists commits matching any of the Jira IDs, these are attributed to the Jira IDs by their full message.
+        Returns git log lines in the oneline with date format, for each Jira ID.
+        """
+        result: Dict[str, List[str]] = {jira_id: [] for jira_id in jira_ids}
+        if not jira_ids:
+            return result
+        commit_sep, message_sep = "\x1e", "\x1f"
+        output = downstream_repo.repo.git.log(
+            HEAD,
+            all=True,
+            fixed_strings=True,
+            grep=list(jira_ids),
+            format=f"{commit_sep}{GIT_LOG_FORMATS[GitLogLineFormat.ONELINE_WITH_DATE]}{message_sep}%B",
+        )
+        for commit in output.split(commit_sep)[1:]:
+            log_line, message = commit.split(message_sep, 1)
+            for jira_id in jira_ids:
+                if jira_id in message:
+                    result[jira_id].append(log_line)
+        return result
+
     def find_downstream_commits_manual_mode(self):
         branches = self.config.downstream_branches
         grep_intermediate_results_file = self.intermediate_results_file
@@ -433,18 +495,44 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
 
     # TODO Migrate this to OutputManager
     def save_changed_files_to_file(self):
+        inputs = {"commit_hashes": sorted(self.get_commit_hashes_from_all_upstream_branches())}
+        self.data.list_of_changed_files = self.cache.get(UmbrellaFetcherPhase.CHANGED_FILES, inputs)
+        if self.data.list_of_changed_files is None:
+            self.data.list_of_changed_files = self._get_unique_changed_files(inputs["commit_hashes"])
+            self.cache.put(UmbrellaFetcherPhase.CHANGED_FILES, inputs, self.data.list_of_changed_files)
+        LOG.info("Got %d unique changed files", len(self.data.list_of_changed_files))
+        FileUtils.save_to_file(
+            self.changed_files_file, StringUtils.list_to_multiline_string(self.data.list_of_changed_files)
+        )
+
+    def _get_unique_changed_files(self, commit_hashes: List[str]) -> List[str]:
         list_of_changed_files = []
-        for c_hash in self.get_commit_hashes_from_all_upstream_branches():
-            changed_files = self.upstream_repo.diff_tree(c_hash, no_commit_id=True, name_only=True, recursive=True)
+        changed_files_by_commit = self._get_changed_files_of_commits(self.upstream_repo, commit_hashes)
+        for c_hash, changed_files in changed_files_by_commit.items():
             list_of_changed_files.append(changed_files)
             LOG.debug("List of changed files for commit hash '%s': %s", c_hash, changed_files)
         # Filter dupes, flatten list of lists
         list_of_changed_files = [y for x in list_of_changed_files for y in x]
-        self.data.list_of_changed_files = list(set(list_of_changed_files))
-        LOG.info("Got %d unique changed files", len(self.data.list_of_changed_files))
-        FileUtils.save_to_file(
-            self.changed_files_file, StringUtils.list_to_multiline_string(self.data.list_of_changed_files)
+        return list(set(list_of_changed_files))
+
+    @staticmethod
+    def _get_changed_files_of_commits(repo: GitWrapper, commit_hashes: Collection[str]) -> Dict[str, List[str]]:
+        """
+        Changed files of all commits with a single git log, instead of running 'git diff-tree' for every commit.
+        Like 'git diff-tree', merge commits don't have any changed files and renamed files are listed
+        with both their old and new paths, as rename detection is turned off.
+        """
+        if not commit_hashes:
+            return {}
+        commit_sep = "\x1e"
+        output = repo.repo.git.log(
+            *commit_hashes, no_walk="unsorted", name_only=True, no_renames=True, format=f"{commit_sep}%H"
         )
+        result: Dict[str, List[str]] = {}
+        for commit in output.split(commit_sep)[1:]:
+            c_hash, *changed_files = commit.splitlines()
+            result[c_hash] = [f for f in changed_files if f]
+        return result
 
     # TODO Migrate this to OutputManager
     def write_all_changes_files(self):
@@ -454,38 +542,81 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
         :return:
         """
         LOG.info("Recording changes of individual files...")
+        inputs = {
+            "files": sorted(self.data.list_of_changed_files),
+            "jira_ids": self.data.subjira_ids,
+            "tip": self.upstream_repo.repo.git.rev_parse(ORIGIN_TRUNK),
+        }
+        changes_of_files = self.cache.get(UmbrellaFetcherPhase.CHANGES_OF_FILES, inputs)
+        if changes_of_files is None:
+            changes_of_files = self._get_changes_of_files(
+                self.upstream_repo, ORIGIN_TRUNK, self.data.list_of_changed_files, self.data.subjira_ids
+            )
+            self.cache.put(UmbrellaFetcherPhase.CHANGES_OF_FILES, inputs, changes_of_files)
         for idx, changed_file in enumerate(self.data.list_of_changed_files):
             target_file = FileUtils.join_path(
                 self.config.umbrella_result_basedir, "changes", os.path.basename(changed_file)
             )
             FileUtils.ensure_file_exists(target_file, create=True)
 
-            # NOTE: It seems impossible to call the following command with gitpython:
-            # git log --follow --oneline -- <file>
-            # Use a simple CLI command instead
-
             # TODO check if change file exists - It can happen that it was deleted
-            cli_command = (
-                f"cd {self.upstream_repo.repo_path} && "
-                f"git log {ORIGIN_TRUNK} --follow --oneline -- {changed_file} | "
-                f'egrep "{self.data.piped_jira_ids}"'
-            )
-            LOG.info("[%d / %d] CLI command: %s", idx + 1, len(self.data.list_of_changed_files), cli_command)
-            cmd, output = CommandRunner.run_cli_command(
-                cli_command, fail_on_empty_output=False, print_command=False, fail_on_error=False
-            )
-
-            if output:
+            changes = changes_of_files[changed_file]
+            LOG.info("[%d / %d] Changes of file %s: %s", idx + 1, len(changes_of_files), changed_file, changes)
+            if changes:
                 LOG.info("Saving changes result to file: %s", target_file)
-                FileUtils.save_to_file(target_file, output)
+                FileUtils.save_to_file(target_file, "\n".join(changes))
             else:
                 LOG.error(
-                    f"Failed to detect changes of file: {changed_file}. CLI command was: {cli_command}. "
+                    f"Failed to detect changes of file: {changed_file} on {ORIGIN_TRUNK}. "
                     f"This seems to be a programming error. Exiting..."
                 )
                 FileUtils.save_to_file(target_file, "")
                 sys.exit(1)
 
+    @staticmethod
+    def _get_changes_of_files(
+        repo: GitWrapper, revision: str, files: Collection[str], jira_ids: Collection[str]
+    ) -> Dict[str, List[str]]:
+        """
+        Oneline git log of each file on the revision, filtered to the commits mentioning any of the Jira IDs.
+        Same as running 'git log <revision> --follow --oneline -- <file> | egrep <jira_ids>' for every file,
+        but the history is read only once: renames are followed by tracking the old paths of the files.
+        """
+        if not files:
+            return {}
+        jira_id_pattern = re.compile("|".join(re.escape(jira_id) for jira_id in jira_ids))
+        changes: Dict[str, List[str]] = {f: [] for f in files}
+        # Path of the currently processed commit -> Files on the revision having this path at that commit
+        tracked_paths: Dict[str, Set[str]] = {f: {f} for f in files}
+        commit_sep = "\x1e"
+        commit_line: str or None = None
+        proc = repo.repo.git.log(
+            revision, name_status=True, find_renames=True, format=f"{commit_sep}%h %s", as_process=True
+        )
+        # Closing the lines kills the git process, if processing the output fails
+        lines = read_git_process_lines(proc)
+        try:
+            for line in lines:
+                if line.startswith(commit_sep):
+                    commit_line = line[len(commit_sep) :]
+                    continue
+                if not line:
+                    continue
+                status, *paths = line.split("\t")
+                # Renames are listed as: R<score> <old path> <new path>
+                files_of_path = tracked_paths.get(paths[-1])
+                if not files_of_path:
+                    continue
+                if jira_id_pattern.search(commit_line):
+                    for file in files_of_path:
+                        changes[file].append(commit_line)
+                if status.startswith("R"):
+                    del tracked_paths[paths[-1]]
+                    tracked_paths.setdefault(paths[0], set()).update(files_of_path)
+        finally:
+            lines.close()
+        return changes
+
     # TODO Migrate this to OutputManager
     def print_summary(self):
         table_data = self.prepare_table_data()
@@ -493,11 +624,6 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
         self.rendered_summary = UmbrellaFetcherRenderedSummary(summary_data, table_data, self.config)
         self.output_manager.print_and_save_summary(self.rendered_summary)
 
-    def pickle_umbrella_data(self):
-        LOG.debug("Final umbrella data object: %s", self.data)
-        LOG.info("Dumping %s object to file %s", JiraUmbrellaData.__name__, self.pickled_data_file)
-        PickleUtils.dump(self.data, self.pickled_data_file)
-
     # TODO Migrate this to class that is responsible for creating data for table
     def prepare_table_data(self, backport_remote_filter=ORIGIN):
         all_commits_backport_data: List[Any] = []
@@ -599,18 +725,13 @@ class UpstreamJiraUmbrellaFetcher(CommandAbs):
         return all_hashes
 
     def get_upstream_branches_for_jira(self, jira_id):
-        # TODO Optimize this lookup
-        branches = set()
-        for branch, commits_per_branch in self.data.upstream_commits_by_branch.items():
-            for commit_data in commits_per_branch.matched_upstream_commitdata_list:
-                if commit_data.jira_id == jira_id:
-                    branches.add(branch)
-                    break
-        return list(branches)
+        return list(self.data.upstream_branches_by_jira_id.get(jira_id, []))
 
     def cross_check_subjira_statuses_with_commits(self):
         jira_wrapper = JiraWrapper(UPSTREAM_JIRA_SERVER_URL, DEFAULT_BRANCH, self.patches_basedir)
-        subjira_statuses: Dict[str, JiraStatus] = jira_wrapper.get_subjira_statuses_of_umbrella(self.config.jira_id)
+        subjira_statuses: Dict[str, JiraStatus] = SubjiraStatusFetcher(jira_wrapper.jira).get_statuses(
+            self.config.jira_id, self.data.subjira_ids
+        )
 
         # diff_jira_ids1 = set(self.data.subjira_ids).difference(subjira_statuses.keys())
         # diff_jira_ids2 = set(subjira_statuses.keys()).difference(self.data.subjira_ids)
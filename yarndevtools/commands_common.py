@@ -1,17 +1,30 @@
 import argparse
+import contextlib
 import logging
 import re
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from datetime import datetime
 from enum import Enum
+from functools import cached_property
 from re import Pattern
-from typing import List, Any, Set, Dict
+from typing import List, Any, Set, Dict, Iterable, Iterator
 
+from git import GitCommandError
 from pythoncommons.git_constants import (
     COMMIT_FIELD_SEPARATOR,
     REVERT,
 )
-from pythoncommons.git_wrapper import GitLogLineFormat
+from pythoncommons.git_wrapper import (
+    GitLogLineFormat,
+    GitWrapper,
+    FORMAT_CODE_HASH,
+    FORMAT_CODE_COMMIT_MSG,
+    FORMAT_CODE_DATE_ISO_8601,
+    FORMAT_CODE_AUTHOR,
+    FORMAT_CODE_COMMITTER,
+)
 from pythoncommons.string_utils import auto_str
 
 from yarndevtools.commands.unittestresultaggregator.constants import MATCH_EXPRESSION_PATTERN
@@ -21,6 +34,18 @@ from yarndevtools.constants import (
 
 LOG = logging.getLogger(__name__)
 
+# Format of dates in git log outputs, strict ISO 8601
+GIT_LOG_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+# Same formats as the ones used by GitWrapper.log
+GIT_LOG_FORMATS = {
+    GitLogLineFormat.ONELINE_WITH_DATE: f"{FORMAT_CODE_HASH} {FORMAT_CODE_COMMIT_MSG} {FORMAT_CODE_DATE_ISO_8601}",
+    GitLogLineFormat.ONELINE_WITH_DATE_AND_AUTHOR: f"{FORMAT_CODE_HASH} {FORMAT_CODE_COMMIT_MSG} "
+    f"{FORMAT_CODE_DATE_ISO_8601} {FORMAT_CODE_AUTHOR}",
+    GitLogLineFormat.ONELINE_WITH_DATE_AUTHOR_COMMITTER: f"{FORMAT_CODE_HASH} {FORMAT_CODE_COMMIT_MSG} "
+    f"{FORMAT_CODE_DATE_ISO_8601} {FORMAT_CODE_AUTHOR} {FORMAT_CODE_COMMITTER}",
+}
+
 
 class JiraIdTypePreference(Enum):
     UPSTREAM = "upstream"
@@ -330,6 +355,54 @@ class GitLogParseConfig:
         self.verbose_mode = verbose_mode
 
 
+def read_git_process_lines(proc) -> Iterator[str]:
+    """
+    Lines of the standard output of a git process, started with as_process=True.
+    Standard error is drained in the background, so git can't block on a full stderr pipe.
+    If the caller stops iterating early, the process is killed and waited for.
+    Raises GitCommandError if git failed.
+    """
+    stderr_chunks: List[bytes] = []
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+    stderr_reader.start()
+    completed = False
+    try:
+        for line in proc.stdout:
+            yield line.decode("utf-8", errors="replace").rstrip("\n")
+        completed = True
+    finally:
+        if not completed:
+            proc.kill()
+            stderr_reader.join()
+            # The killed process exits with a non-zero status, that's not an error here
+            with contextlib.suppress(GitCommandError):
+                proc.wait()
+    stderr_reader.join()
+    proc.wait(stderr=b"".join(stderr_chunks))
+
+
+class GitLogStream:
+    """
+    Iterable of git log lines, read from the output of the git process while it is running.
+    Equivalent of GitWrapper.log with one of the oneline formats, without keeping the whole output in memory.
+    """
+
+    def __init__(self, repo: GitWrapper, revision_range: str, log_format: GitLogLineFormat, **kwargs):
+        if log_format not in GIT_LOG_FORMATS:
+            raise ValueError(f"Unsupported git log format: {log_format}")
+        self.repo = repo
+        self.revision_range = revision_range
+        self.log_format = log_format
+        self.kwargs = kwargs
+
+    def __iter__(self) -> Iterator[str]:
+        LOG.info("Streaming git log with arguments, revision range: %s, kwargs: %s", self.revision_range, self.kwargs)
+        proc = self.repo.repo.git.log(
+            self.revision_range, format=GIT_LOG_FORMATS[self.log_format], as_process=True, **self.kwargs
+        )
+        yield from read_git_process_lines(proc)
+
+
 @dataclass
 class CommitParserState:
     git_log_line_raw: str
@@ -420,6 +493,12 @@ class GitLogParser:
 
         return commit_data
 
+    def parse_lines(self, git_log_lines: Iterable[str]) -> Iterator[Any]:
+        # Lines are parsed one by one, as they are consumed from the iterable. Empty lines are skipped.
+        for git_log_line in git_log_lines:
+            if git_log_line:
+                yield self.parse_line(git_log_line)
+
     def _determine_jira_ids(self, git_log_str, parse_config: GitLogParseConfig) -> JiraIdData:
         allow_errors = parse_config.jira_id_parse_strategy.allow_unknown_jira_id()
         jira_id_data = parse_config.jira_id_parse_strategy.parse(git_log_str, parse_config, self)
@@ -489,6 +568,17 @@ class CommitData:
         parser.log_violations()
         return result
 
+    @staticmethod
+    def from_git_log_stream(git_log_lines: Iterable[str], parse_config: GitLogParseConfig) -> Iterator[Any]:
+        parser = GitLogParser(parse_config)
+        yield from parser.parse_lines(git_log_lines)
+        parser.log_violations()
+
+    @cached_property
+    def timestamp(self) -> float:
+        # Date is parsed only once, on first access, as it is used as sort key
+        return datetime.strptime(self.date, GIT_LOG_DATE_FORMAT).timestamp()
+
     # TODO make another method that can work with full git log results, not just a line of it
     @staticmethod
     def from_git_log_str(
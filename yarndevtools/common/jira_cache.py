@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pythoncommons.file_utils import FileUtils
+from pythoncommons.project_utils import ProjectUtils
+
+LOG = logging.getLogger(__name__)
+
+JIRA_CACHE_DIR_NAME = "jira_cache"
+DEFAULT_JIRA_CACHE_TTL_SECONDS = 60 * 60
+# Same as the settings of the JIRA client created by JiraWrapper
+DEFAULT_JIRA_REQUEST_TIMEOUT_SECONDS = 20
+DEFAULT_JIRA_REQUEST_MAX_RETRIES = 10
+
+
+class JiraDocumentCache:
+    """
+    On-disk cache of downloaded Jira documents, e.g. HTML pages and issue JSON of the REST API, keyed by URL.
+    Documents younger than the TTL are served without any request.
+    Older documents are revalidated with a conditional request, so unchanged documents are not downloaded again,
+    provided that the server sent validators (ETag / Last-Modified) for them.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl_seconds: int = DEFAULT_JIRA_CACHE_TTL_SECONDS,
+        session=None,
+        timeout: int = DEFAULT_JIRA_REQUEST_TIMEOUT_SECONDS,
+    ):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self.session = session if session else self._create_session()
+
+    @staticmethod
+    def _create_session(max_retries: int = DEFAULT_JIRA_REQUEST_MAX_RETRIES):
+        session = requests.Session()
+        retry = Retry(total=max_retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @staticmethod
+    def create_default(ttl_seconds: int = DEFAULT_JIRA_CACHE_TTL_SECONDS):
+        """Cache in the output directory of the project, shared by all commands."""
+        return JiraDocumentCache(ProjectUtils.get_output_child_dir(JIRA_CACHE_DIR_NAME), ttl_seconds=ttl_seconds)
+
+    def _get_file_path(self, url: str):
+        return FileUtils.join_path(self.cache_dir, f"{hashlib.sha1(url.encode()).hexdigest()}.json")
+
+    @staticmethod
+    def _load(file_path: str) -> Dict[str, Any] or None:
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            LOG.warning("Failed to read cached Jira document from file: %s", file_path, exc_info=True)
+            return None
+
+    def _save(self, file_path: str, entry: Dict[str, Any]):
+        FileUtils.ensure_dir_created(self.cache_dir)
+        with open(file_path, "w") as f:
+            json.dump(entry, f)
+
+    def get(self, url: str) -> str:
+        file_path = self._get_file_path(url)
+        entry = self._load(file_path)
+        if entry and time.time() - entry["fetched_at"] < self.ttl_seconds:
+            LOG.debug("Using cached Jira document of URL: %s", url)
+            return entry["content"]
+
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        if entry and resp.status_code == 304:
+            LOG.debug("Cached Jira document is not modified. URL: %s", url)
+            entry["fetched_at"] = time.time()
+        else:
+            resp.raise_for_status()
+            LOG.debug("Downloaded Jira document of URL: %s", url)
+            entry = {
+                "url": url,
+                "fetched_at": time.time(),
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "content": resp.text,
+            }
+        self._save(file_path, entry)
+        return entry["content"]
+
+    def download_jira_html(self, jira_server: str, jira_id: str, to_file: str) -> str:
+        """Cached version of JiraUtils.download_jira_html."""
+        html = self.get(jira_server + jira_id)
+        FileUtils.save_to_file(to_file, html)
+        return html
+
+    def get_issue_json(self, jira_server: str, issue_id: str) -> Dict[str, Any]:
+        return json.loads(self.get(f"{jira_server.rstrip('/')}/rest/api/2/issue/{issue_id}"))
@@ -1,14 +1,18 @@
+import contextlib
+import hashlib
 import logging
+import os
+import re
 from enum import Enum
-from typing import List, Dict
+from typing import List, Dict, Iterable, Set, Iterator, Tuple
 
 from pythoncommons.email import EmailAccount, EmailConfig
-from pythoncommons.file_utils import FileUtils
+from pythoncommons.file_utils import FileUtils, JsonFileUtils
 from pythoncommons.git_constants import ORIGIN
-from pythoncommons.git_wrapper import GitLogLineFormat
+from pythoncommons.git_wrapper import GitLogLineFormat, GitWrapper
 from pythoncommons.html_utils import HtmlGenerator
-from pythoncommons.object_utils import ListUtils, ObjUtils
-from pythoncommons.process import CommandRunner
+from pythoncommons.object_utils import ObjUtils
+from pythoncommons.string_utils import StringUtils
 
 from yarndevtools.commands_common import (
     CommitData,
@@ -17,6 +21,8 @@ from yarndevtools.commands_common import (
     MatchAllJiraIdStrategy,
     JiraIdTypePreference,
     JiraIdChoosePreference,
+    GIT_LOG_FORMATS,
+    read_git_process_lines,
 )
 
 from yarndevtools.constants import LATEST_DATA_ZIP_LINK_NAME, ANY_JIRA_ID_PATTERN
@@ -55,23 +61,23 @@ class SharedCommandUtils:
         branches, grep_intermediate_results_file, downstream_repo, jira_ids
     ) -> Dict[str, BackportedJira]:
         backported_jiras: Dict[str, BackportedJira] = {}
-        for branch in branches:
-            git_log_result = downstream_repo.log(
-                SharedCommandUtils.ensure_remote_specified(branch), oneline_with_date=True
-            )
-            if len(jira_ids) > 100:
-                for jira_ids_chunk in ListUtils.split_to_chunks(jira_ids, 100):
-                    ret = SharedCommandUtils._run_git_egrep(
-                        jira_ids_chunk, branch, backported_jiras, git_log_result, grep_intermediate_results_file
-                    )
-                    if ret == -1:
-                        continue
-            else:
-                ret = SharedCommandUtils._run_git_egrep(
-                    jira_ids, branch, backported_jiras, git_log_result, grep_intermediate_results_file
-                )
-                if ret == -1:
-                    continue
+        jira_id_matcher = JiraIdMatcher(jira_ids)
+        # The history shared by the branches is read only once, matched lines are attributed to the branches after
+        matched_lines_by_branch: Dict[str, List[str]] = {branch: [] for branch in branches}
+        all_matched_lines: List[str] = []
+        git_log = MultiBranchGitLog(
+            downstream_repo, [SharedCommandUtils.ensure_remote_specified(branch) for branch in branches]
+        )
+        for line, mask in git_log:
+            if jira_id_matcher.matches(line):
+                all_matched_lines.append(line)
+                for idx in git_log.branch_indices(mask):
+                    matched_lines_by_branch[branches[idx]].append(line)
+        FileUtils.save_to_file(grep_intermediate_results_file, StringUtils.list_to_multiline_string(all_matched_lines))
+
+        for branch, matched_lines in matched_lines_by_branch.items():
+            if matched_lines:
+                SharedCommandUtils._process_output(backported_jiras, branch, matched_lines)
 
         LOG.info("Found %d backported commits out of %d", len(backported_jiras), len(jira_ids))
         # Make sure that missing backports are added as BackportedJira objects
@@ -82,34 +88,7 @@ class SharedCommandUtils:
         return backported_jiras
 
     @staticmethod
-    def _run_git_egrep(jira_ids, branch, backported_jiras, git_log_result, grep_intermediate_results_file):
-        piped_jira_ids = SharedCommandUtils._prepare_jira_ids(jira_ids)
-        # It's quite complex to grep for multiple jira IDs with gitpython, so let's rather call an external command
-        cmd, output = SharedCommandUtils._run_egrep(
-            git_log_result, grep_intermediate_results_file, piped_jira_ids, fail_on_error=False
-        )
-        if not output or len(output) == 0:
-            return -1
-
-        SharedCommandUtils._process_output(backported_jiras, branch, output)
-        return 0
-
-    @staticmethod
-    def _prepare_jira_ids(jira_ids):
-        # Do not allow partial matches, for example:
-        # If Jira ID is 'YARN-1015' and there are commit messages like:
-        # YARN-10157..., YARN-1015..., YARN-101...,
-        # then all of the following will be matched instead of just finding 'YARN-10157':
-        # YARN-10157
-        # YARN-1015
-        # YARN-101
-        mod_jira_ids = [jid + "[^0-9]" for jid in jira_ids]
-        piped_jira_ids = "|".join(mod_jira_ids)
-        return piped_jira_ids.replace("\n", "")
-
-    @staticmethod
-    def _process_output(backported_jiras, branch, output):
-        matched_downstream_commit_list = output.split("\n")
+    def _process_output(backported_jiras, branch, matched_downstream_commit_list: List[str]):
         if matched_downstream_commit_list:
             backported_commits = [
                 BackportedCommit(
@@ -146,17 +125,187 @@ class SharedCommandUtils:
                     else:
                         backported_jiras[jira_id].extend_branches_by_hash(commit_obj.hash, backported_commit)
 
-    @staticmethod
-    def _run_egrep(git_log_result: List[str], file: str, grep_for: str, fail_on_error=False):
-        return CommandRunner.egrep_with_cli(
-            git_log_result,
-            file,
-            grep_for,
-            escape_single_quotes=False,
-            escape_double_quotes=True,
-            fail_on_empty_output=False,
-            fail_on_error=fail_on_error,
+
+class JiraIdMatcher:
+    """
+    Finds lines mentioning any of the Jira IDs with a single scan of each line, without spawning egrep processes.
+    Equivalent of egrep with the pattern 'ID1[^0-9]|ID2[^0-9]|...':
+    a Jira ID is only matched if it is followed by a non-digit character, so YARN-101 does not match YARN-1015.
+    """
+
+    # The number part of a Jira ID candidate, followed by a non-digit character
+    NUMBER_PATTERN = re.compile(r"-[0-9]+(?=[^0-9])")
+
+    def __init__(self, jira_ids: Iterable[str]):
+        self.jira_ids: Set[str] = {jira_id.replace("\n", "") for jira_id in jira_ids}
+        # Candidates are looked up by each possible length of the project part of the Jira IDs
+        self._project_lengths: List[int] = sorted({jira_id.rfind("-") for jira_id in self.jira_ids if "-" in jira_id})
+
+    def find_jira_ids(self, line: str) -> List[str]:
+        result = []
+        for match in self.NUMBER_PATTERN.finditer(line):
+            start = match.start()
+            for length in self._project_lengths:
+                if length > start:
+                    break
+                candidate = line[start - length : match.end()]
+                if candidate in self.jira_ids:
+                    result.append(candidate)
+        return result
+
+    def matches(self, line: str) -> bool:
+        return len(self.find_jira_ids(line)) > 0
+
+    def filter_lines(self, lines: Iterable[str]) -> List[str]:
+        return [line for line in lines if self.matches(line)]
+
+
+class MultiBranchGitLog:
+    """
+    Iterable of git log lines of the union of branches, read with a single git log process.
+    Every line is yielded with the bitmask of the branches that contain the commit, see branch_indices.
+    Commits are listed in topological order (children first), so branches are determined by propagating
+    the branches of the tips to the parents as a bitmask, only keeping the masks of the not yet listed commits.
+    """
+
+    PARENTS_SEPARATOR = ";"
+
+    def __init__(self, repo: GitWrapper, branches: List[str], log_format=GitLogLineFormat.ONELINE_WITH_DATE):
+        self.repo = repo
+        self.branches = branches
+        self.log_format = log_format
+
+    def branch_indices(self, mask: int) -> List[int]:
+        return [idx for idx in range(len(self.branches)) if mask & (1 << idx)]
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        if not self.branches:
+            return
+        masks: Dict[str, int] = {}
+        for idx, tip in enumerate(self.repo.repo.git.rev_parse(*self.branches).splitlines()):
+            masks[tip] = masks.get(tip, 0) | (1 << idx)
+
+        LOG.info("Streaming git log of branches: %s", self.branches)
+        proc = self.repo.repo.git.log(
+            *self.branches,
+            format=f"%P{self.PARENTS_SEPARATOR}{GIT_LOG_FORMATS[self.log_format]}",
+            topo_order=True,
+            as_process=True,
+        )
+        # Closing the lines kills the git process, if the consumer stops iterating early
+        lines = read_git_process_lines(proc)
+        try:
+            for raw_line in lines:
+                parents, line = raw_line.split(self.PARENTS_SEPARATOR, 1)
+                mask = masks.pop(line.split(" ", 1)[0], 0)
+                for parent in parents.split():
+                    masks[parent] = masks.get(parent, 0) | mask
+                yield line, mask
+        finally:
+            lines.close()
+
+
+class BranchContainmentIndex:
+    """
+    Maps commit hashes to the remote branches containing them, like 'git branch -r --contains <hash>',
+    but computed for all requested commits with a single walk of the commit graph.
+    Results are cached on disk together with the tips of the remote branches. When some branches move,
+    only those branches are dropped from the cached entries and their history is walked again on lookup,
+    the entries of the unchanged branches are reused.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, repo: GitWrapper, cache_dir: str = None):
+        self.repo = repo
+        self.cache_file: str or None = None
+        if cache_dir:
+            repo_id = hashlib.sha1(repo.repo_path.encode()).hexdigest()[:10]
+            self.cache_file = FileUtils.join_path(cache_dir, f"{FileUtils.basename(repo.repo_path)}-{repo_id}.json")
+        self._tips: Dict[str, str] = self._get_remote_branch_tips()
+        # Cached commits whose entries lack the moved branches, until those are walked again
+        self._changed_branches: List[str] = []
+        self._outdated: Set[str] = set()
+        self._index: Dict[str, List[str]] = self._load()
+
+    def _get_remote_branch_tips(self) -> Dict[str, str]:
+        # Symbolic refs (e.g. origin/HEAD) are skipped, they would only duplicate a real branch
+        output = self.repo.repo.git.for_each_ref("refs/remotes", format="%(objectname) %(refname:short) %(symref)")
+        tips = {}
+        for line in output.splitlines():
+            fields = line.split()
+            if len(fields) == 2:
+                tips[fields[1]] = fields[0]
+        return tips
+
+    def _load(self) -> Dict[str, List[str]]:
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        data, _ = JsonFileUtils.load_data_from_json_file(self.cache_file, swallow_value_error=True)
+        if not data or data.get("version") != self.CACHE_VERSION:
+            LOG.info("Ignoring branch containment cache with different version: %s", self.cache_file)
+            return {}
+        cached_tips: Dict[str, str] = data["tips"]
+        self._changed_branches = [branch for branch, tip in self._tips.items() if cached_tips.get(branch) != tip]
+        unchanged = set(self._tips.keys()).difference(self._changed_branches)
+        index = {
+            commit_hash: [branch for branch in branches if branch in unchanged]
+            for commit_hash, branches in data["commits"].items()
+        }
+        if self._changed_branches:
+            self._outdated = set(index.keys())
+        LOG.info(
+            "Loaded branch containment of %d commits from: %s, changed branches: %s",
+            len(index),
+            self.cache_file,
+            self._changed_branches,
         )
+        return index
+
+    def _save(self):
+        if self.cache_file:
+            commits = {
+                commit_hash: branches
+                for commit_hash, branches in self._index.items()
+                if commit_hash not in self._outdated
+            }
+            data = {"version": self.CACHE_VERSION, "tips": self._tips, "commits": commits}
+            JsonFileUtils.write_data_to_file_as_json(self.cache_file, data)
+
+    def add_commits(self, commit_hashes: Iterable[str]):
+        requested: Set[str] = set(commit_hashes)
+        missing: Set[str] = requested.difference(self._index.keys())
+        outdated: Set[str] = requested.intersection(self._outdated)
+        if not missing and not outdated:
+            return
+        # Outdated entries only lack the changed branches, unless the whole history has to be walked anyway
+        branches = list(self._tips.keys()) if missing else self._changed_branches
+        remaining = missing.union(outdated)
+        LOG.info("Determining branches of %d commits from %d remote branches", len(remaining), len(branches))
+        found: Dict[str, List[str]] = {}
+        git_log = MultiBranchGitLog(self.repo, branches)
+        # Closed explicitly, so the git process is killed right after the early exit
+        with contextlib.closing(iter(git_log)) as lines:
+            for line, mask in lines:
+                commit_hash = line.split(" ", 1)[0]
+                if commit_hash in remaining:
+                    found[commit_hash] = [branches[idx] for idx in git_log.branch_indices(mask)]
+                    remaining.remove(commit_hash)
+                    # Branches of a commit are final when it's listed, the rest of the history is not needed
+                    if not remaining:
+                        break
+        for commit_hash in missing:
+            # Commits that are not on any remote branch are not listed
+            self._index[commit_hash] = found.get(commit_hash, [])
+        for commit_hash in outdated:
+            contained = set(self._index[commit_hash]).union(found.get(commit_hash, []))
+            self._index[commit_hash] = [branch for branch in self._tips.keys() if branch in contained]
+        self._outdated.difference_update(outdated)
+        self._save()
+
+    def get_branches(self, commit_hash: str) -> List[str]:
+        self.add_commits([commit_hash])
+        return list(self._index[commit_hash])
 
 
 class FullEmailConfig: